@@ -0,0 +1,100 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jcaverage.py
+
+    Streaming reduction of several frames taken at one scan point. Frames are
+    folded one at a time into float32 accumulators allocated once per frame
+    shape, so averaging N frames costs a few frame-sized buffers rather than
+    N frames held in memory. Alongside the reduced frame a noise map, the
+    per-pixel standard deviation over the frames, comes from Welford's
+    running variance.
+
+    mean:   running mean
+    median: per-pixel median, needs the frames themselves so is limited to
+            MAX_MEDIAN_FRAMES
+    max:    running per-pixel maximum
+"""
+import numpy as np
+
+REDUCTIONS = ('mean', 'median', 'max')
+MAX_MEDIAN_FRAMES = 9
+
+
+class FrameAccumulator:
+    def __init__(self, frames, reduction='mean'):
+        """
+        :param frames: Frames folded into each result.
+        :param reduction: 'mean', 'median' or 'max'.
+        """
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"Unknown reduction {reduction}, expected one of {', '.join(REDUCTIONS)}")
+        if frames < 1:
+            raise ValueError(f"At least one frame is needed, got {frames}")
+        if reduction == 'median' and frames > MAX_MEDIAN_FRAMES:
+            raise ValueError(f"Median of {frames} frames would hold them all in memory, use at most {MAX_MEDIAN_FRAMES}")
+        self.frames = frames
+        self.reduction = reduction
+        self.shape = None
+        self.count = 0
+
+    def _Allocate(self, shape):
+        self.shape = shape
+        self.mean = np.zeros(shape, dtype=np.float32)
+        self.m2 = np.zeros(shape, dtype=np.float32)
+        self.delta = np.empty(shape, dtype=np.float32)
+        self.scratch = np.empty(shape, dtype=np.float32)
+        self.peak = np.empty(shape, dtype=np.float32) if self.reduction == 'max' else None
+        self.stack = np.empty((self.frames,) + shape, dtype=np.float32) if self.reduction == 'median' else None
+
+    def Reset(self):
+        """Start the next point, keeping the buffers."""
+        self.count = 0
+
+    def Add(self, frame):
+        """Fold one frame of any numeric dtype into the accumulators."""
+        if frame.shape != self.shape:
+            self._Allocate(frame.shape)
+            self.count = 0
+        if self.count >= self.frames:
+            raise ValueError(f"Accumulator already holds {self.frames} frames, Reset it first")
+
+        if self.count == 0:
+            np.copyto(self.mean, frame)
+            self.m2.fill(0)
+        else:
+            # Welford: mean += (x - mean) / n; m2 += (x - mean_old) * (x - mean_new)
+            np.subtract(frame, self.mean, out=self.delta)
+            np.divide(self.delta, self.count + 1, out=self.scratch)
+            np.add(self.mean, self.scratch, out=self.mean)
+            np.subtract(frame, self.mean, out=self.scratch)
+            np.multiply(self.delta, self.scratch, out=self.scratch)
+            np.add(self.m2, self.scratch, out=self.m2)
+
+        if self.reduction == 'max':
+            if self.count == 0:
+                np.copyto(self.peak, frame)
+            else:
+                np.maximum(self.peak, frame, out=self.peak)
+        elif self.reduction == 'median':
+            np.copyto(self.stack[self.count], frame)
+        self.count += 1
+
+    def Result(self):
+        """
+        :return: (reduced frame, noise map), both float32 arrays of the frame
+                 shape owned by the caller. The noise map is zero for one frame.
+        """
+        if self.count == 0:
+            raise ValueError("No frames added")
+        if self.reduction == 'median':
+            reduced = np.median(self.stack[:self.count], axis=0).astype(np.float32)
+        elif self.reduction == 'max':
+            reduced = self.peak.copy()
+        else:
+            reduced = self.mean.copy()
+        noise = np.zeros(self.shape, dtype=np.float32)
+        if self.count > 1:
+            np.divide(self.m2, self.count - 1, out=noise)
+            np.sqrt(noise, out=noise)
+        return reduced, noise
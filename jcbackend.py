@@ -0,0 +1,82 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jcbackend.py
+
+    Registry of the hardware SDKs. Each SDK is registered under a name with
+    a loader for the real library and one for its simulator, and stands in
+    for the SDK module until first use: the first attribute looked up loads
+    it, so importing jckcube or jcflir costs nothing until the hardware is
+    actually started. The ALS_SIMULATE environment variable picks the
+    simulator at load time. Load times are logged and kept per backend.
+"""
+import os
+import threading
+import time
+
+_backends = {}
+
+
+class Backend:
+    """
+    Stand-in for an SDK module. Attribute lookups load the SDK on first use
+    and then go to the loaded module or namespace.
+    """
+    def __init__(self, name, loader, simulator=None):
+        self._name = name
+        self._loader = loader
+        self._simulator = simulator
+        self._namespace = None
+        self._lock = threading.Lock()
+        self.load_time = None
+        self.simulated = False
+
+    def Load(self, log_signal=None):
+        """
+        Load the SDK now if it is not loaded yet, e.g. to log its load time
+        through the caller's log before the first call into it.
+
+        :return: The loaded module or namespace.
+        :raises ImportError: If the SDK is not installed; a later call tries again.
+        """
+        with self._lock:
+            if self._namespace is None:
+                simulated = bool(os.environ.get("ALS_SIMULATE")) and self._simulator is not None
+                start = time.perf_counter()
+                namespace = (self._simulator if simulated else self._loader)()
+                self.load_time = time.perf_counter() - start
+                self.simulated = simulated
+                self._namespace = namespace
+                log = log_signal if log_signal else print
+                log("INFO", "Backend", f"{self._name} {'simulator' if simulated else 'SDK'} loaded", f"Load={self.load_time:.3f} s")
+        return self._namespace
+
+    def IsLoaded(self):
+        return self._namespace is not None
+
+    def __getattr__(self, attribute):
+        # Only reached for names not set in __init__, i.e. the SDK's own
+        return getattr(self.Load(), attribute)
+
+
+def Register(name, loader, simulator=None):
+    """
+    Register an SDK under name.
+
+    :param loader: Callable returning the SDK module or a namespace of its classes.
+    :param simulator: Callable returning the simulated stand-in, used with ALS_SIMULATE set.
+    :rtype: Backend
+    """
+    backend = _backends[name] = Backend(name, loader, simulator)
+    return backend
+
+
+def GetBackend(name):
+    return _backends[name]
+
+
+def LoadTimes():
+    """
+    :return: Dict of backend name to seconds its load took, for the loaded backends.
+    """
+    return {name: backend.load_time for name, backend in _backends.items() if backend.IsLoaded()}
@@ -0,0 +1,280 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jcbench.py
+
+    Benchmarks of the hot paths, run against the simulated camera and
+    stages so they give the same answer on any machine with NumPy:
+
+    live:   frames/s through FrameGrabber to a QImage, at full size and
+            with the preview reduction, and the conversion time per frame
+    scan:   seconds per point of a stepped Z scan into an HDF5 container
+    write:  images/s appended to each scan format
+    log:    messages/s through LogPipeline into the GUI log table
+
+    python jcbench.py [--only live,write] [--save-baseline] [--baseline FILE]
+
+    Results are compared with the baseline file when it exists, and any
+    metric worse than it by more than the tolerance is flagged as a
+    regression (exit status 1). Baselines are machine specific, so record
+    one with --save-baseline on the machine that will run the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+BASELINE_FILE = "jcbench_baseline.json"
+TOLERANCE = 0.15
+SUITES = ('live', 'scan', 'write', 'log')
+
+# Metric name: (unit, True if higher is better)
+METRICS = {
+    'live_fps': ("frames/s", True),
+    'live_convert_ms': ("ms", False),
+    'preview_fps': ("frames/s", True),
+    'preview_convert_ms': ("ms", False),
+    'scan_s_per_point': ("s", False),
+    'write_hdf5_fps': ("images/s", True),
+    'write_hdf5_fast_fps': ("images/s", True),
+    'write_raw_fps': ("images/s", True),
+    'write_raw_fast_fps': ("images/s", True),
+    'write_png_fps': ("images/s", True),
+    'log_messages_per_s': ("messages/s", True),
+}
+
+
+def QuietLog(level, component, message, details=""):
+    """log_signal that only prints errors, so logging does not skew the timings."""
+    if level == "ERROR":
+        print("\t".join((level, component, message, details)), file=sys.stderr)
+
+
+def _LivePath(camera, duration, display_size=None):
+    """
+    Show frames as fast as FrameGrabber delivers them for duration seconds.
+
+    :return: (frames/s shown, median conversion ms)
+    """
+    from jcflir import FrameGrabber
+    from jclatency import latency
+    try:
+        from PyQt5.QtGui import QImage
+    except ImportError:
+        QImage = None
+
+    arrived = threading.Event()
+    grabber = FrameGrabber(camera, on_frame=arrived.set, log_signal=QuietLog)
+    if display_size:
+        grabber.SetDisplaySize(*display_size)
+    latency.Reset()
+    shown = 0
+    grabber.Start()
+    try:
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            if not arrived.wait(1):
+                continue
+            arrived.clear()
+            frame = grabber.Latest()
+            if frame is None:
+                continue
+            if QImage is not None:
+                QImage(frame.data.data, frame.width, frame.height, 3 * frame.width, QImage.Format_RGB888).copy()
+            shown += 1
+        elapsed = time.perf_counter() - start
+    finally:
+        grabber.Stop()
+    convert = latency.Percentiles('camera.convert')
+    return shown / elapsed, convert[50] * 1000 if convert else float('nan')
+
+
+def BenchLive(runner, args):
+    results = {}
+    results['live_fps'], results['live_convert_ms'] = _LivePath(runner.camera, args.duration)
+    # Half the sensor size in each direction, so frames are reduced with a stride of 2
+    camera = runner.camera
+    results['preview_fps'], results['preview_convert_ms'] = _LivePath(camera, args.duration, (camera.width // 2, camera.height // 2))
+    return results
+
+
+def BenchScan(runner, args, directory):
+    from jcscan import ScanEngine
+    from jcstore import OpenScanStore
+
+    mask_motor = runner.mask_motor
+    scan = ScanEngine(mask_motor, runner.camera, log_signal=QuietLog, status_poller=runner.status_poller, trace=False)
+    store = OpenScanStore(directory, 'hdf5')
+    try:
+        stats = scan.StepScan(mask_motor.motor_z, "Z", 1.0, 1.0 + 0.01 * args.points, 0.01, store=store)
+    finally:
+        store.Close()
+    return {'scan_s_per_point': stats.wall_time / (args.points + 1)}
+
+
+def BenchWrite(runner, args, directory):
+    from jcstore import CreateScanStore, h5py
+
+    camera = runner.camera
+    # Converted RGB16 frames of the simulated scene, so compression sees realistic data
+    frames = []
+    while len(frames) < 4:
+        frame = camera.CaptureFrame(1000)
+        if frame is not None:
+            frames.append(frame.data)
+    metadata = {'position': 1.0, 'frame_id': 0, 'timestamp': 0, 'exposure_time': 1400.0, 'gain': 0.0}
+
+    results = {}
+    formats = [('raw', '.bin', None), ('raw_fast', '.bin', 'fast')]
+    if h5py is not None:
+        formats = [('hdf5', '.h5', None), ('hdf5_fast', '.h5', 'fast')] + formats
+    for name, extension, compression in formats:
+        store = CreateScanStore(os.path.join(directory, f"write_{name}{extension}"), compression)
+        start = time.perf_counter()
+        for index in range(args.frames):
+            store.Append(frames[index % len(frames)], metadata)
+        store.Close()
+        results[f"write_{name}_fps"] = args.frames / (time.perf_counter() - start)
+
+    images = [camera.ImageFromArray(frame, 'RGB16') for frame in frames]
+    start = time.perf_counter()
+    for index in range(args.frames):
+        camera.SaveImage(images[index % len(images)], os.path.join(directory, f"write_{index:03d}.png"))
+    results['write_png_fps'] = args.frames / (time.perf_counter() - start)
+    return results
+
+
+def BenchLog(args, directory):
+    from jclog import LogPipeline
+    try:
+        from jcgui import LogTableModel
+    except ImportError:
+        LogTableModel = None
+
+    pipeline = LogPipeline(os.path.join(directory, "bench.log"))
+    model = LogTableModel() if LogTableModel is not None else None
+    try:
+        start = time.perf_counter()
+        for index in range(args.messages):
+            pipeline.Log("INFO", "Benchmark", "Image acquired", f"Position: {index * 0.01:.2f} mm")
+            # The GUI drains the queue every 100 ms; here every 1000 messages
+            if index % 1000 == 999:
+                records = pipeline.Drain()
+                if model is not None:
+                    model.AppendRecords(records)
+        records = pipeline.Drain()
+        if model is not None:
+            model.AppendRecords(records)
+        elapsed = time.perf_counter() - start
+    finally:
+        pipeline.Close()
+    return {'log_messages_per_s': args.messages / elapsed}
+
+
+def Compare(results, baseline, tolerance=TOLERANCE):
+    """
+    :return: List of (metric, value, baseline value, change) for every
+             metric worse than the baseline by more than tolerance, change
+             being the fraction by which it is worse.
+    """
+    regressions = []
+    for name, value in results.items():
+        reference = baseline.get(name, {}).get('value')
+        if reference is None or not reference > 0 or not value == value:
+            continue
+        higher_is_better = METRICS[name][1]
+        change = (reference - value) / reference if higher_is_better else (value - reference) / reference
+        if change > tolerance:
+            regressions.append((name, value, reference, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the live view, scan, write and logging paths on the simulator")
+    parser.add_argument('--only', help=f"Comma separated suites to run, from {','.join(SUITES)}; all by default")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Baseline results to compare with, default %(default)s")
+    parser.add_argument('--save-baseline', action='store_true', help="Write the results to the baseline file instead of comparing")
+    parser.add_argument('-o', '--output', help="Also write the results to this file")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="Fraction a metric may be worse than the baseline, default %(default)s")
+    parser.add_argument('--duration', type=float, default=3.0, help="Seconds of live view per live benchmark")
+    parser.add_argument('--points', type=int, default=10, help="Steps of the scan benchmark")
+    parser.add_argument('--frames', type=int, default=20, help="Frames written per scan format")
+    parser.add_argument('--messages', type=int, default=20000, help="Messages logged by the log benchmark")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs of each suite, keeping the best value of every metric")
+    args = parser.parse_args()
+
+    suites = args.only.split(',') if args.only else list(SUITES)
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites {', '.join(sorted(unknown))}")
+
+    # Always the simulator: timings on real hardware depend on the hardware
+    os.environ['ALS_SIMULATE'] = '1'
+    from jcrun import ScanRunner
+
+    results = {}
+
+    def Keep(run):
+        # The best of the repeats is the least disturbed by the rest of the machine
+        for name, value in run.items():
+            best = results.get(name)
+            if best is None or (value > best if METRICS[name][1] else value < best):
+                results[name] = value
+
+    with tempfile.TemporaryDirectory() as directory:
+        runner = None
+        if set(suites) & {'live', 'scan', 'write'}:
+            runner = ScanRunner(log_signal=QuietLog)
+            runner.Connect()
+        try:
+            for _ in range(args.repeat):
+                if 'live' in suites:
+                    Keep(BenchLive(runner, args))
+                if 'scan' in suites:
+                    Keep(BenchScan(runner, args, directory))
+                if 'write' in suites:
+                    Keep(BenchWrite(runner, args, directory))
+        finally:
+            if runner is not None:
+                runner.Disconnect()
+        if 'log' in suites:
+            for _ in range(args.repeat):
+                Keep(BenchLog(args, directory))
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['metrics']
+    regressions = {name: change for name, _, _, change in Compare(results, baseline, args.tolerance)}
+
+    for name, value in results.items():
+        unit = METRICS[name][0]
+        line = f"{name:22s} {value:12.3f} {unit:11s}"
+        reference = baseline.get(name, {}).get('value')
+        if reference:
+            line += f" baseline {reference:12.3f}"
+            if name in regressions:
+                line += f"  REGRESSION {regressions[name] * 100:.0f}% worse"
+        print(line)
+
+    report = {'time': datetime.now().isoformat(), 'python': platform.python_version(), 'machine': platform.node(),
+              'metrics': {name: {'value': value, 'unit': METRICS[name][0], 'higher_is_better': METRICS[name][1]}
+                          for name, value in results.items()}}
+    for path in filter(None, (args.output, args.baseline if args.save_baseline else None)):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {path}")
+
+    if regressions:
+        print(f"{len(regressions)} metrics regressed beyond {args.tolerance * 100:.0f}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
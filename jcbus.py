@@ -0,0 +1,214 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jcbus.py
+
+    Frame bus in shared memory, so analysis running in other processes
+    (centroiding, focus metrics, archiving) sees every live frame without
+    the GIL or the GUI thread standing in its way. The acquisition side
+    copies each frame into the next slot of a ring in a
+    multiprocessing.shared_memory block; readers attach to the block by
+    name and get NumPy views straight onto the slots, no copy.
+
+    Layout: a header, a table with one entry per slot (sequence, frame ID,
+    camera timestamp, publish time, shape, dtype) and the slot data. A
+    slot's sequence is zeroed while it is written and set once the frame
+    is complete, so a reader checks it before and after using a view to
+    know the writer has not lapped it meanwhile. There is one writer.
+
+    python jcbus.py NAME    attach to a running bus and print each frame's
+                            centroid and the frame rate, as an example reader
+"""
+import argparse
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = 0x4A434652414D4553  # "JCFRAMES"
+VERSION = 1
+SLOTS = 8
+HEADER = np.dtype([('magic', '<u8'), ('version', '<u4'), ('slots', '<u4'), ('slot_bytes', '<u8'), ('sequence', '<u8')])
+SLOT = np.dtype([('sequence', '<u8'), ('frame_id', '<i8'), ('timestamp', '<i8'), ('time', '<f8'),
+                 ('shape', '<u4', 3), ('ndim', '<u4'), ('dtype', 'S8')])
+TABLE_OFFSET = 64
+ALIGNMENT = 4096
+
+_created = set()  # Buses created by this process
+
+
+def _Layout(slots, slot_bytes):
+    """:return: (data offset, slot stride, total bytes) of a bus."""
+    stride = -(-slot_bytes // 64) * 64
+    data_offset = -(-(TABLE_OFFSET + slots * SLOT.itemsize) // ALIGNMENT) * ALIGNMENT
+    return data_offset, stride, data_offset + slots * stride
+
+
+class FrameBus:
+    """The writing end, owned by the acquisition process."""
+    def __init__(self, name=None, slot_bytes=1440 * 1080 * 3, slots=SLOTS):
+        """
+        :param name: Shared memory name readers attach to; one is made up if None.
+        :param slot_bytes: Largest frame in bytes; larger frames are not published.
+        :param slots: Frames kept before the oldest is overwritten.
+        """
+        self.data_offset, self.stride, size = _Layout(slots, slot_bytes)
+        self.memory = shared_memory.SharedMemory(name, create=True, size=size)
+        self.name = self.memory.name
+        _created.add(self.name)
+        self.slot_bytes = slot_bytes
+        self.slots = slots
+        self.header = np.ndarray((), HEADER, self.memory.buf)
+        self.table = np.ndarray((slots,), SLOT, self.memory.buf, TABLE_OFFSET)
+        self.table[:] = 0
+        self.header['version'] = VERSION
+        self.header['slots'] = slots
+        self.header['slot_bytes'] = slot_bytes
+        self.header['sequence'] = 0
+        self.header['magic'] = MAGIC
+        self.sequence = 0
+        self.oversized = 0
+
+    def Publish(self, data, frame_id=0, timestamp=0):
+        """
+        Copy a frame into the next slot.
+
+        :param data: Array of up to 3 dimensions and slot_bytes bytes.
+        :return: Its sequence number, or None if it did not fit.
+        """
+        if data.nbytes > self.slot_bytes or data.ndim > 3:
+            self.oversized += 1
+            return None
+        self.sequence += 1
+        index = self.sequence % self.slots
+        entry = self.table[index]
+        entry['sequence'] = 0
+        offset = self.data_offset + index * self.stride
+        np.copyto(np.ndarray(data.shape, data.dtype, self.memory.buf, offset), data)
+        entry['frame_id'] = frame_id
+        entry['timestamp'] = timestamp
+        entry['time'] = time.time()
+        entry['shape'] = data.shape + (0,) * (3 - data.ndim)
+        entry['ndim'] = data.ndim
+        entry['dtype'] = data.dtype.str.encode()
+        # Completing the slot last publishes it
+        entry['sequence'] = self.sequence
+        self.header['sequence'] = self.sequence
+        return self.sequence
+
+    def Close(self):
+        """Remove the bus; attached readers keep their mapping until they close."""
+        del self.header, self.table
+        self.memory.close()
+        self.memory.unlink()
+        _created.discard(self.name)
+
+
+class BusFrame:
+    """A frame read off the bus: data is a view onto its slot, see Valid."""
+    def __init__(self, reader, index, entry, data):
+        self.reader = reader
+        self.index = index
+        self.sequence = int(entry['sequence'])
+        self.frame_id = int(entry['frame_id'])
+        self.timestamp = int(entry['timestamp'])
+        self.time = float(entry['time'])
+        self.data = data
+
+    def Valid(self):
+        """:return: True if the writer has not reused the slot since the frame was read, so results from data stand."""
+        return int(self.reader.table[self.index]['sequence']) == self.sequence
+
+
+class FrameBusReader:
+    """The reading end, in any process on the same machine."""
+    def __init__(self, name):
+        self.memory = shared_memory.SharedMemory(name)
+        # The bus belongs to the writer; without this the resource tracker would unlink it when the reader exits
+        if self.memory.name not in _created:
+            resource_tracker.unregister(self.memory._name, 'shared_memory')
+        self.header = np.ndarray((), HEADER, self.memory.buf)
+        if int(self.header['magic']) != MAGIC or int(self.header['version']) != VERSION:
+            self.memory.close()
+            raise ValueError(f"{name} is not a version {VERSION} frame bus")
+        self.slots = int(self.header['slots'])
+        self.data_offset, self.stride, _ = _Layout(self.slots, int(self.header['slot_bytes']))
+        self.table = np.ndarray((self.slots,), SLOT, self.memory.buf, TABLE_OFFSET)
+        self.last = 0
+        self.missed = 0   # Frames published that this reader never took
+
+    def Read(self, sequence):
+        """:return: BusFrame for sequence, or None if its slot is being written or was overwritten."""
+        index = sequence % self.slots
+        entry = self.table[index].copy()
+        if int(entry['sequence']) != sequence:
+            return None
+        # The entry may have been copied while the writer was refilling the slot
+        if int(self.table[index]['sequence']) != sequence:
+            return None
+        shape = tuple(int(size) for size in entry['shape'][:entry['ndim']])
+        data = np.ndarray(shape, np.dtype(entry['dtype'].decode()), self.memory.buf, self.data_offset + index * self.stride)
+        data.flags.writeable = False
+        return BusFrame(self, index, entry, data)
+
+    def Next(self, timeout=1.0, poll=0.001):
+        """
+        Wait for a frame newer than the last one taken and return the newest,
+        skipping any in between so a slow reader never falls behind.
+
+        :return: BusFrame, or None on timeout.
+        """
+        deadline = time.perf_counter() + timeout
+        while True:
+            sequence = int(self.header['sequence'])
+            if sequence > self.last:
+                frame = self.Read(sequence)
+                if frame is not None:
+                    if self.last:
+                        self.missed += sequence - self.last - 1
+                    self.last = sequence
+                    return frame
+            if time.perf_counter() >= deadline:
+                return None
+            time.sleep(poll)
+
+    def Close(self):
+        """Detach; any BusFrame still held must be dropped first, as its data maps the block."""
+        del self.header, self.table
+        self.memory.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Attach to a frame bus and print the centroid of each frame")
+    parser.add_argument('name', help="Shared memory name of the bus, the GUI's \"frame_bus\" setting")
+    parser.add_argument('--count', type=int, default=0, help="Frames to read, 0 to run until interrupted")
+    args = parser.parse_args()
+
+    reader = FrameBusReader(args.name)
+    taken = 0
+    frame = None
+    start = time.perf_counter()
+    try:
+        while not args.count or taken < args.count:
+            frame = reader.Next()
+            if frame is None:
+                continue
+            intensity = frame.data.sum(axis=2) if frame.data.ndim == 3 else frame.data.astype(np.float64)
+            total = intensity.sum(dtype=np.float64)
+            rows = np.arange(intensity.shape[0]) @ intensity.sum(axis=1, dtype=np.float64) / total if total else 0
+            columns = np.arange(intensity.shape[1]) @ intensity.sum(axis=0, dtype=np.float64) / total if total else 0
+            if not frame.Valid():
+                continue
+            taken += 1
+            print(f"Frame {frame.frame_id}: centroid x={columns:.1f}, y={rows:.1f}, "
+                  f"{taken / (time.perf_counter() - start):.1f} fps, missed {reader.missed}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        frame = None
+        reader.Close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
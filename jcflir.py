@@ -9,14 +9,24 @@
     **If your Matlab/LabView supports newer versions of Spinnaker (like 3.2.0.62)**
     **I would recommend updating to that version, for both Spinnaker/PySpin**
 """
+import importlib
+import math
 import numpy as np
-import PySpin
+
+from jcbackend import Register
+from jclatency import latency
+from jctrace import tracer
+from jcraw import BAYER_OFFSETS, ReduceBayer
 import psutil
 import socket
 import time
 import subprocess
 import ctypes
 import datetime
+import threading
+
+# PySpin loads on first use, not at import; jcsimflir.py stands in for it with ALS_SIMULATE set
+PySpin = Register("Spinnaker", lambda: importlib.import_module("PySpin"), lambda: importlib.import_module("jcsimflir"))
     
 class StreamMode:
     """
@@ -27,14 +37,206 @@ class StreamMode:
     STREAM_MODE_SOCKET = 2  # Socket is supported for MacOS and Linux, and uses native OS network sockets instead of a filter driver
 
 
+class FrameConverter:
+    """
+    Converts raw frames with one ImageProcessor kept for the life of the
+    converter, copying the result into a small ring of preallocated arrays
+    instead of allocating a new one per frame. A returned array stays valid
+    until pool_size further frames have been converted.
+    """
+    def __init__(self, pixel_format, algorithm, channels=3, dtype=np.uint8, pool_size=3):
+        self.pixel_format = pixel_format
+        self.channels = channels
+        self.dtype = dtype
+        self.pool_size = pool_size
+        self.buffers = []
+        self.index = 0
+        self.processor = PySpin.ImageProcessor()
+        self.SetAlgorithm(algorithm)
+
+    def SetAlgorithm(self, algorithm):
+        """
+        :param algorithm: Name of a color processing algorithm, e.g. 'HQ_LINEAR' or 'NEAREST_NEIGHBOR'.
+        """
+        self.algorithm = algorithm
+        self.processor.SetColorProcessing(getattr(PySpin, f"SPINNAKER_COLOR_PROCESSING_ALGORITHM_{algorithm}"))
+
+    def _NextBuffer(self, shape):
+        if not self.buffers or self.buffers[0].shape != shape:
+            self.buffers = [np.empty(shape, dtype=self.dtype) for _ in range(self.pool_size)]
+            self.index = 0
+        buffer = self.buffers[self.index]
+        self.index = (self.index + 1) % self.pool_size
+        return buffer
+
+    def ConvertImage(self, image_result):
+        """Convert and return the PySpin image, e.g. for saving."""
+        return self.processor.Convert(image_result, self.pixel_format)
+
+    def ConvertCopy(self, image_result):
+        """Convert into a newly allocated array the caller may keep."""
+        return np.array(self.processor.Convert(image_result, self.pixel_format).GetNDArray())
+
+    def Convert(self, image_result):
+        """Convert into the next pooled array and return it."""
+        width = image_result.GetWidth()
+        height = image_result.GetHeight()
+        shape = (height, width, self.channels) if self.channels > 1 else (height, width)
+        buffer = self._NextBuffer(shape)
+        image_converted = self.processor.Convert(image_result, self.pixel_format)
+        np.copyto(buffer, image_converted.GetData().reshape(shape))
+        return buffer
+
+
+class Frame:
+    """A converted frame tagged with the camera's frame ID and timestamp."""
+    def __init__(self, data, frame_id, timestamp):
+        self.data = data
+        self.height, self.width = data.shape[:2]
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.sequence = 0
+
+
+class FrameGrabber:
+    """
+    Pulls frames from the camera on a background thread so a slow or missing
+    frame never blocks the GUI thread. Converted frames land in the camera's
+    preview converter ring, sized by Camera's preview_ring, and the newest one
+    is published by a single reference assignment, so the reader never takes
+    a lock.
+
+    on_frame is called from the grabber thread when a frame is published and
+    the reader has caught up with the previous notification, so a slow reader
+    is never flooded. The reader calls Latest to take the newest frame.
+
+    Once SetDisplaySize is given the size of the view, frames much larger
+    than it are reduced with strided NumPy instead of demosaiced at full
+    size; live view never needs more pixels than it can show.
+
+    With a jcbus.FrameBus every grabbed frame is also published to it for
+    analysis in other processes, before the reader is notified.
+    """
+    def __init__(self, camera, on_frame=None, log_signal=None, bus=None):
+        self.camera = camera
+        self.on_frame = on_frame
+        self.bus = bus
+        self.converter = camera.preview_converter
+        self.log_signal = log_signal if log_signal else print
+
+        self.latest = None
+        self.pending = False
+        self.last_shown = 0
+        self.grabbed = 0
+        self.dropped = 0      # Frame IDs the camera produced that never reached this grabber
+        self.skipped = 0      # Frames grabbed but replaced before the reader took them
+        self.incomplete = 0
+        self.step = 1         # Stride of the preview reduction, 1 for full resolution
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def log(self, level, component, message, details=""):
+        self.log_signal(level, component, message, details)
+
+    def Start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._Run, name="FrameGrabber", daemon=True)
+        self.thread.start()
+
+    def Stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+            self.thread = None
+        self.log("INFO", "Camera", "Live view stopped", f"Grabbed={self.grabbed}, Dropped={self.dropped}, Skipped={self.skipped}, Incomplete={self.incomplete}")
+
+    def SetDisplaySize(self, width, height):
+        """
+        Reduce preview frames by the largest even stride that still fills a
+        view of width x height pixels. Only 8 bit formats are reduced; other
+        formats go through the converter at full size.
+        """
+        camera = self.camera
+        step = 1
+        if width > 0 and height > 0 and camera.pixel_format and camera.pixel_format.endswith('8'):
+            step = max(1, min(camera.width // width, camera.height // height))
+            if step > 1:
+                step -= step % 2
+        if step != self.step:
+            self.log("DEBUG", "Camera", "Preview reduction changed", f"Step={step}, Image={camera.width}x{camera.height}, View={width}x{height}")
+        self.step = step
+
+    def _Run(self):
+        last_id = None
+        while not self.stop_event.is_set():
+            try:
+                step = self.step
+                if step > 1:
+                    frame = self.camera.GrabPreviewFrame(step, self.converter)
+                else:
+                    frame = self.camera.GrabFrame(self.converter)
+            except PySpin.SpinnakerException as ex:
+                if not self.stop_event.is_set():
+                    self.log("WARNING", "Camera", "Frame grab failed", str(ex))
+                self.stop_event.wait(0.1)
+                continue
+
+            if frame is None:
+                self.incomplete += 1
+                continue
+            if last_id is not None and frame.frame_id > last_id + 1:
+                self.dropped += frame.frame_id - last_id - 1
+            last_id = frame.frame_id
+
+            self.grabbed += 1
+            frame.sequence = self.grabbed
+            if self.bus is not None:
+                latency.Timed('bus.publish', self.bus.Publish, frame.data, frame.frame_id, frame.timestamp)
+            self.latest = frame
+            if self.on_frame is not None and not self.pending:
+                self.pending = True
+                self.on_frame()
+
+    def Latest(self):
+        """
+        :return: The newest frame, or None if there is nothing newer than the last call.
+        :rtype: Frame
+        """
+        self.pending = False
+        frame = self.latest
+        if frame is None or frame.sequence == self.last_shown:
+            return None
+        self.skipped += frame.sequence - self.last_shown - 1
+        self.last_shown = frame.sequence
+        return frame
+
+
 class Camera:
-    def __init__(self, log_signal=None):
+    def __init__(self, log_signal=None, preview_algorithm="NEAREST_NEIGHBOR", save_algorithm="HQ_LINEAR", preview_ring=4):
+        """
+        :param preview_ring: Buffers in the live view converter's ring, so
+                             FrameGrabber publishes each one at most once per
+                             preview_ring frames.
+        """
+        self.log_signal = log_signal if log_signal else print
+        PySpin.Load(self.log_signal)
+
         # Retrieve singleton reference to system object
         self.system = PySpin.System.GetInstance()
         self.cam = None
         self.cam_list = None
-        self.processor = None
-        self.log_signal = log_signal if log_signal else print
+        self.clock_offset = None    # Seconds from camera timestamps to perf_counter, set by SyncClock
+        self.stale_frames = 0       # Frames discarded for exposing before a not_before time
+        self.trigger_source = None  # None while the camera runs freely, else 'Software' or an input line
+        self.pixel_format = None    # Symbolic format and size of the delivered images, read at connect
+        self.width = 0
+        self.height = 0
+        self.sensor_reduction = 1
+        self.node_trigger_software = None
+
+        # Live view and saved frames convert separately, so each keeps its own processor
+        self.preview_converter = FrameConverter(PySpin.PixelFormat_RGB8, preview_algorithm, pool_size=preview_ring)
+        self.save_converter = FrameConverter(PySpin.PixelFormat_RGB16, save_algorithm, dtype=np.uint16)
 
     def log(self, level, component, message, details=""):
         self.log_signal(level, component, message, details)
@@ -73,14 +275,7 @@ class Camera:
         self.RunSingleCamera()
         
         # Set buffer handling mode to NewestOnly
-        sNodemap = self.cam.GetTLStreamNodeMap()
-        node_bufferhandling_mode = PySpin.CEnumerationPtr(sNodemap.GetNode('StreamBufferHandlingMode'))
-        if PySpin.IsReadable(node_bufferhandling_mode) and PySpin.IsWritable(node_bufferhandling_mode):
-            node_newestonly = node_bufferhandling_mode.GetEntryByName('NewestOnly')
-            if PySpin.IsReadable(node_newestonly):
-                node_newestonly_mode = node_newestonly.GetValue()
-                node_bufferhandling_mode.SetIntValue(node_newestonly_mode)
-                self.log("INFO", "Camera", "Buffer handling mode set to NewestOnly")
+        self.SetBufferHandlingMode('NewestOnly')
 
         # Set acquisition mode to continuous
         nodemap = self.cam.GetNodeMap()
@@ -93,6 +288,9 @@ class Camera:
                 self.log("INFO", "Camera", "Acquisition mode set to continuous")
 
         self.cam.BeginAcquisition()
+        self.SyncClock()
+        self.pixel_format = self.GetPixelFormat()
+        self.width, self.height = self.GetImageSize()
 
     def DisconnectCamera(self):
         if hasattr(self, 'cam'):
@@ -110,6 +308,102 @@ class Camera:
         self.log("INFO", "Camera", "Camera disconnected and resources released")
 
 
+    def SetBufferHandlingMode(self, mode):
+        """
+        This function sets how the stream buffers treat frames not yet taken.
+        A running acquisition is restarted, which also discards every frame
+        already buffered.
+
+        :param mode: 'NewestOnly', 'NewestFirst', 'OldestFirst' or 'OldestFirstOverwrite'.
+        :return: The previous mode, or None if the mode could not be set.
+        :rtype: str
+        """
+        sNodemap = self.cam.GetTLStreamNodeMap()
+        node_bufferhandling_mode = PySpin.CEnumerationPtr(sNodemap.GetNode('StreamBufferHandlingMode'))
+        if not PySpin.IsReadable(node_bufferhandling_mode) or not PySpin.IsWritable(node_bufferhandling_mode):
+            return None
+        node_mode = node_bufferhandling_mode.GetEntryByName(mode)
+        if not PySpin.IsReadable(node_mode):
+            return None
+
+        previous = node_bufferhandling_mode.GetCurrentEntry().GetSymbolic()
+        streaming = self.cam.IsStreaming()
+        if streaming:
+            self.cam.EndAcquisition()
+        node_bufferhandling_mode.SetIntValue(node_mode.GetValue())
+        if streaming:
+            self.cam.BeginAcquisition()
+        self.log("INFO", "Camera", f"Buffer handling mode set to {mode}")
+        return previous
+
+
+    def SetTriggerMode(self, source=None):
+        """
+        This function chooses how exposures start. A running acquisition is
+        restarted, which also discards every frame already buffered.
+
+        :param source: None to run freely, 'Software' for one exposure per
+                       TriggerFrame call, or an input line such as 'Line0' for
+                       one exposure per rising edge on it.
+        :return: True if successful, False otherwise.
+        :rtype: bool
+        """
+        nodemap = self.cam.GetNodeMap()
+        node_trigger_mode = PySpin.CEnumerationPtr(nodemap.GetNode('TriggerMode'))
+        if not PySpin.IsReadable(node_trigger_mode) or not PySpin.IsWritable(node_trigger_mode):
+            self.log("ERROR", "Camera", "Unable to set trigger mode")
+            return False
+
+        streaming = self.cam.IsStreaming()
+        if streaming:
+            self.cam.EndAcquisition()
+        try:
+            # The trigger source can only be changed with the trigger off
+            node_trigger_mode.SetIntValue(node_trigger_mode.GetEntryByName('Off').GetValue())
+            self.trigger_source = None
+            self.node_trigger_software = None
+            if source is None:
+                self.log("INFO", "Camera", "Trigger mode off, camera runs freely")
+                return True
+
+            node_trigger_selector = PySpin.CEnumerationPtr(nodemap.GetNode('TriggerSelector'))
+            if PySpin.IsWritable(node_trigger_selector):
+                node_trigger_selector.SetIntValue(node_trigger_selector.GetEntryByName('FrameStart').GetValue())
+            node_trigger_source = PySpin.CEnumerationPtr(nodemap.GetNode('TriggerSource'))
+            node_source = node_trigger_source.GetEntryByName(source) if PySpin.IsWritable(node_trigger_source) else None
+            if not PySpin.IsReadable(node_source):
+                self.log("ERROR", "Camera", f"Unable to set trigger source {source}")
+                return False
+            node_trigger_source.SetIntValue(node_source.GetValue())
+            if source == 'Software':
+                self.node_trigger_software = PySpin.CCommandPtr(nodemap.GetNode('TriggerSoftware'))
+            node_trigger_mode.SetIntValue(node_trigger_mode.GetEntryByName('On').GetValue())
+            self.trigger_source = source
+            self.log("INFO", "Camera", f"Trigger mode on, source {source}")
+            return True
+        except PySpin.SpinnakerException as ex:
+            self.log("ERROR", "Camera", "Error setting trigger mode", str(ex))
+            return False
+        finally:
+            if streaming:
+                self.cam.BeginAcquisition()
+
+    def TriggerFrame(self):
+        """
+        Start one exposure with the software trigger.
+
+        :return: perf_counter time just before the trigger, which the frame's
+                 exposure starts after, or None if the camera is not in
+                 software trigger mode.
+        :rtype: float
+        """
+        if self.node_trigger_software is None:
+            return None
+        fired = time.perf_counter()
+        self.node_trigger_software.Execute()
+        return fired
+
+
     def SetStreamMode(self):
         """
         This function changes the stream mode
@@ -135,59 +429,101 @@ class Camera:
         return result
 
 
-    def AcquireImage(self, point, filename=None):
+    def CaptureImage(self, not_before=None):
         """
-        This function acquires and saves 10 images from a device.
+        This function grabs the next image and converts it to RGB16 without
+        saving it, so the save can happen on another thread.
 
-        :param cam: Camera to acquire images from.
-        :param nodemap: Device nodemap.
-        :param nodemap_tldevice: Transport layer device nodemap.
-        :type cam: CameraPtr
-        :type nodemap: INodeMap
-        :type nodemap_tldevice: INodeMap
-        :return: True if successful, False otherwise.
-        :rtype: bool
+        :param not_before: perf_counter time the exposure must start after, see NextImage.
+        :return: Converted image, or None if the image was incomplete or failed.
+        :rtype: ImagePtr
         """
-
-        self.log("INFO", "Camera", "Capturing high-quality image")
         try:
-            image_result = self.cam.GetNextImage(1000)
+            image_result = self.NextImage(1000, not_before)
             if image_result.IsIncomplete():
                 self.log("WARNING", "Camera", f"Image incomplete with image status {image_result.GetImageStatus()}")
+                image_result.Release()
                 return None
-            else:
-                self.processor = PySpin.ImageProcessor()
-                self.processor.SetColorProcessing(PySpin.SPINNAKER_COLOR_PROCESSING_ALGORITHM_HQ_LINEAR)
-                
-                # Convert to high-quality format (you can adjust based on your needs)
-                image_converted = self.processor.Convert(image_result, PySpin.PixelFormat_RGB16)
-                
-                """ 
-                    ====================================
-                    We Can implement our save logic here
-                    ====================================
-
-                """
-                # date_series_point.png
-                # 240721_0001_001.png
-                filename = 'Image Single Scan %d.png' % point
-                if filename:
-                    image_converted.Save(filename)
-                    self.log("INFO", "Camera", f"High-quality image saved", filename)
 
-                
-                # width = image_converted.GetWidth()
-                # height = image_converted.GetHeight()
-                image_data = image_converted.GetNDArray()
+            # Convert to high-quality format (you can adjust based on your needs)
+            image_converted = self.save_converter.ConvertImage(image_result)
+            image_result.Release()
+            return image_converted
+
+        except PySpin.SpinnakerException as ex:
+            self.log("ERROR", "Camera", "Error capturing high-quality image", str(ex))
+            return None
 
-                image_result.Release()
-                return image_data
 
+    def CaptureFrame(self, timeout=1000, raw=False, not_before=None, after_frame_id=None):
+        """
+        This function grabs the next image and converts it to an RGB16 array
+        owned by the returned Frame, for writing to a scan container.
+
+        :param raw: Keep the Bayer/mono data as delivered and skip conversion,
+                    leaving the demosaic to jcraw.BatchDemosaic.
+        :param not_before: perf_counter time the exposure must start after, e.g.
+                           when the stage settled; older frames are discarded.
+        :param after_frame_id: Discard frames with this ID or older.
+        :return: Frame, or None if the image was incomplete or failed.
+        :rtype: Frame
+        """
+        try:
+            frame = self.GrabFrame(None if raw else self.save_converter, timeout, copy=True, not_before=not_before, after_frame_id=after_frame_id)
+            if frame is None:
+                self.log("WARNING", "Camera", "Image incomplete")
+            return frame
         except PySpin.SpinnakerException as ex:
             self.log("ERROR", "Camera", "Error capturing high-quality image", str(ex))
             return None
 
 
+    def SaveImage(self, image_converted, filename):
+        """
+        This function saves an image returned by CaptureImage.
+
+        :return: True if successful, False otherwise.
+        :rtype: bool
+        """
+        try:
+            with tracer.Span('camera.save', filename=filename):
+                image_converted.Save(filename)
+            self.log("INFO", "Camera", f"High-quality image saved", filename)
+            return True
+        except PySpin.SpinnakerException as ex:
+            self.log("ERROR", "Camera", "Error saving high-quality image", str(ex))
+            return False
+
+
+    def AcquireImage(self, point, filename=None, not_before=None):
+        """
+        This function acquires and saves a single image from the device.
+
+        :param point: Scan point number used in the default filename.
+        :param filename: File to save to, defaults to 'Image Single Scan <point>.png'.
+        :param not_before: perf_counter time the exposure must start after, see NextImage.
+        :return: Image data, or None if the capture failed.
+        :rtype: numpy.ndarray
+        """
+
+        self.log("INFO", "Camera", "Capturing high-quality image")
+        image_converted = self.CaptureImage(not_before)
+        if image_converted is None:
+            return None
+
+        """ 
+            ====================================
+            We Can implement our save logic here
+            ====================================
+
+        """
+        # date_series_point.png
+        # 240721_0001_001.png
+        filename = filename or 'Image Single Scan %d.png' % point
+        self.SaveImage(image_converted, filename)
+        return image_converted.GetNDArray()
+
+
     def PrintDeviceInfo(self, nodemap_tldevice):
         """
         This function prints the device information of the camera from the transport
@@ -245,25 +581,127 @@ class Camera:
         return result
     
 
-    def GetFrame(self):
+    def NextImage(self, timeout=1000, not_before=None, after_frame_id=None):
+        """
+        Next image from the stream whose exposure started after not_before and
+        whose frame ID is above after_frame_id. Older images are released
+        unconverted and counted in stale_frames, so a caller waits exactly
+        until the first usable frame arrives.
+
+        The image timestamp is taken as the start of exposure and put on the
+        perf_counter clock with SyncClock's offset. Without it a frame only
+        counts as fresh once it arrives a full exposure and frame period
+        after not_before, or right after not_before if the exposure cannot be
+        read.
+
+        :return: ImagePtr, which the caller releases.
+        :raises PySpin.SpinnakerException: If no fresh image arrived within timeout ms.
+        """
+        deadline = time.perf_counter() + timeout / 1000
+        arrival_bound = None
+        if not_before is not None and self.clock_offset is None:
+            exposure = self.GetCameraSettings()['exposure_time'] / 1e6
+            frame_rate = self.GetFrameRate()
+            arrival_bound = not_before + (exposure if math.isfinite(exposure) else 0) + (1 / frame_rate if frame_rate > 0 else 0)
+        while True:
+            requested = time.perf_counter()
+            # A camera sending nothing but stale frames must still time out
+            if requested >= deadline:
+                raise PySpin.SpinnakerException(f"No fresh image within {timeout} ms, {self.stale_frames} stale frames discarded so far")
+            image_result = self.cam.GetNextImage(max(int((deadline - requested) * 1000), 1))
+            if after_frame_id is not None and image_result.GetFrameID() <= after_frame_id:
+                fresh = False
+            elif not_before is None:
+                fresh = True
+            elif self.clock_offset is not None:
+                fresh = image_result.GetTimeStamp() / 1e9 + self.clock_offset >= not_before
+            else:
+                fresh = time.perf_counter() >= arrival_bound
+            tracer.Add('camera.GetNextImage', requested, time.perf_counter(), {'frame_id': image_result.GetFrameID(), 'fresh': fresh})
+            if fresh:
+                return image_result
+            image_result.Release()
+            self.stale_frames += 1
+
+    def GrabFrame(self, converter, timeout=1000, copy=False, not_before=None, after_frame_id=None):
+        """
+        Grab the next frame and convert it with converter. With copy the frame
+        gets its own array, otherwise it lands in the converter's pool. With
+        no converter the frame holds a copy of the raw sensor data.
+
+        :param not_before: perf_counter time the exposure must start after, see NextImage.
+        :param after_frame_id: Discard frames with this ID or older.
+        :return: Frame, or None if the image was incomplete.
+        :raises PySpin.SpinnakerException: If no fresh image arrived within timeout ms.
+        """
+        start = time.perf_counter()
+        image_result = self.NextImage(timeout, not_before, after_frame_id)
+        grabbed = time.perf_counter()
+        latency.Record('camera.grab', grabbed - start, grabbed)
         try:
-            image_result = self.cam.GetNextImage(1000)
             if image_result.IsIncomplete():
-                self.log("WARNING", "Camera", f"Image incomplete with image status {image_result.GetImageStatus()}")
-                return None, None, None
+                return None
+            if converter is None:
+                # Raw sensor data exactly as delivered, no color processing
+                data = np.array(image_result.GetNDArray())
             else:
-                width = image_result.GetWidth()
-                height = image_result.GetHeight()
-                self.processor = PySpin.ImageProcessor()
-                self.processor.SetColorProcessing(PySpin.SPINNAKER_COLOR_PROCESSING_ALGORITHM_HQ_LINEAR)
-                image_converted = self.processor.Convert(image_result, PySpin.PixelFormat_RGB8)
-                image = image_converted.GetData().reshape(height, width, 3)
-                image_result.Release()
-                return image, width, height
+                data = converter.ConvertCopy(image_result) if copy else converter.Convert(image_result)
+            converted = time.perf_counter()
+            latency.Record('camera.convert', converted - grabbed, converted)
+            return Frame(data, image_result.GetFrameID(), image_result.GetTimeStamp())
+        finally:
+            image_result.Release()
+
+    def GrabPreviewFrame(self, step, converter, timeout=1000):
+        """
+        Grab the next frame for display at 1/step of its size. Bayer data is
+        reduced with strided NumPy (jcraw.ReduceBayer) rather than
+        demosaiced at full resolution, mono data simply decimated.
+
+        :param step: Even stride in pixels.
+        :param converter: Preview FrameConverter whose pooled RGB8 arrays receive the result.
+        :return: Frame, or None if the image was incomplete.
+        :raises PySpin.SpinnakerException: If no image arrived within timeout ms.
+        """
+        start = time.perf_counter()
+        image_result = self.NextImage(timeout)
+        grabbed = time.perf_counter()
+        latency.Record('camera.grab', grabbed - start, grabbed)
+        try:
+            if image_result.IsIncomplete():
+                return None
+            raw = image_result.GetNDArray()
+            out = converter._NextBuffer((raw.shape[0] // step, raw.shape[1] // step, 3))
+            if self.pixel_format[:7] in BAYER_OFFSETS:
+                ReduceBayer(raw, self.pixel_format, step, out)
+            else:
+                out[...] = raw[:out.shape[0] * step:step, :out.shape[1] * step:step, None]
+            converted = time.perf_counter()
+            latency.Record('camera.convert', converted - grabbed, converted)
+            return Frame(out, image_result.GetFrameID(), image_result.GetTimeStamp())
+        finally:
+            image_result.Release()
+
+    def GetFrame(self):
+        try:
+            frame = self.GrabFrame(self.preview_converter)
+            if frame is None:
+                self.log("WARNING", "Camera", "Image incomplete")
+                return None, None, None
+            return frame.data, frame.width, frame.height
         except PySpin.SpinnakerException as ex:
             self.log("ERROR", "Camera", "Error acquiring frame", str(ex))
             return None, None, None
 
+    def SetPreviewAlgorithm(self, algorithm):
+        """
+        Choose the demosaic used for live view, independently of saved frames.
+
+        :param algorithm: Name of a color processing algorithm, e.g. 'NEAREST_NEIGHBOR'.
+        """
+        self.preview_converter.SetAlgorithm(algorithm)
+        self.log("INFO", "Camera", f"Preview color processing set to {algorithm}")
+
     # Maybe I can pass nodemap?
     def SetGain(self, gain_value):
         try:
@@ -321,6 +759,118 @@ class Camera:
             self.log("ERROR", "Camera", "Error setting exposure time", str(ex))
             return False
         
+    def GetPixelFormat(self):
+        nodemap = self.cam.GetNodeMap()
+        node_pixel_format = PySpin.CEnumerationPtr(nodemap.GetNode('PixelFormat'))
+        return node_pixel_format.GetCurrentEntry().GetSymbolic()
+
+    def GetImageSize(self):
+        """
+        :return: (width, height) of the delivered images in pixels.
+        """
+        nodemap = self.cam.GetNodeMap()
+        return PySpin.CIntegerPtr(nodemap.GetNode('Width')).GetValue(), PySpin.CIntegerPtr(nodemap.GetNode('Height')).GetValue()
+
+    def SetSensorReduction(self, factor):
+        """
+        Have the sensor deliver 1/factor of its resolution in each direction,
+        by decimation where the camera supports it, otherwise binning. Saved
+        frames are reduced too, so set it back to 1 before a scan. A running
+        acquisition is restarted.
+
+        :return: The factor applied, 1 if the camera can do neither.
+        :rtype: int
+        """
+        nodemap = self.cam.GetNodeMap()
+        for mode in ('Decimation', 'Binning'):
+            nodes = [PySpin.CIntegerPtr(nodemap.GetNode(f"{mode}{direction}")) for direction in ('Horizontal', 'Vertical')]
+            if all(PySpin.IsReadable(node) and PySpin.IsAvailable(node) for node in nodes):
+                break
+        else:
+            return 1
+        factor = max(1, min([factor] + [node.GetMax() for node in nodes]))
+
+        streaming = self.cam.IsStreaming()
+        if streaming:
+            self.cam.EndAcquisition()
+        try:
+            for node in nodes:
+                node.SetValue(factor)
+            # The image grows back to the sensor's full size when the reduction is lifted
+            for name in ('Width', 'Height'):
+                node = PySpin.CIntegerPtr(nodemap.GetNode(name))
+                node.SetValue(node.GetMax())
+        except PySpin.SpinnakerException as ex:
+            self.log("ERROR", "Camera", f"Error setting {mode.lower()}", str(ex))
+            factor = self.sensor_reduction
+        finally:
+            if streaming:
+                self.cam.BeginAcquisition()
+        self.sensor_reduction = factor
+        self.width, self.height = self.GetImageSize()
+        self.log("INFO", "Camera", f"Sensor {mode.lower()} set to {factor}", f"Image={self.width}x{self.height}")
+        return factor
+
+    def GetFrameRate(self):
+        """
+        :return: Frames per second the camera delivers with its current settings.
+        """
+        nodemap = self.cam.GetNodeMap()
+        node_frame_rate = PySpin.CFloatPtr(nodemap.GetNode('AcquisitionResultingFrameRate'))
+        return node_frame_rate.GetValue() if PySpin.IsReadable(node_frame_rate) else float('nan')
+
+    def SyncClock(self, samples=5):
+        """
+        Relate the camera's image timestamps to time.perf_counter by latching
+        the camera clock between two host clock reads, keeping the quickest of
+        a few round trips. The offset is kept in clock_offset for NextImage;
+        call again now and then, as the two clocks drift apart.
+
+        :return: Seconds to add to an image timestamp (converted to seconds) to
+                 get perf_counter time, or None if the camera cannot latch.
+        :rtype: float
+        """
+        nodemap = self.cam.GetNodeMap()
+        node_latch = PySpin.CCommandPtr(nodemap.GetNode('TimestampLatch'))
+        node_latch_value = PySpin.CIntegerPtr(nodemap.GetNode('TimestampLatchValue'))
+        if not PySpin.IsWritable(node_latch) or not PySpin.IsReadable(node_latch_value):
+            self.log("WARNING", "Camera", "Camera cannot latch its timestamp")
+            return None
+
+        best = None
+        for _ in range(samples):
+            before = time.perf_counter()
+            node_latch.Execute()
+            after = time.perf_counter()
+            offset = (before + after) / 2 - node_latch_value.GetValue() / 1e9
+            if best is None or after - before < best[0]:
+                best = (after - before, offset)
+        self.clock_offset = best[1]
+        self.log("INFO", "Camera", "Camera clock synchronised", f"Round trip={best[0] * 1000:.2f} ms")
+        return best[1]
+
+    def ImageFromArray(self, data, pixel_format):
+        """
+        Wrap raw sensor data copied out of an image, e.g. by GrabFrame with no
+        converter, so it can be converted or saved later.
+
+        :param pixel_format: Symbolic pixel format of the data, e.g. 'BayerRG8'.
+        :rtype: ImagePtr
+        """
+        height, width = data.shape[:2]
+        return PySpin.Image.Create(width, height, 0, 0, getattr(PySpin, f"PixelFormat_{pixel_format}"), data)
+
+    def GetCameraSettings(self):
+        """
+        :return: Dict of the current exposure_time (microseconds) and gain (dB).
+        """
+        nodemap = self.cam.GetNodeMap()
+        settings = {}
+        for key, name in (('exposure_time', 'ExposureTime'), ('gain', 'Gain')):
+            node = PySpin.CFloatPtr(nodemap.GetNode(name))
+            settings[key] = node.GetValue() if PySpin.IsReadable(node) else float('nan')
+        return settings
+
     def SetCameraSettings(self, gain_value, exposure_time):
         self.log("INFO", "Camera", "Configuring camera settings")
 
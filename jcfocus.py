@@ -0,0 +1,159 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jcfocus.py
+
+    Autofocus on the Z mirror stage. Sharpness is measured with NumPy on a
+    decimated region of interest of each raw frame, as the variance of the
+    Laplacian or the Tenengrad gradient energy. A coarse sweep brackets the
+    sharpest position and a golden-section search narrows the bracket, so
+    focus is found in about a dozen frames rather than a full scan.
+"""
+import math
+import time
+
+import numpy as np
+
+FOCUS_METHODS = ('laplacian', 'tenengrad')
+GOLDEN = (math.sqrt(5) - 1) / 2
+FRAME_ATTEMPTS = 3  # Incomplete frames tolerated at a position before giving up
+
+
+def FocusMetric(image, method='laplacian', roi=None, decimate=2):
+    """
+    Sharpness of an image, higher is sharper.
+
+    :param image: Array of shape (height, width) or (height, width, channels); channels are averaged.
+    :param method: 'laplacian' for the variance of the Laplacian, 'tenengrad' for the mean squared Sobel gradient.
+    :param roi: (x, y, width, height) in pixels, defaults to the central half of the image.
+    :param decimate: Use every decimate-th pixel in each direction. An even value
+                     on Bayer data keeps a single colour site.
+    :rtype: float
+    """
+    height, width = image.shape[:2]
+    if roi is None:
+        roi = (width // 4, height // 4, width // 2, height // 2)
+    x, y, w, h = roi
+    # Start on an even pixel so decimated Bayer data stays on one colour
+    x -= x % 2
+    y -= y % 2
+    region = image[y:y + h:decimate, x:x + w:decimate]
+    if region.ndim == 3:
+        region = region.mean(axis=2, dtype=np.float32)
+    region = region.astype(np.float32)
+
+    if method == 'laplacian':
+        laplacian = region[:-2, 1:-1] + region[2:, 1:-1] + region[1:-1, :-2] + region[1:-1, 2:] - 4 * region[1:-1, 1:-1]
+        return float(laplacian.var())
+    if method == 'tenengrad':
+        gx = (region[:-2, 2:] + 2 * region[1:-1, 2:] + region[2:, 2:]) - (region[:-2, :-2] + 2 * region[1:-1, :-2] + region[2:, :-2])
+        gy = (region[2:, :-2] + 2 * region[2:, 1:-1] + region[2:, 2:]) - (region[:-2, :-2] + 2 * region[:-2, 1:-1] + region[:-2, 2:])
+        return float(np.mean(gx * gx + gy * gy))
+    raise ValueError(f"Unknown focus method {method}, expected one of {', '.join(FOCUS_METHODS)}")
+
+
+class FocusResult:
+    """Outcome of an autofocus run: the position found, its metric and the cost."""
+    def __init__(self, position, metric, frames, elapsed, samples):
+        self.position = position
+        self.metric = metric
+        self.frames = frames
+        self.elapsed = elapsed
+        self.samples = samples    # Dict of position to metric, every position measured
+
+    def __repr__(self):
+        return f"FocusResult(position={self.position:.4f}, metric={self.metric:.4g}, frames={self.frames}, elapsed={self.elapsed:.2f})"
+
+
+class Autofocus:
+    def __init__(self, mask_motor, camera, method='laplacian', roi=None, decimate=2, log_signal=None):
+        if method not in FOCUS_METHODS:
+            raise ValueError(f"Unknown focus method {method}, expected one of {', '.join(FOCUS_METHODS)}")
+        self.mask_motor = mask_motor
+        self.camera = camera
+        self.method = method
+        self.roi = roi
+        self.decimate = decimate
+        self.log_signal = log_signal if log_signal else print
+        self.samples = {}
+        self.frames = 0
+
+    def log(self, level, component, message, details=""):
+        self.log_signal(level, component, message, details)
+
+    def Measure(self, motor, position, axis_name, cached=True):
+        """
+        Move to position and return the focus metric of a frame taken there.
+
+        :param cached: Return the metric of a position already measured without moving.
+        """
+        if cached and position in self.samples:
+            return self.samples[position]
+        self.mask_motor.MoveMotor(motor, position, axis_name)
+        # No frame exposed while the stage moved is used
+        settled = time.perf_counter()
+        frame = None
+        for _ in range(FRAME_ATTEMPTS):
+            frame = self.camera.CaptureFrame(1000, True, settled)
+            if frame is not None:
+                break
+        if frame is None:
+            raise RuntimeError(f"No complete frame at {position:.4f} mm")
+        metric = FocusMetric(frame.data, self.method, self.roi, self.decimate)
+        self.samples[position] = metric
+        self.frames += 1
+        self.log("INFO", "Autofocus", "Focus measured", f"Position={position:.4f} mm, Metric={metric:.4g}")
+        return metric
+
+    def Run(self, lower, upper, axis_name="Z", tolerance=0.02, coarse_points=5):
+        """
+        Find the sharpest position between lower and upper and move there.
+
+        :param tolerance: mm, width of the bracket at which the search stops.
+        :param coarse_points: Evenly spaced positions measured first to bracket the peak.
+        :rtype: FocusResult
+        """
+        motor = self.mask_motor.GetMotor(axis_name)
+        start = time.perf_counter()
+        self.samples = {}
+        self.frames = 0
+        self.camera.SyncClock()
+
+        # Coarse sweep, then bracket the best position by its neighbours
+        grid = [float(position) for position in np.linspace(lower, upper, coarse_points)]
+        metrics = [self.Measure(motor, position, axis_name) for position in grid]
+        best = int(np.argmax(metrics))
+        a, b = grid[max(best - 1, 0)], grid[min(best + 1, len(grid) - 1)]
+
+        # Golden-section search, one new frame per iteration
+        c, d = b - GOLDEN * (b - a), a + GOLDEN * (b - a)
+        fc, fd = self.Measure(motor, c, axis_name), self.Measure(motor, d, axis_name)
+        while b - a > tolerance:
+            if fc > fd:
+                b, d, fd = d, c, fc
+                c = b - GOLDEN * (b - a)
+                fc = self.Measure(motor, c, axis_name)
+            else:
+                a, c, fc = c, d, fd
+                d = a + GOLDEN * (b - a)
+                fd = self.Measure(motor, d, axis_name)
+
+        # The peak is usually a position already measured, but the stage must end up there
+        metric = self.Measure(motor, self.PeakPosition(a, b), axis_name, cached=False)
+        position = self.mask_motor.GetPositionValue(motor)
+        result = FocusResult(position, metric, self.frames, time.perf_counter() - start, dict(self.samples))
+        self.log("INFO", "Autofocus", "Focus found", f"Position={position:.4f} mm, Frames={result.frames}, Time={result.elapsed:.2f} s")
+        return result
+
+    def PeakPosition(self, a, b):
+        """Vertex of a parabola through the three best samples, kept within [a, b]."""
+        (x0, y0), (x1, y1), (x2, y2) = sorted(sorted(self.samples.items(), key=lambda item: item[1])[-3:])
+        denominator = (x0 - x1) * (x0 - x2) * (x1 - x2)
+        if denominator == 0:
+            return (a + b) / 2
+        p = (x2 * (y1 - y0) + x1 * (y0 - y2) + x0 * (y2 - y1)) / denominator
+        q = (x2 * x2 * (y0 - y1) + x1 * x1 * (y2 - y0) + x0 * x0 * (y1 - y2)) / denominator
+        if p >= 0:
+            # Not a peak, take the middle of the final bracket
+            return (a + b) / 2
+        return min(max(-q / (2 * p), a), b)
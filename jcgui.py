@@ -9,25 +9,83 @@
     **If your Matlab/LabView supports newer versions of Spinnaker (like 3.2.0.62)**
     **I would recommend updating to that version, for both Spinnaker/PySpin**
 """
+import os
 import sys
 import json
-import PySpin
 import threading
-from jckcube import MaskMotor
-from jcflir import Camera
-from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QVBoxLayout, QWidget, QHBoxLayout, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QGroupBox, QFormLayout, QGridLayout, QProgressBar
-from PyQt5.QtGui import QImage, QPixmap
-from PyQt5.QtCore import QTimer, Qt, pyqtSignal
+import time
 from datetime import datetime
+from jckcube import MaskMotor, StatusPoller
+from jcflir import Camera, FrameGrabber
+from jcscan import ScanEngine
+from jcplan import LoadPoints
+from jcfocus import Autofocus
+from jclog import LogPipeline
+from jcstore import NextScanName, OpenScanStore
+from jcraw import BatchDemosaic
+from jclatency import latency
+from jcbus import FrameBus
+from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QVBoxLayout, QWidget, QHBoxLayout, QLineEdit, QPushButton, QTableView, QHeaderView, QGroupBox, QFormLayout, QGridLayout, QProgressBar, QCheckBox, QFileDialog
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QAbstractTableModel, QModelIndex
 
 SETTINGS_FILE = "settings.txt"
+LOG_FILE = "als_motor_controls.log"
+
+
+class LogTableModel(QAbstractTableModel):
+    """
+    Table model over the most recent max_rows log records. Older records are
+    dropped from the view as new batches arrive; the log file keeps them all.
+    """
+    HEADERS = ["Timestamp", "Logger", "Component", "Message", "Details"]
+
+    def __init__(self, max_rows=5000, parent=None):
+        super().__init__(parent)
+        self.max_rows = max_rows
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self.rows[index.row()][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def AppendRecords(self, records):
+        records = records[-self.max_rows:]
+        overflow = len(self.rows) + len(records) - self.max_rows
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            del self.rows[:overflow]
+            self.endRemoveRows()
+
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        self.rows.extend(records)
+        self.endInsertRows()
+
 
 class CameraGUI(QMainWindow):
     # Define a signal for progress updates
     progress_signal = pyqtSignal(int)
+    # Raised by the frame grabber thread when a new frame is ready
+    frame_signal = pyqtSignal()
 
     def __init__(self):
         super().__init__()
+        # Logging is safe from any thread, the table is updated in batches by log_timer
+        self.log_pipeline = LogPipeline(LOG_FILE)
+
         self.serial_no_x = str('27263196')
         self.serial_no_y = str('27263127') 
         self.serial_no_z = str('28252438')
@@ -68,20 +126,36 @@ class CameraGUI(QMainWindow):
         self.right_layout.addWidget(self.image_label, 1)  # Make the image expandable
 
         # Info bar below the image, I still need to implement the cursor logic for this feature
+        info_layout = QHBoxLayout()
         self.info_bar = QLabel("Cursor Position: X:0, Y:0 | Zoom Level: 100% | FPS: 0")
-        self.right_layout.addWidget(self.info_bar)
-
-        self.log_table = QTableWidget(0, 5)  # 0 rows initially, 5 columns
-        self.log_table.setHorizontalHeaderLabels(["Timestamp", "Logger", "Component", "Message", "Details"])
+        info_layout.addWidget(self.info_bar, 1)
+        # Rolling latency percentiles of every stage, written to a JSON file
+        self.save_timings_btn = QPushButton("Save Timings...")
+        self.save_timings_btn.clicked.connect(self.SaveTimings)
+        info_layout.addWidget(self.save_timings_btn)
+        self.right_layout.addLayout(info_layout)
+        self.info_timer = QTimer(self)
+        self.info_timer.timeout.connect(self.UpdateInfoBar)
+        self.info_timer.start(1000)
+
+        self.log_model = LogTableModel()
+        self.log_table = QTableView()
+        self.log_table.setModel(self.log_model)
         self.log_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.log_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self.right_layout.addWidget(self.log_table)
 
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.FlushLog)
+        self.log_timer.start(100)  # Move queued log records into the table every 100 ms
+
         # Default motor
         self.mask_motor = MaskMotor(self.serial_no_x, self.serial_no_y, self.serial_no_z, log_signal=self.log_message)
         self.InitCameraSettings()
 
         # Connect the progress signal to the slot method
         self.progress_signal.connect(self.UpdateProgressBar)
+        self.frame_signal.connect(self.UpdateFrame)
 
 
     def InitControlPanel(self):
@@ -179,6 +253,10 @@ class CameraGUI(QMainWindow):
         z_step_size_layout.addWidget(self.save_z_step_size_btn)
         mirror_layout.addLayout(z_step_size_layout)
 
+        # Search around the current Z position for the sharpest image
+        self.autofocus_btn = QPushButton("Autofocus")
+        mirror_layout.addWidget(self.autofocus_btn)
+
         mirror_group.setLayout(mirror_layout)
         control_layout.addWidget(mirror_group)
 
@@ -204,9 +282,17 @@ class CameraGUI(QMainWindow):
         scan_step_size_layout.addWidget(self.scan_step_size_input)
         scan_layout.addLayout(scan_step_size_layout)
 
+        # Sweep Z at constant velocity with the camera running instead of stopping at each point
+        self.fly_scan_checkbox = QCheckBox("Fly Scan")
+        scan_layout.addWidget(self.fly_scan_checkbox)
+
         self.scan_btn = QPushButton("Start Scan")
         scan_layout.addWidget(self.scan_btn)
 
+        # Image a list of X, Y, Z sites loaded from a file, in the quickest order
+        self.point_scan_btn = QPushButton("Scan Point List...")
+        scan_layout.addWidget(self.point_scan_btn)
+
         # Add a progress bar
         self.progress_bar = QProgressBar()
         self.progress_bar.setValue(0)
@@ -232,8 +318,10 @@ class CameraGUI(QMainWindow):
         
         self.save_xy_step_size_btn.clicked.connect(lambda: self.SaveStepSize("XY"))
         self.save_z_step_size_btn.clicked.connect(lambda: self.SaveStepSize("Z"))
+        self.autofocus_btn.clicked.connect(self.StartAutofocus)
         
         self.scan_btn.clicked.connect(self.StartScan)
+        self.point_scan_btn.clicked.connect(self.StartPointScan)
         self.start_btn.clicked.connect(self.StartHardware)
         self.stop_btn.clicked.connect(self.StopHardware)
 
@@ -248,14 +336,18 @@ class CameraGUI(QMainWindow):
             self.mask_motor.ConnectAllMotors()
             self.log_message("INFO", "Initialization", "Motors connected", f"Serial numbers: X={self.serial_no_x}, Y={self.serial_no_y}, Z={self.serial_no_z}")
 
-            # Start the timers after initialization
-            self.timer = QTimer(self)
-            self.timer.timeout.connect(self.UpdateFrame)
-            self.timer.start(33)  # Update every ~33 ms (30 fps)
+            # Frames are grabbed on a background thread and shown as they arrive
+            self.frame_grabber = FrameGrabber(self.camera, on_frame=self.frame_signal.emit, log_signal=self.log_message, bus=self.OpenFrameBus())
+            self.ApplyPreviewReduction()
+            self.frame_grabber.Start()
 
+            # Motor status is read on a background thread; the timer only shows its newest snapshot
+            self.status_poller = StatusPoller(self.mask_motor, self.settings.get('status_interval', 0.1), log_signal=self.log_message)
+            self.status_poller.Start()
+            self.shown_snapshot = 0
             self.position_timer = QTimer(self)
             self.position_timer.timeout.connect(self.UpdatePositions)
-            self.position_timer.start(500)  # Update positions every second
+            self.position_timer.start(int(self.status_poller.interval * 1000))
         except Exception as e:
             self.log_message("ERROR", "Initialization", "Failed to initialize hardware", str(e))
 
@@ -343,19 +435,41 @@ class CameraGUI(QMainWindow):
             self.log_message("INFO", "MotorControl", f"{axis} motor moved to absolute position", f"Position: {position} mm")
 
         except ValueError:
-            self.log_message("ERROR", "MotorControl", "Invalid input", "Please enter valid number", "Range: 0 - 50")
+            self.log_message("ERROR", "MotorControl", "Invalid input", "Please enter valid number, Range: 0 - 50")
         except Exception as e:
             self.log_message("ERROR", "MotorControl", "Move failed", str(e))
 
 
+    def StartAutofocus(self):
+        autofocus_thread = threading.Thread(target=self.AutofocusThread)
+        autofocus_thread.start()
+
+
+    def AutofocusThread(self):
+        paused = False
+        try:
+            # Focus is judged on full resolution frames
+            paused = self.BeginCameraScan(triggered=False)
+            # Search autofocus_range mm centred on the current position
+            search_range = self.settings.get('autofocus_range', 0.5)
+            position = self.mask_motor.GetPositionValue(self.mask_motor.motor_z)
+            autofocus = Autofocus(self.mask_motor, self.camera, self.settings.get('focus_metric', 'laplacian'), log_signal=self.log_message)
+            autofocus.Run(position - search_range / 2, position + search_range / 2, "Z")
+        except Exception as e:
+            self.log_message("ERROR", "Autofocus", "Autofocus failed", str(e))
+        finally:
+            self.EndCameraScan(paused)
+
+
     def StartScan(self):
         try:
             start_position = float(self.start_position_input.text())
             target_position = float(self.target_position_input.text())
             step_size = float(self.scan_step_size_input.text())
+            fly = self.fly_scan_checkbox.isChecked()
 
             # Start scan in a separate thread
-            scan_thread = threading.Thread(target=self.ScanThread, args=(start_position, target_position, step_size))
+            scan_thread = threading.Thread(target=self.ScanThread, args=(start_position, target_position, step_size, fly))
             scan_thread.start()
 
         except ValueError:
@@ -364,48 +478,29 @@ class CameraGUI(QMainWindow):
             self.log_message("ERROR", "ScanMode", "Scan failed", str(e))
 
 
-    def ScanThread(self, start_position, target_position, step_size):
+    def ScanThread(self, start_position, target_position, step_size, fly=False):
         try: 
             current_motor = self.mask_motor.motor_z
             axis = "Z"
 
-            # Save step size
-            self.mask_motor.SetJogParams(current_motor, step_size)
-            self.log_message("INFO", "ScanMode", f"Jog step size set for {axis} scan", f"Step size: {step_size} mm")
-
-            self.mask_motor.MoveMotor(current_motor, start_position, axis)
-
-            # Calculate the number of steps
-            num_steps = int(abs(target_position - start_position) / step_size)
-
-            # Determine the direction of scan
-            direction = "forward" if target_position > start_position else "backward"
-
-            for step in range(num_steps + 1):
-                if step == 0:
-                    self.camera.AcquireImage(step + 1)
-                    current_position = self.mask_motor.GetPosition(current_motor)
-                    self.log_message("INFO", "ScanMode", "Image acquired", f"Position: {current_position} mm")
-                else:
-                    if direction == "forward":
-                        self.mask_motor.ForwardJogMotor(current_motor)
-                    else:
-                        self.mask_motor.BackwardJogMotor(current_motor)
-
-                    current_position = self.mask_motor.GetPosition(current_motor)
-                    #self.log_message("INFO", "ScanMode", "Motor jogged to position", f"Position: {current_position} mm")
-
-                    # Acquire image
-                    """
-                        ================================
-                        We can apply our save logic here
-                        ================================
-                    """
-                    self.camera.AcquireImage(step + 1)
-                    self.log_message("INFO", "ScanMode", "Image acquired", f"Position: {current_position} mm")
-                            # Update progress
-                progress_value = int((step / num_steps) * 100)
-                self.progress_signal.emit(progress_value)
+            attributes = {'axis': axis, 'start_position': start_position, 'target_position': target_position, 'step_size': step_size,
+                          'scan_mode': 'fly' if fly else 'step'}
+            store, filename_pattern, raw = self.OpenScanOutput(attributes)
+
+            scan = ScanEngine(self.mask_motor, self.camera, log_signal=self.log_message,
+                              average=self.settings.get('frames_per_point', 1), reduction=self.settings.get('frame_reduction', 'mean'),
+                              status_poller=self.status_poller, trace=self.settings.get('scan_trace', True))
+            paused = self.BeginCameraScan(fly)
+            try:
+                run = scan.FlyScan if fly else scan.StepScan
+                run(current_motor, axis, start_position, target_position, step_size, progress=self.progress_signal.emit,
+                    filename_pattern=filename_pattern, store=store, raw=raw)
+            finally:
+                if store:
+                    store.Close()
+                self.EndCameraScan(paused)
+
+            self.FinishScanOutput(store, raw)
 
             # Reset progress bar
             self.log_message("INFO", "ScanMode", "Scan complete", "")
@@ -416,33 +511,195 @@ class CameraGUI(QMainWindow):
             self.log_message("ERROR", "ScanMode", "Scan failed", str(e))
             
 
+    def OpenScanOutput(self, attributes):
+        """
+        Open the container for a new scan as set in the settings.
+
+        :return: (store, filename_pattern, raw): store is None when saving PNGs named by filename_pattern.
+        """
+        # Frames go to one scan container (or date_series_point.png files) written in the background
+        raw = self.settings.get('raw_capture', False)
+        if raw:
+            attributes['pixel_format'] = self.camera.GetPixelFormat()
+        store = OpenScanStore('.', self.settings.get('scan_format', 'hdf5'), self.settings.get('scan_compression'), attributes)
+        filename_pattern = NextScanName('.') + '_%03d.png'
+        self.log_message("INFO", "ScanMode", "Scan output", store.path if store else filename_pattern)
+        if raw and store is None:
+            self.log_message("WARNING", "ScanMode", "Raw capture needs a scan container", "Saving converted PNGs")
+            raw = False
+        return store, filename_pattern, raw
+
+
+    def OpenFrameBus(self):
+        """
+        Publish live frames to shared memory named by the "frame_bus"
+        setting (default null, off) for analysis processes, see jcbus.
+
+        :return: The FrameBus, or None.
+        """
+        name = self.settings.get('frame_bus')
+        if not name:
+            return None
+        try:
+            # Sized for an RGB8 frame at the full sensor size
+            self.frame_bus = FrameBus(name, self.camera.width * self.camera.height * 3, self.settings.get('frame_bus_slots', 8))
+        except (OSError, ValueError) as e:
+            self.log_message("ERROR", "Initialization", "Failed to open frame bus", str(e))
+            return None
+        self.log_message("INFO", "Initialization", "Frame bus open", f"Name={self.frame_bus.name}, Slots={self.frame_bus.slots}")
+        return self.frame_bus
+
+
+    def ApplyPreviewReduction(self):
+        """
+        Size live view to the image label. The "preview_sensor_reduction"
+        setting, 1 by default, additionally has the camera decimate or bin
+        by that factor while only live view is running.
+        """
+        factor = int(self.settings.get('preview_sensor_reduction', 1))
+        if factor != self.camera.sensor_reduction:
+            self.camera.SetSensorReduction(factor)
+        self.frame_grabber.SetDisplaySize(self.image_label.width(), self.image_label.height())
+
+
+    def BeginCameraScan(self, fly=False, triggered=True):
+        """
+        Hand the camera to a scan. Live view pauses for every scan and
+        autofocus run, so the grabber never takes frames the scan is waiting
+        for. Stepping scans use the "trigger_source" setting: null to run
+        freely, "Software", or an input line such as "Line0". Saved frames
+        are always full resolution, so sensor reduction for live view is
+        lifted for the scan.
+
+        :param triggered: False to leave the camera running freely, e.g. for autofocus.
+        :return: True if live view was paused, for EndCameraScan.
+        """
+        if not hasattr(self, 'frame_grabber'):
+            return False
+        trigger = self.settings.get('trigger_source') if triggered and not fly else None
+        reduced = self.camera.sensor_reduction > 1
+        self.frame_grabber.Stop()
+        if reduced:
+            self.camera.SetSensorReduction(1)
+        if trigger:
+            self.camera.SetTriggerMode(trigger)
+        return True
+
+
+    def EndCameraScan(self, paused):
+        if not paused:
+            return
+        if self.camera.trigger_source is not None:
+            self.camera.SetTriggerMode(None)
+        self.ApplyPreviewReduction()
+        self.frame_grabber.Start()
+
+
+    def FinishScanOutput(self, store, raw):
+        if raw:
+            # Demosaic the whole scan in the background once it is written
+            threading.Thread(target=BatchDemosaic, args=(store.path,), kwargs={'log_signal': self.log_message}, daemon=True).start()
+
+
+    def StartPointScan(self):
+        filename, _ = QFileDialog.getOpenFileName(self, "Load Point List", "", "Point lists (*.csv *.txt);;All files (*)")
+        if not filename:
+            return
+        try:
+            points = LoadPoints(filename)
+        except (OSError, ValueError) as e:
+            self.log_message("ERROR", "ScanMode", "Invalid point list", str(e))
+            return
+        if not points:
+            self.log_message("WARNING", "ScanMode", "Point list is empty", filename)
+            return
+
+        # Start scan in a separate thread
+        scan_thread = threading.Thread(target=self.PointScanThread, args=(points, filename))
+        scan_thread.start()
+
+
+    def PointScanThread(self, points, filename):
+        try:
+            scan = ScanEngine(self.mask_motor, self.camera, log_signal=self.log_message,
+                              average=self.settings.get('frames_per_point', 1), reduction=self.settings.get('frame_reduction', 'mean'),
+                              status_poller=self.status_poller, trace=self.settings.get('scan_trace', True))
+            plan = scan.PlanPoints(points)
+            store, filename_pattern, raw = self.OpenScanOutput({'scan_mode': 'points', 'point_list': os.path.basename(filename)})
+            paused = self.BeginCameraScan()
+            try:
+                scan.PointScan(plan, progress=self.progress_signal.emit, filename_pattern=filename_pattern, store=store, raw=raw)
+            finally:
+                if store:
+                    store.Close()
+                self.EndCameraScan(paused)
+            self.FinishScanOutput(store, raw)
+
+            # Reset progress bar
+            self.log_message("INFO", "ScanMode", "Scan complete", "")
+            self.progress_signal.emit(0)
+        except Exception as e:
+            self.log_message("ERROR", "ScanMode", "Scan failed", str(e))
+
+
     def log_message(self, level, component, message, details=""):
-        logger = level
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        row_position = self.log_table.rowCount()
-        self.log_table.insertRow(row_position)
-        self.log_table.setItem(row_position, 0, QTableWidgetItem(timestamp))
-        self.log_table.setItem(row_position, 1, QTableWidgetItem(logger))
-        self.log_table.setItem(row_position, 2, QTableWidgetItem(component))
-        self.log_table.setItem(row_position, 3, QTableWidgetItem(message))
-        self.log_table.setItem(row_position, 4, QTableWidgetItem(details))
-        self.log_table.scrollToBottom()
+        # Called from worker threads too, so only queue the record here
+        self.log_pipeline.Log(level, component, message, details)
+
+
+    def FlushLog(self):
+        records = self.log_pipeline.Drain()
+        if records:
+            scroll_bar = self.log_table.verticalScrollBar()
+            follow = scroll_bar.value() == scroll_bar.maximum()
+            self.log_model.AppendRecords(records)
+            if follow:
+                self.log_table.scrollToBottom()
 
 
     def UpdateFrame(self):
         try:
-            if hasattr(self, 'camera') and hasattr(self.camera, 'cam'):
-                frame, width, height = self.camera.GetFrame()
-                if frame is not None:
-                    bytes_per_line = 3 * width
-                    q_image = QImage(frame.data, width, height, bytes_per_line, QImage.Format_RGB888)
-                    pixmap = QPixmap.fromImage(q_image)
-                    self.image_label.setPixmap(pixmap.scaled(self.image_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
-        except PySpin.SpinnakerException as ex:
-            self.log_message("ERROR", "CameraCapture", "Frame acquisition failed", str(ex))
+            frame = self.frame_grabber.Latest()
+            if frame is not None:
+                start = time.perf_counter()
+                bytes_per_line = 3 * frame.width
+                q_image = QImage(frame.data.data, frame.width, frame.height, bytes_per_line, QImage.Format_RGB888)
+                pixmap = QPixmap.fromImage(q_image)
+                converted = time.perf_counter()
+                self.image_label.setPixmap(pixmap.scaled(self.image_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+                shown = time.perf_counter()
+                latency.Record('display.qimage', converted - start, converted)
+                latency.Record('display.scale', shown - converted, shown)
         except AttributeError:
-            # Camera is already disconnected, stop the timer
-            self.timer.stop()
+            # Camera is already disconnected
+            pass
+
+
+    def UpdateInfoBar(self):
+        # Frames shown per second against frames the camera delivered, and the p95 of each live view stage
+        fps = latency.Rate('display.scale')
+        camera_fps = latency.Rate('camera.grab')
+        text = f"Cursor Position: X:0, Y:0 | Zoom Level: 100% | FPS: {fps:.1f} (camera {camera_fps:.1f})"
+        stages = [(name, latency.Percentiles(stage)) for name, stage in
+                  (("grab", 'camera.grab'), ("convert", 'camera.convert'), ("image", 'display.qimage'), ("scale", 'display.scale'))]
+        stages = [f"{name} {percentiles[95] * 1000:.1f}" for name, percentiles in stages if percentiles]
+        if stages:
+            text += " | p95 ms: " + ", ".join(stages)
+        self.info_bar.setText(text)
+        self.info_bar.setToolTip("\n".join(f"{stage}: p50 {entry['p50']:.2f}, p95 {entry['p95']:.2f}, p99 {entry['p99']:.2f} ms, n={entry['count']}"
+                                           for stage, entry in latency.Summary().items()))
+
+
+    def SaveTimings(self):
+        default = datetime.now().strftime("latency_%y%m%d_%H%M%S.json")
+        filename, _ = QFileDialog.getSaveFileName(self, "Save Timings", default, "JSON files (*.json);;All files (*)")
+        if not filename:
+            return
+        try:
+            latency.Dump(filename)
+            self.log_message("INFO", "Latency", "Timings saved", filename)
+        except OSError as e:
+            self.log_message("ERROR", "Latency", "Failed to save timings", str(e))
 
 
     def UpdateProgressBar(self, value):
@@ -450,15 +707,17 @@ class CameraGUI(QMainWindow):
 
 
     def UpdatePositions(self):
-        try:
-            position_x = self.mask_motor.GetPosition(self.mask_motor.motor_x)
-            position_y = self.mask_motor.GetPosition(self.mask_motor.motor_y)
-            position_z = self.mask_motor.GetPosition(self.mask_motor.motor_z)
-            self.position_label_x.setText(f"X: {position_x} mm")
-            self.position_label_y.setText(f"Y: {position_y} mm")
-            self.position_label_z.setText(f"Z: {position_z} mm")
-        except Exception as e:
-            self.log_message("ERROR", "PositionUpdate", "Failed to update positions", str(e))
+        snapshot = self.status_poller.Snapshot()
+        if snapshot.sequence == self.shown_snapshot:
+            return
+        self.shown_snapshot = snapshot.sequence
+        labels = {"X": self.position_label_x, "Y": self.position_label_y, "Z": self.position_label_z}
+        for axis, label in labels.items():
+            status = snapshot.axes.get(axis)
+            if status is None or status.position is None:
+                continue
+            state = " (error)" if status.is_error else " (moving)" if status.is_moving else ""
+            label.setText(f"{axis}: {status.position:.5f} mm{state}")
 
 
     def ApplySettings(self):
@@ -478,9 +737,19 @@ class CameraGUI(QMainWindow):
         except ValueError:
             self.log_message("ERROR", "CameraSettings", "Invalid input", "Please enter valid numbers for gain and exposure time")
 
+    def StopTimers(self):
+        if hasattr(self, 'frame_grabber'):
+            self.frame_grabber.Stop()
+        if getattr(self, 'frame_bus', None) is not None:
+            self.frame_bus.Close()
+            self.frame_bus = None
+        if hasattr(self, 'position_timer'):
+            self.position_timer.stop()
+        if hasattr(self, 'status_poller'):
+            self.status_poller.Stop()
+
     def DeinitHardware(self):
-        self.timer.stop()
-        self.position_timer.stop()
+        self.StopTimers()
 
         if hasattr(self, 'camera'):
             self.camera.DisconnectCamera()
@@ -502,9 +771,15 @@ class CameraGUI(QMainWindow):
         self.stop_btn.setEnabled(False)
 
 
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if hasattr(self, 'frame_grabber'):
+            self.frame_grabber.SetDisplaySize(self.image_label.width(), self.image_label.height())
+
+
     def closeEvent(self, event):
-        self.timer.stop()
-        self.position_timer.stop()
+        self.info_timer.stop()
+        self.StopTimers()
 
         if hasattr(self, 'camera'):
             self.camera.DisconnectCamera()
@@ -513,6 +788,8 @@ class CameraGUI(QMainWindow):
             self.mask_motor.DisconnectAllMotors()
 
         self.log_message("INFO", "Shutdown", "Application closing", "Disconnecting camera and motors")
+        self.log_timer.stop()
+        self.log_pipeline.Close()
         super().closeEvent(event)
 
 def main():
@@ -6,25 +6,294 @@
     python file: jckcube.py
 """
 
+import bisect
+import math
+import threading
 import time
-import clr 
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType, SimpleNamespace
 
-# Add reference to the Thorlabs Kinesis DLLs (Dynamic-Link Libraries)
-clr.AddReference("C:\\Program Files\\Thorlabs\\Kinesis\\Thorlabs.MotionControl.DeviceManagerCLI.dll")
-clr.AddReference("C:\\Program Files\\Thorlabs\\Kinesis\\Thorlabs.MotionControl.GenericMotorCLI.dll")
-clr.AddReference("C:\\Program Files\\Thorlabs\\Kinesis\\Thorlabs.MotionControl.KCube.DCServoCLI.dll")
-clr.AddReference("C:\\Program Files\\Thorlabs\\Kinesis\\Thorlabs.MotionControl.KCube.BrushlessMotorCLI.dll")
+from jcbackend import Register
+from jclatency import latency
+from jctrace import tracer
+from jcplan import MoveTime
 
-# Import the namespaces from the Thorlabs Kinesis DLLs
-from Thorlabs.MotionControl.DeviceManagerCLI import *          # type: ignore
-from Thorlabs.MotionControl.GenericMotorCLI import *             # type: ignore
-from Thorlabs.MotionControl.GenericMotorCLI.ControlParameters import JogParametersBase # type: ignore
-from Thorlabs.MotionControl.KCube.DCServoCLI import *   # type: ignore
-from Thorlabs.MotionControl.KCube.BrushlessMotorCLI import *          # type: ignore
-from System import Decimal # type: ignore
 
-# Initialize the DeviceManager
-DeviceManagerCLI.BuildDeviceList() # type: ignore
+def _LoadKinesis():
+    import clr # type: ignore
+
+    # Add reference to the Thorlabs Kinesis DLLs (Dynamic-Link Libraries)
+    clr.AddReference("C:\\Program Files\\Thorlabs\\Kinesis\\Thorlabs.MotionControl.DeviceManagerCLI.dll")
+    clr.AddReference("C:\\Program Files\\Thorlabs\\Kinesis\\Thorlabs.MotionControl.GenericMotorCLI.dll")
+    clr.AddReference("C:\\Program Files\\Thorlabs\\Kinesis\\Thorlabs.MotionControl.KCube.DCServoCLI.dll")
+    clr.AddReference("C:\\Program Files\\Thorlabs\\Kinesis\\Thorlabs.MotionControl.KCube.BrushlessMotorCLI.dll")
+
+    # Import the classes used here from the Thorlabs Kinesis namespaces
+    from Thorlabs.MotionControl.DeviceManagerCLI import DeviceManagerCLI, DeviceConfiguration # type: ignore
+    from Thorlabs.MotionControl.GenericMotorCLI import MotorDirection # type: ignore
+    from Thorlabs.MotionControl.GenericMotorCLI.ControlParameters import JogParametersBase # type: ignore
+    from Thorlabs.MotionControl.KCube.DCServoCLI import KCubeDCServo # type: ignore
+    from Thorlabs.MotionControl.KCube.BrushlessMotorCLI import KCubeBrushlessMotor # type: ignore
+    from System import Action, Decimal, UInt64 # type: ignore
+    return SimpleNamespace(DeviceManagerCLI=DeviceManagerCLI, DeviceConfiguration=DeviceConfiguration, MotorDirection=MotorDirection,
+                           JogParametersBase=JogParametersBase, KCubeDCServo=KCubeDCServo, KCubeBrushlessMotor=KCubeBrushlessMotor,
+                           Decimal=Decimal, Action=Action, UInt64=UInt64)
+
+
+def _LoadSimulator():
+    # Simulated KCube controllers, see jcsimkcube.py
+    import jcsimkcube
+    return jcsimkcube
+
+
+# The Kinesis DLLs load on first use, not at import
+kinesis = Register("Kinesis", _LoadKinesis, _LoadSimulator)
+
+POLL_INTERVAL = 50            # Milliseconds between status updates from each controller
+MOVE_TIMEOUT = 60000          # Milliseconds before a move is abandoned
+POSITION_TOLERANCE = 0.0005   # mm from the target that counts as arrived
+MIN_WAIT = 0.002              # Shortest and longest pause between checks while a move runs, in seconds
+MAX_WAIT = 0.02
+STATUS_INTERVAL = 0.1         # Seconds between device status snapshots
+COMPLETION_MARGIN = 0.25      # Seconds past the expected end of a move before a missing completion message is checked on
+
+# Type of the argument each move command takes before its waiter, to look up its Action<UInt64> overload
+MOVE_ARGUMENTS = {'MoveTo': 'Decimal', 'MoveJog': 'MotorDirection'}
+
+
+_device_list_lock = threading.Lock()
+_device_list_built = False
+
+
+def EnsureDeviceList():
+    """
+    Initialize the DeviceManager on first use rather than at import. Safe to
+    call from several threads; only the first call enumerates the devices.
+
+    :return: Seconds spent building the device list, 0 if it was already built.
+    """
+    global _device_list_built
+    with _device_list_lock:
+        if _device_list_built:
+            return 0.0
+        start = time.perf_counter()
+        kinesis.DeviceManagerCLI.BuildDeviceList() # type: ignore
+        _device_list_built = True
+        return time.perf_counter() - start
+
+
+class MoveTiming:
+    """
+    Measured durations of one move in seconds. move_time runs from the
+    command to the stage first reading back within POSITION_TOLERANCE of the
+    target, settle_time from then until the controller reports completion.
+    """
+    def __init__(self, axis_name, move_time, settle_time):
+        self.axis_name = axis_name
+        self.move_time = move_time
+        self.settle_time = settle_time
+        self.total_time = move_time + settle_time
+
+    def __repr__(self):
+        return f"MoveTiming(axis={self.axis_name}, move={self.move_time:.3f} s, settle={self.settle_time:.3f} s)"
+
+
+class MultiAxisMoveError(Exception):
+    """
+    Raised when one or more axes of a concurrent move fail or time out.
+    errors maps each failed axis to its exception, timings holds the
+    MoveTiming of every axis that did complete.
+    """
+    def __init__(self, errors, timings):
+        self.errors = errors
+        self.timings = timings
+        super().__init__("; ".join(f"Axis {axis}: {error}" for axis, error in errors.items()))
+
+
+class PositionRecorder:
+    """
+    Samples a motor's position readback on a background thread so positions
+    between samples can be interpolated, e.g. to tag frames taken while the
+    stage moves. The controller only refreshes its position once per poll, so
+    a sample is kept each time the reported value changes and dated half a
+    sampling interval before it was first seen.
+    """
+    def __init__(self, motor, interval=0.002):
+        self.motor = motor
+        self.interval = interval
+        self.times = []
+        self.positions = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def Start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._Run, name="PositionRecorder", daemon=True)
+        self.thread.start()
+
+    def Stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+            self.thread = None
+
+    def _Run(self):
+        last = None
+        while True:
+            now = time.perf_counter()
+            position = float(str(self.motor.Position))
+            if position != last:
+                with self.lock:
+                    self.times.append(now - self.interval / 2)
+                    self.positions.append(position)
+                last = position
+            if self.stop_event.wait(self.interval):
+                break
+
+    def LastChange(self):
+        """perf_counter time of the newest sample, 0 before the first one."""
+        with self.lock:
+            return self.times[-1] if self.times else 0.0
+
+    def PositionAt(self, t):
+        """
+        Position at perf_counter time t, linearly interpolated between the
+        samples either side and held at the first and last sample outside them.
+        """
+        with self.lock:
+            index = bisect.bisect_right(self.times, t)
+            if index == 0:
+                return self.positions[0]
+            if index == len(self.times):
+                return self.positions[-1]
+            t0, t1 = self.times[index - 1], self.times[index]
+            p0, p1 = self.positions[index - 1], self.positions[index]
+        return p0 + (p1 - p0) * (t - t0) / (t1 - t0)
+
+
+# One axis as last read by the StatusPoller; error holds the failed read's message, or "" while reads succeed
+AxisStatus = namedtuple('AxisStatus', ['position', 'is_moving', 'is_error', 'error'])
+
+
+class DeviceSnapshot(namedtuple('DeviceSnapshot', ['sequence', 'time', 'perf_time', 'axes'])):
+    """
+    Status of every axis read in one pass of the StatusPoller, with the wall
+    clock time it finished and the perf_counter time it started, so every
+    reading is at least as recent as perf_time. axes maps an axis name to
+    its AxisStatus and cannot be modified, so a snapshot can be shared freely.
+    """
+    __slots__ = ()
+
+    def Position(self, axis_name):
+        """Position of axis_name in mm, None if it has never been read."""
+        status = self.axes.get(axis_name)
+        return status.position if status is not None else None
+
+    def IsMoving(self):
+        return any(status.is_moving for status in self.axes.values())
+
+    def Age(self):
+        """Seconds since the snapshot was taken."""
+        return time.perf_counter() - self.perf_time
+
+
+class StatusPoller:
+    """
+    Reads position, moving and error state of every connected axis on a
+    background thread and publishes them as an immutable DeviceSnapshot by a
+    single reference assignment. Readers such as the GUI take the newest
+    snapshot instead of making interop calls to the controllers themselves.
+    Changes of moving or error state are logged from the poller thread.
+    """
+    def __init__(self, mask_motor, interval=STATUS_INTERVAL, axes=("X", "Y", "Z"), log_signal=None):
+        self.mask_motor = mask_motor
+        self.interval = interval
+        self.axes = axes
+        self.log_signal = log_signal if log_signal else print
+        self.snapshot = DeviceSnapshot(0, 0.0, 0.0, MappingProxyType({}))
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def log(self, level, component, message, details=""):
+        self.log_signal(level, component, message, details)
+
+    def Start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._Run, name="StatusPoller", daemon=True)
+        self.thread.start()
+
+    def Stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+            self.thread = None
+
+    def _ReadAxis(self, axis_name, previous):
+        motor = self.mask_motor.GetMotor(axis_name)
+        if motor is None:
+            return None
+        try:
+            position = float(str(motor.Position))
+            status = motor.Status
+            return AxisStatus(position, bool(status.IsMoving), bool(getattr(status, 'IsError', False)), "")
+        except Exception as e:
+            # Keep the last good position so readers still have something to show
+            return AxisStatus(previous.position if previous else None, False, True, str(e))
+
+    def _Run(self):
+        while True:
+            start = time.perf_counter()
+            previous = self.snapshot
+            axes = {}
+            for axis_name in self.axes:
+                status = self._ReadAxis(axis_name, previous.axes.get(axis_name))
+                if status is not None:
+                    axes[axis_name] = status
+            snapshot = DeviceSnapshot(previous.sequence + 1, time.time(), start, MappingProxyType(axes))
+            with self.condition:
+                self.snapshot = snapshot
+                self.condition.notify_all()
+            self._LogChanges(previous, snapshot)
+            if self.stop_event.wait(max(self.interval - (time.perf_counter() - start), 0)):
+                break
+
+    def _LogChanges(self, previous, snapshot):
+        for axis_name, status in snapshot.axes.items():
+            before = previous.axes.get(axis_name)
+            if status.is_error and (before is None or not before.is_error):
+                self.log("ERROR", "MotorStatus", f"Axis {axis_name} reports an error", status.error)
+            elif before is not None and before.is_error and not status.is_error:
+                self.log("INFO", "MotorStatus", f"Axis {axis_name} error cleared", "")
+            if before is not None and status.is_moving != before.is_moving:
+                self.log("DEBUG", "MotorStatus", f"Axis {axis_name} {'started' if status.is_moving else 'stopped'} moving", f"Position={status.position} mm")
+
+    def Snapshot(self):
+        """
+        :return: The newest snapshot; sequence 0 with no axes before the first pass.
+        :rtype: DeviceSnapshot
+        """
+        return self.snapshot
+
+    def WaitForSnapshot(self, not_before, timeout=1.0):
+        """
+        Wait for a snapshot taken entirely after perf_counter time not_before,
+        e.g. the end of a move.
+
+        :return: The snapshot, or None on timeout or once the poller stopped.
+        :rtype: DeviceSnapshot
+        """
+        deadline = time.perf_counter() + timeout
+        with self.condition:
+            while self.snapshot.perf_time < not_before:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or self.thread is None:
+                    return None
+                self.condition.wait(remaining)
+            return self.snapshot
+
 
 class MaskMotor:
     def __init__(self, serial_no_x, serial_no_y, serial_no_z, log_signal=None):
@@ -35,16 +304,26 @@ class MaskMotor:
         self.motor_y = None
         self.motor_z = None
         self.log_signal = log_signal if log_signal else print
+        self.callback_overloads = {}    # (device type, command name) to True if it takes a completion callback
 
     def log(self, level, component, message, details=""):
         self.log_signal(level, component, message, details)
 
+    def BuildDeviceList(self):
+        kinesis.Load(self.log_signal)
+        elapsed = EnsureDeviceList()
+        if elapsed:
+            self.log("INFO", "MotorControl", "Device list built", f"{elapsed:.2f} s")
+
     def ConnectMotor(self, serial_no):
+        motor = None
+        start = time.perf_counter()
         try:
+            self.BuildDeviceList()
             if serial_no == str('28252438'):
-                motor = KCubeBrushlessMotor.CreateKCubeBrushlessMotor(serial_no) # type: ignore
+                motor = kinesis.KCubeBrushlessMotor.CreateKCubeBrushlessMotor(serial_no) # type: ignore
             else:
-                motor = KCubeDCServo.CreateKCubeDCServo(serial_no) # type: ignore
+                motor = kinesis.KCubeDCServo.CreateKCubeDCServo(serial_no) # type: ignore
 
             # If Serial Number is assigned connect motor
             if not motor == None:
@@ -56,7 +335,7 @@ class MaskMotor:
                     assert motor.IsSettingsInitialized() is True
 
                 # Start Polling the Device
-                motor.StartPolling(50)
+                motor.StartPolling(POLL_INTERVAL)
                 time.sleep(.1)
 
                 # Enable the device
@@ -66,24 +345,36 @@ class MaskMotor:
                 # Load and Update motor configuration
 
                 if serial_no == str('28252438'):
-                    config = motor.LoadMotorConfiguration(serial_no, DeviceConfiguration.DeviceSettingsUseOptionType.UseDeviceSettings) # type: ignore
+                    config = motor.LoadMotorConfiguration(serial_no, kinesis.DeviceConfiguration.DeviceSettingsUseOptionType.UseDeviceSettings) # type: ignore
                     config.DeviceSettingsName = str('DDS050') # Optics stage 
                 else:
-                    config = motor.LoadMotorConfiguration(serial_no, DeviceConfiguration.DeviceSettingsUseOptionType.UseFileSettings) # type: ignore
+                    config = motor.LoadMotorConfiguration(serial_no, kinesis.DeviceConfiguration.DeviceSettingsUseOptionType.UseFileSettings) # type: ignore
                     config.DeviceSettingsName = str('MTS50-Z8') # Mask Stage
                 config.UpdateCurrentConfiguration()
                 motor.SetSettings(motor.MotorDeviceSettings, True, False)
-                self.log("INFO", "MotorControl", f"Motor {serial_no} connected", f"Stage {config.DeviceSettingsName}")
+                self.log("INFO", "MotorControl", f"Motor {serial_no} connected", f"Stage {config.DeviceSettingsName}, Startup={time.perf_counter() - start:.2f} s")
 
             
         except Exception as e:
             self.log("ERROR", "MotorControl", "Failed to connect motor", str(e))
         return motor
 
-    def ConnectAllMotors(self):
-        self.motor_x = self.ConnectMotor(self.serial_no_x)
-        self.motor_y = self.ConnectMotor(self.serial_no_y)
-        self.motor_z = self.ConnectMotor(self.serial_no_z)
+    def ConnectAllMotors(self, parallel=True):
+        """
+        Connect, initialize, enable and configure all three controllers. With
+        parallel set each controller is brought up on its own thread, so the
+        settings initialisation and fixed waits overlap instead of adding up.
+        """
+        start = time.perf_counter()
+        self.BuildDeviceList()
+        serials = (self.serial_no_x, self.serial_no_y, self.serial_no_z)
+        if parallel:
+            with ThreadPoolExecutor(max_workers=len(serials), thread_name_prefix="MotorConnect") as executor:
+                motors = list(executor.map(self.ConnectMotor, serials))
+        else:
+            motors = [self.ConnectMotor(serial_no) for serial_no in serials]
+        self.motor_x, self.motor_y, self.motor_z = motors
+        self.log("INFO", "MotorControl", "All motors connected", f"Startup={time.perf_counter() - start:.2f} s")
 
     def GetPosition(self, motor):
         position = motor.Position
@@ -91,15 +382,15 @@ class MaskMotor:
 
     def SetVelocityParams(self, motor, max_velocity, acceleration):
         vel_params = motor.GetVelocityParams()
-        vel_params.MaxVelocity = max_velocity
-        vel_params.Acceleration = acceleration
+        vel_params.MaxVelocity = kinesis.Decimal(max_velocity)
+        vel_params.Acceleration = kinesis.Decimal(acceleration)
         motor.SetVelParams(vel_params)
         self.log("INFO", "MotorControl", "Velocity parameters set", f"Max Velocity={max_velocity} mm/s, Acceleration={acceleration} mm/s^2")
 
     def SetJogParams(self, motor, step_size):
         jog_params = motor.GetJogParams()
-        jog_params.StepSize = Decimal(step_size)
-        jog_params.JogMode = JogParametersBase.JogModes.SingleStep
+        jog_params.StepSize = kinesis.Decimal(step_size)
+        jog_params.JogMode = kinesis.JogParametersBase.JogModes.SingleStep
         motor.SetJogParams(jog_params)
         self.log("INFO", "MotorControl", "Jog parameters set", f"Step Size={step_size} mm, Mode=SingleStep")
 
@@ -115,33 +406,158 @@ class MaskMotor:
         self.SetJogParams(self.motor_y, step_size)
         self.SetJogParams(self.motor_z, step_size)
 
-    def MoveMotor(self, motor, position, axis_name):
+    def GetMotor(self, axis_name):
+        return getattr(self, f"motor_{axis_name.lower()}")
+
+    def GetPositionValue(self, motor):
+        return float(str(motor.Position))
+
+    def GetVelocityValues(self, motor):
+        """
+        :return: The motor's (max_velocity, acceleration) in mm/s and mm/s^2.
+        """
+        vel_params = motor.GetVelocityParams()
+        return float(str(vel_params.MaxVelocity)), float(str(vel_params.Acceleration))
+
+    def GetTravelLimits(self, motor):
+        """
+        :return: The (minimum, maximum) position in mm the motor's stage can reach.
+        """
+        limits = motor.AdvancedMotorLimits
+        return float(str(limits.LengthMinimum)), float(str(limits.LengthMaximum))
+
+    def EstimateMoveTime(self, motor, distance):
+        """
+        Time in seconds a move of distance mm takes under the motor's current
+        velocity parameters, assuming a trapezoidal velocity profile.
+        """
+        return MoveTime(distance, *self.GetVelocityValues(motor))
+
+    def HasCallbackOverload(self, motor, name):
+        """
+        :param name: Move command, a key of MOVE_ARGUMENTS.
+        :return: True if the device's command has the overload taking an
+                 Action<UInt64> completion callback. Looked up once per device type.
+        """
+        key = (type(motor), name)
+        if key not in self.callback_overloads:
+            argument_type = getattr(kinesis, MOVE_ARGUMENTS[name])
+            try:
+                getattr(motor, name).Overloads[argument_type, kinesis.Action[kinesis.UInt64]]
+                self.callback_overloads[key] = True
+            except (TypeError, LookupError):
+                self.callback_overloads[key] = False
+                self.log("WARNING", "MotorControl", f"{name} has no completion callback overload", "Polling IsMoving instead")
+        return self.callback_overloads[key]
+
+    def WaitForMove(self, motor, name, argument, target, axis_name, timeout=MOVE_TIMEOUT):
+        """
+        Issue a move and block until the controller reports it complete.
+
+        Where the device has the Kinesis MoveTo/MoveJog overload taking an
+        Action<UInt64>, the command is given a completion delegate and this
+        returns as soon as the controller's completion message arrives.
+        Otherwise it is given 0 (do not block) and IsMoving is polled, with
+        shorter pauses as the expected end of the move approaches. With a
+        callback, IsMoving is also checked once the message is
+        COMPLETION_MARGIN overdue, so a move stopped by a fault or from the
+        front panel does not wait out the timeout.
+
+        :param name: Move command, 'MoveTo' or 'MoveJog'.
+        :param argument: Its argument before the waiter, a position or a direction.
+        :param target: Expected final position in mm, used to time the settle.
+        :return: MoveTiming for the move.
+        """
+        origin = self.GetPositionValue(motor)
+        expected = self.EstimateMoveTime(motor, target - origin)
+        done = threading.Event()
+        polling = not self.HasCallbackOverload(motor, name)
+
+        start = time.perf_counter()
+        if polling:
+            getattr(motor, name)(argument, 0)
+        else:
+            getattr(motor, name)(argument, kinesis.Action[kinesis.UInt64](lambda task_id: done.set()))
+
+        arrived = None
+        while True:
+            now = time.perf_counter()
+            wait = min(max((start + expected - now) / 2, MIN_WAIT), MAX_WAIT)
+            if done.wait(wait):
+                break
+            now = time.perf_counter()
+            if arrived is None and abs(self.GetPositionValue(motor) - target) <= POSITION_TOLERANCE:
+                arrived = now
+            # The status only refreshes once per poll, so give it a poll to report the move started
+            check = now - start >= POLL_INTERVAL / 1000 if polling else now - start >= expected + COMPLETION_MARGIN
+            stopped = check and not motor.Status.IsMoving
+            tracer.Add('motor.poll', now, time.perf_counter(), {'axis': axis_name})
+            if stopped:
+                if not polling:
+                    self.log("WARNING", "MotorControl", f"Axis {axis_name} stopped without a completion message",
+                             f"Position={self.GetPositionValue(motor)} mm, Target={target} mm")
+                break
+            if now - start > timeout / 1000:
+                raise TimeoutError(f"Axis {axis_name} move did not complete within {timeout} ms")
+
+        end = time.perf_counter()
+        if arrived is None:
+            arrived = end
+        latency.Record('motor.move', arrived - start, arrived)
+        latency.Record('motor.settle', end - arrived, end)
+        return MoveTiming(axis_name, arrived - start, end - arrived)
+
+    def MoveMotor(self, motor, position, axis_name, timeout=MOVE_TIMEOUT):
         self.log("INFO", "MotorControl", "Moving motor", f"Axis={axis_name}, Position={position} mm")
-        motor.MoveTo(Decimal(position), 60000)  # 60 seconds timeout in milliseconds
+        timing = self.WaitForMove(motor, 'MoveTo', kinesis.Decimal(position), position, axis_name, timeout)
+        self.log("INFO", "MotorControl", "Motor move completed", f"Axis={axis_name}, Move={timing.move_time:.3f} s, Settle={timing.settle_time:.3f} s")
+        return timing
 
-        # Wait for the device to complete the move
-        while motor.Status.IsMoving:
-            time.sleep(0.1)  # Check every 100ms
-        self.log("INFO", "MotorControl", "Motor move completed", f"Axis={axis_name}")
+    def MoveMotorsConcurrently(self, positions, timeout=MOVE_TIMEOUT):
+        """
+        Start every axis moving at once and wait for all of them, so the move
+        takes as long as the slowest axis rather than the sum of all three.
+
+        :param positions: Dict of axis name ('X', 'Y', 'Z') to position in mm.
+        :return: Dict of axis name to MoveTiming; total_time is when that axis completed.
+        :raises MultiAxisMoveError: If any axis failed or timed out, once all have finished.
+        """
+        timings = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=len(positions), thread_name_prefix="AxisMove") as executor:
+            futures = {axis: executor.submit(self.MoveMotor, self.GetMotor(axis), position, axis, timeout)
+                       for axis, position in positions.items()}
+            for axis, future in futures.items():
+                try:
+                    timings[axis] = future.result()
+                except Exception as e:
+                    errors[axis] = e
+
+        if errors:
+            self.log("ERROR", "MotorControl", "Concurrent move failed", ", ".join(errors))
+            raise MultiAxisMoveError(errors, timings)
+        self.log("INFO", "MotorControl", "Concurrent move completed", ", ".join(f"{axis}={timing.total_time:.3f} s" for axis, timing in timings.items()))
+        return timings
 
     def MoveAllMotors(self, position_x, position_y, position_z):
-        self.MoveMotor(self.motor_x, position_x, "X")
-        self.MoveMotor(self.motor_y, position_y, "Y")
-        self.MoveMotor(self.motor_z, position_z, "Z")
+        return self.MoveMotorsConcurrently({"X": position_x, "Y": position_y, "Z": position_z})
 
-    def ForwardJogMotor(self, motor):
+    def JogMotor(self, motor, direction, axis_name=""):
+        step_size = float(str(motor.GetJogParams().StepSize))
+        target = self.GetPositionValue(motor) + (step_size if direction == kinesis.MotorDirection.Forward else -step_size) # type: ignore
+        return self.WaitForMove(motor, 'MoveJog', direction, target, axis_name)
+
+    def ForwardJogMotor(self, motor, axis_name=""):
         self.log("INFO", "MotorControl", "Jogging motor forward", "")
-        motor.MoveJog(MotorDirection.Forward, 60000) # type: ignore # Wait time in milliseconds
-        # Wait for the device to complete the move
-        while motor.Status.IsMoving:
-            time.sleep(0.1)  # Check every 100ms
-            
-        self.log("INFO", "MotorControl", "Motor jog completed", "Forward")
+        timing = self.JogMotor(motor, kinesis.MotorDirection.Forward, axis_name) # type: ignore
+        self.log("INFO", "MotorControl", "Motor jog completed", f"Forward, Move={timing.move_time:.3f} s, Settle={timing.settle_time:.3f} s")
+        return timing
 
-    def BackwardJogMotor(self, motor):
+    def BackwardJogMotor(self, motor, axis_name=""):
         self.log("INFO", "MotorControl", "Jogging motor backward", "")
-        motor.MoveJog(MotorDirection.Backward, 60000) # type: ignore # Wait time in milliseconds
-        self.log("INFO", "MotorControl", "Motor jog completed", "Backward")
+        timing = self.JogMotor(motor, kinesis.MotorDirection.Backward, axis_name) # type: ignore
+        self.log("INFO", "MotorControl", "Motor jog completed", f"Backward, Move={timing.move_time:.3f} s, Settle={timing.settle_time:.3f} s")
+        return timing
 
     def DisconnectMotor(self, motor):
         motor.StopPolling()
@@ -0,0 +1,119 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jclatency.py
+
+    Rolling latency of each stage of the live view and scan paths. A stage
+    keeps its last WINDOW durations, so recording one is a lock and two
+    deque appends and the timers stay on in production; percentiles are only
+    worked out when read, e.g. once a second for the info bar. Stages are
+    named by the path they belong to:
+
+    camera.grab, camera.convert     every frame, live view or scan
+    display.qimage, display.scale   live view frames shown in the GUI
+    motor.move, motor.settle        every move, from MaskMotor.WaitForMove
+    scan.acquire, scan.write, ...   the ScanStats stages of every scan
+
+    The shared tracker is jclatency.latency; Dump writes its summary to a
+    JSON file. Every sample is also a span on the jctrace timeline.
+"""
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from jctrace import tracer
+
+WINDOW = 1024
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyTracker:
+    def __init__(self, window=WINDOW):
+        """
+        :param window: Most recent durations kept per stage.
+        """
+        self.window = window
+        self.durations = {}
+        self.times = {}
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def Record(self, stage, seconds, end=None):
+        """
+        :param end: perf_counter time the stage ended, if known; otherwise now.
+        """
+        if end is None:
+            end = time.perf_counter()
+        tracer.Add(stage, end - seconds, end)
+        with self.lock:
+            durations = self.durations.get(stage)
+            if durations is None:
+                durations = self.durations[stage] = deque(maxlen=self.window)
+                self.times[stage] = deque(maxlen=self.window)
+                self.counts[stage] = 0
+            durations.append(seconds)
+            self.times[stage].append(end)
+            self.counts[stage] += 1
+
+    def Timed(self, stage, function, *args):
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            end = time.perf_counter()
+            self.Record(stage, end - start, end)
+
+    def Percentiles(self, stage):
+        """
+        :return: Dict of percentile to seconds over the window, or None if the stage has no samples.
+        """
+        with self.lock:
+            durations = list(self.durations.get(stage, ()))
+        if not durations:
+            return None
+        return dict(zip(PERCENTILES, np.percentile(durations, PERCENTILES).tolist()))
+
+    def Rate(self, stage, span=2.0):
+        """
+        :return: Samples per second recorded for stage over the last span seconds, 0 if fewer than two.
+        """
+        start = time.perf_counter() - span
+        with self.lock:
+            recent = [end for end in self.times.get(stage, ()) if end >= start]
+        if len(recent) < 2 or recent[-1] <= recent[0]:
+            return 0.0
+        return (len(recent) - 1) / (recent[-1] - recent[0])
+
+    def Summary(self):
+        """
+        :return: Dict of stage to its count, rate (per second) and p50/p95/p99 in milliseconds.
+        """
+        with self.lock:
+            stages = sorted(self.durations)
+            counts = dict(self.counts)
+        summary = {}
+        for stage in stages:
+            percentiles = self.Percentiles(stage)
+            entry = {'count': counts[stage], 'rate': round(self.Rate(stage), 2)}
+            entry.update({f"p{percentile}": round(seconds * 1000, 3) for percentile, seconds in percentiles.items()})
+            summary[stage] = entry
+        return summary
+
+    def Dump(self, path):
+        """Write the summary to path as JSON."""
+        with open(path, 'w') as f:
+            json.dump({'time': datetime.now().isoformat(), 'window': self.window, 'stages': self.Summary()}, f, indent=2)
+        return path
+
+    def Reset(self):
+        with self.lock:
+            self.durations.clear()
+            self.times.clear()
+            self.counts.clear()
+
+
+latency = LatencyTracker()
@@ -0,0 +1,61 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jclog.py
+
+    Thread-safe log pipeline. Records can be logged from any thread; they are
+    queued for the GUI to collect in batches and streamed to a rotating log
+    file by a background listener thread.
+"""
+import logging
+import queue
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+class LogPipeline:
+    def __init__(self, filename="als_motor_controls.log", max_bytes=5 * 1024 * 1024, backup_count=5):
+        self.records = queue.SimpleQueue()
+
+        # The file is written by the listener thread, never by the thread logging
+        file_queue = queue.SimpleQueue()
+        handler = RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.listener = QueueListener(file_queue, handler)
+        self.listener.start()
+
+        self.logger = logging.getLogger(f"{__name__}.{id(self)}")
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.logger.addHandler(QueueHandler(file_queue))
+
+    def Log(self, level, component, message, details=""):
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        record = (timestamp, level, component, message, details)
+        self.records.put(record)
+
+        level_no = logging.getLevelName(level)
+        self.logger.log(level_no if isinstance(level_no, int) else logging.INFO, "\t".join(record))
+
+    def Drain(self, limit=None):
+        """
+        Take the records logged since the last call, oldest first.
+
+        :param limit: Most records to take, all of them if None.
+        :return: List of (timestamp, level, component, message, details) tuples.
+        """
+        records = []
+        while limit is None or len(records) < limit:
+            try:
+                records.append(self.records.get_nowait())
+            except queue.Empty:
+                break
+        return records
+
+    def Close(self):
+        """Flush the remaining records to the file and stop the listener."""
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
@@ -0,0 +1,314 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jcplan.py
+
+    Raster scan planning over any combination of the X, Y and Z axes. Points
+    are visited in serpentine (boustrophedon) order so every move is a single
+    step of one axis, and the axis order is chosen to minimise the travel
+    time predicted from each axis's velocity and acceleration. Needs no
+    hardware, so plans can be checked before a beamtime:
+
+    python jcplan.py X 0 1 0.1 Y 0 2 0.1 --profile X=2.3,1.5 --profile Y=2.3,1.5 --point-time 0.02
+
+    Point lists of arbitrary sites are loaded from a file and ordered with a
+    nearest neighbour tour improved by 2-opt under the same cost model:
+
+    python jcplan.py --points sites.csv -o sites_ordered.csv
+"""
+import argparse
+import itertools
+import math
+
+import numpy as np
+
+MOVE_OVERHEAD = 0.03        # Seconds a move costs beyond its motion profile: command, settle and completion message
+DEFAULT_PROFILE = (2.3, 1.5)  # MTS50-Z8 max velocity (mm/s) and acceleration (mm/s^2)
+
+
+def MoveTime(distance, max_velocity, acceleration):
+    """
+    Time in seconds a move of distance mm takes under a trapezoidal velocity
+    profile, or a triangular one if max_velocity is never reached.
+    """
+    distance = abs(distance)
+    if max_velocity <= 0 or acceleration <= 0:
+        return 0.0
+    ramp = max_velocity / acceleration
+    if distance < max_velocity * ramp:
+        # Triangular profile, max velocity is never reached
+        return 2 * math.sqrt(distance / acceleration)
+    return distance / max_velocity + ramp
+
+
+def PointMoveTime(previous, point, profiles, move_overhead=MOVE_OVERHEAD):
+    """Predicted seconds to move from previous to point, the axes moving together."""
+    times = [MoveTime(position - previous[axis], *profiles.get(axis, DEFAULT_PROFILE))
+             for axis, position in point.items() if axis in previous and position != previous[axis]]
+    return max(times) + move_overhead if times else 0.0
+
+
+def AxisPoints(start, stop, step):
+    """
+    Positions from start towards stop in steps of step, up to the last one
+    not past stop. A step of 0 or start == stop gives the single point start.
+    """
+    if step == 0 or start == stop:
+        return [start]
+    count = int(abs(stop - start) / abs(step) + 1e-9)
+    direction = 1 if stop > start else -1
+    return [round(start + direction * index * abs(step), 9) for index in range(count + 1)]
+
+
+def SerpentinePoints(axis_points, order):
+    """
+    Every combination of the axes' positions, outermost axis of order first,
+    with each axis reversing direction whenever an outer axis steps so
+    consecutive points differ in one axis only.
+
+    :param axis_points: Dict of axis name to list of positions.
+    :return: List of dicts of axis name to position.
+    """
+    points = [{}]
+    for axis in order:
+        positions = axis_points[axis]
+        points = [dict(prefix, **{axis: position})
+                  for index, prefix in enumerate(points)
+                  for position in (positions if index % 2 == 0 else positions[::-1])]
+    return points
+
+
+class RasterPlan:
+    """
+    The ordered points of a raster scan and the predicted time to visit them.
+
+    :param order: Axis names, outermost first.
+    :param profiles: Dict of axis name to (max_velocity, acceleration).
+    :param point_time: Seconds spent at each point, e.g. one camera frame period.
+    :param origin: Optional dict of current axis positions, to include the move to the first point.
+    """
+    def __init__(self, axis_points, order, profiles, point_time=0.0, move_overhead=MOVE_OVERHEAD, origin=None):
+        self.axis_points = axis_points
+        self.order = tuple(order)
+        self.profiles = profiles
+        self.point_time = point_time
+        self.move_overhead = move_overhead
+        self.points = SerpentinePoints(axis_points, self.order)
+        self.move_times = []
+        previous = origin or {}
+        for point in self.points:
+            self.move_times.append(PointMoveTime(previous, point, profiles, move_overhead))
+            previous = point
+        self.predicted_time = sum(self.move_times) + point_time * len(self.points)
+        self.candidates = {self.order: self.predicted_time}
+
+    def __len__(self):
+        return len(self.points)
+
+    def Summary(self):
+        shape = " x ".join(f"{axis}:{len(self.axis_points[axis])}" for axis in self.order)
+        return f"Order={'>'.join(self.order)}, Points={len(self.points)} ({shape}), Predicted={self.predicted_time:.1f} s"
+
+
+def PlanRaster(axes, profiles, order=None, point_time=0.0, move_overhead=MOVE_OVERHEAD, origin=None):
+    """
+    Plan a serpentine raster scan.
+
+    :param axes: Dict of axis name to (start, stop, step) in mm.
+    :param profiles: Dict of axis name to (max_velocity, acceleration); missing axes use DEFAULT_PROFILE.
+    :param order: Axis names, outermost first, or None to try every order and keep the quickest.
+    :return: RasterPlan, with the predicted time of every order tried in candidates.
+    :rtype: RasterPlan
+    """
+    axis_points = {axis: AxisPoints(*limits) for axis, limits in axes.items()}
+    orders = [order] if order else itertools.permutations(axis_points)
+    plans = [RasterPlan(axis_points, candidate, profiles, point_time, move_overhead, origin) for candidate in orders]
+    best = min(plans, key=lambda plan: plan.predicted_time)
+    best.candidates = {plan.order: plan.predicted_time for plan in plans}
+    return best
+
+
+def LoadPoints(path):
+    """
+    Read a list of sites, one per line, as comma or whitespace separated
+    positions in mm. A header line names the columns (e.g. X,Y,Z); without
+    one the columns are X, Y and Z in that order. Blank lines and lines
+    starting with # are skipped.
+
+    :return: List of dicts of axis name to position.
+    """
+    axes = None
+    points = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#')[0].strip()
+            if not line:
+                continue
+            fields = line.replace(',', ' ').split()
+            try:
+                values = [float(field) for field in fields]
+            except ValueError:
+                if axes is None and not points:
+                    axes = [field.upper() for field in fields]
+                    continue
+                raise ValueError(f"Invalid point in {path}: {line}")
+            names = axes or ['X', 'Y', 'Z'][:len(values)]
+            if len(values) != len(names):
+                raise ValueError(f"Expected {len(names)} values in {path}: {line}")
+            points.append(dict(zip(names, values)))
+    return points
+
+
+def SavePoints(path, points):
+    axes = list(points[0]) if points else []
+    with open(path, 'w') as f:
+        f.write(",".join(axes) + "\n")
+        for point in points:
+            f.write(",".join(f"{point[axis]:g}" for axis in axes) + "\n")
+
+
+def MoveTimeMatrix(points, profiles, move_overhead=MOVE_OVERHEAD):
+    """Predicted move time between every pair of points, as an n x n array."""
+    times = np.zeros((len(points), len(points)))
+    moved = np.zeros((len(points), len(points)), dtype=bool)
+    for axis in points[0] if points else []:
+        max_velocity, acceleration = profiles.get(axis, DEFAULT_PROFILE)
+        positions = np.array([point[axis] for point in points])
+        distance = np.abs(positions[:, None] - positions[None, :])
+        ramp = max_velocity / acceleration
+        axis_times = np.where(distance < max_velocity * ramp, 2 * np.sqrt(distance / acceleration), distance / max_velocity + ramp)
+        times = np.maximum(times, axis_times)
+        moved |= distance > 0
+    return np.where(moved, times + move_overhead, 0.0)
+
+
+def _TwoOpt(cost, tour, max_passes=50):
+    """
+    Improve an open tour starting at tour[0] by reversing segments while that
+    shortens it. Each pass tries, for every start of a segment, all ends at
+    once with NumPy.
+    """
+    tour = np.array(tour)
+    last = len(tour) - 1
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, last):
+            a, b = tour[i - 1], tour[i]
+            ends = np.arange(i + 1, last + 1)
+            c = tour[ends]
+            d = tour[np.minimum(ends + 1, last)]
+            # Past the last point the tour is open, so the final edge costs nothing
+            after = np.where(ends < last, cost[b, d] - cost[c, d], 0.0)
+            delta = cost[a, c] - cost[a, b] + after
+            best = int(np.argmin(delta))
+            if delta[best] < -1e-9:
+                j = ends[best]
+                tour[i:j + 1] = tour[i:j + 1][::-1].copy()
+                improved = True
+        if not improved:
+            break
+    return tour.tolist()
+
+
+class PointPlan:
+    """
+    A list of sites ordered to minimise the predicted travel time: a nearest
+    neighbour tour from the current position, improved by 2-opt.
+
+    :param points: List of dicts of axis name to position.
+    :param origin: Optional dict of current axis positions the tour starts from.
+    :param optimise: Keep the given order when False.
+    """
+    def __init__(self, points, profiles, point_time=0.0, move_overhead=MOVE_OVERHEAD, origin=None, optimise=True):
+        self.profiles = profiles
+        self.point_time = point_time
+        self.move_overhead = move_overhead
+        start = [origin] if origin else []
+        nodes = start + list(points)
+        cost = MoveTimeMatrix(nodes, profiles, move_overhead)
+
+        self.given_time = self._TourTime(cost, list(range(len(nodes))))
+        tour = list(range(len(nodes)))
+        if optimise and len(points) > 1:
+            # Nearest neighbour from the origin (or the first point), then 2-opt
+            tour = [0]
+            remaining = np.ones(len(nodes), dtype=bool)
+            remaining[0] = False
+            for _ in range(len(nodes) - 1):
+                times = np.where(remaining, cost[tour[-1]], np.inf)
+                tour.append(int(np.argmin(times)))
+                remaining[tour[-1]] = False
+            tour = _TwoOpt(cost, tour)
+
+        self.points = [nodes[index] for index in tour[len(start):]]
+        self.move_times = [0.0] * (1 - len(start)) + [cost[a, b] for a, b in zip(tour, tour[1:])]
+        self.predicted_time = sum(self.move_times) + point_time * len(self.points)
+        self.given_time += point_time * len(self.points)
+
+    @staticmethod
+    def _TourTime(cost, tour):
+        return float(sum(cost[a, b] for a, b in zip(tour, tour[1:])))
+
+    def __len__(self):
+        return len(self.points)
+
+    def Travel(self, points=None):
+        """Total distance each axis moves visiting points (default the planned order), in mm."""
+        points = self.points if points is None else points
+        axes = list(points[0]) if points else []
+        return {axis: sum(abs(b[axis] - a[axis]) for a, b in zip(points, points[1:])) for axis in axes}
+
+    def Summary(self):
+        travel = ", ".join(f"{axis}={distance:.2f} mm" for axis, distance in self.Travel().items())
+        return f"Points={len(self.points)}, Predicted={self.predicted_time:.1f} s (given order {self.given_time:.1f} s), Travel {travel}"
+
+
+def PlanPoints(points, profiles, point_time=0.0, move_overhead=MOVE_OVERHEAD, origin=None, optimise=True):
+    """
+    Order a list of sites for the shortest predicted travel time.
+
+    :param points: List of dicts of axis name to position, e.g. from LoadPoints.
+    :param profiles: Dict of axis name to (max_velocity, acceleration); missing axes use DEFAULT_PROFILE.
+    :rtype: PointPlan
+    """
+    return PointPlan(points, profiles, point_time, move_overhead, origin, optimise)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan a serpentine raster scan or order a point list, and predict the duration")
+    parser.add_argument('axes', nargs='*', help="Groups of AXIS START STOP STEP, e.g. X 0 1 0.1 Y 0 2 0.1")
+    parser.add_argument('--points', help="File of sites to order instead of a raster")
+    parser.add_argument('-o', '--output', help="Write the ordered sites to this file")
+    parser.add_argument('--profile', action='append', default=[], help="AXIS=MAX_VELOCITY,ACCELERATION, default %s,%s" % DEFAULT_PROFILE)
+    parser.add_argument('--order', help="Axes outermost first, e.g. YX; tries every order by default")
+    parser.add_argument('--point-time', type=float, default=0.0, help="Seconds spent acquiring at each point")
+    parser.add_argument('--move-overhead', type=float, default=MOVE_OVERHEAD, help="Seconds each move costs beyond its motion")
+    args = parser.parse_args()
+
+    profiles = {}
+    for profile in args.profile:
+        axis, values = profile.split('=')
+        profiles[axis.upper()] = tuple(float(value) for value in values.split(','))
+
+    if args.points:
+        points = LoadPoints(args.points)
+        plan = PlanPoints(points, profiles, args.point_time, args.move_overhead)
+        given = ", ".join(f"{axis}={distance:.2f} mm" for axis, distance in plan.Travel(points).items())
+        print(f"Given order travel {given}")
+        print(plan.Summary())
+        if args.output:
+            SavePoints(args.output, plan.points)
+        return
+
+    if not args.axes or len(args.axes) % 4:
+        parser.error("axes must be given as AXIS START STOP STEP groups")
+    axes = {args.axes[i].upper(): tuple(float(value) for value in args.axes[i + 1:i + 4]) for i in range(0, len(args.axes), 4)}
+
+    plan = PlanRaster(axes, profiles, list(args.order.upper()) if args.order else None, args.point_time, args.move_overhead)
+    for order, predicted in sorted(plan.candidates.items(), key=lambda item: item[1]):
+        print(f"{'>'.join(order):8s} {predicted:10.1f} s")
+    print(plan.Summary())
+
+
+if __name__ == '__main__':
+    main()
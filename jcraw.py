@@ -0,0 +1,206 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jcraw.py
+
+    Deferred processing of raw scans. Scans captured with raw frames keep the
+    Bayer (or mono) data exactly as the camera delivered it; this converts a
+    whole scan to RGB16 afterwards, demosaicing batches of frames at once with
+    NumPy on several threads.
+
+    python jcraw.py 240721_0001.h5 [-o 240721_0001_rgb.h5] [--workers 4]
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from jcstore import CreateScanStore, ScanReader
+
+# Row and column of the red site in each 2x2 cell of a Bayer pattern
+BAYER_OFFSETS = {
+    'BayerRG': (0, 0),
+    'BayerGR': (0, 1),
+    'BayerGB': (1, 0),
+    'BayerBG': (1, 1),
+}
+
+
+def Demosaic(raw, pattern='BayerRG', nearest=False):
+    """
+    Demosaic Bayer data to float32 RGB. Works on the last two axes, so a
+    stack of frames is demosaiced in one call.
+
+    :param raw: Bayer data of shape (..., height, width), even height and width.
+    :param pattern: Pixel format name, e.g. 'BayerRG8'; only the first 7 characters matter.
+    :param nearest: Replicate each 2x2 cell instead of bilinear interpolation.
+    :return: Array of shape (..., height, width, 3).
+    """
+    raw = np.asarray(raw)
+    ry, rx = BAYER_OFFSETS[pattern[:7]]
+    by, bx = 1 - ry, 1 - rx
+    height, width = raw.shape[-2:]
+    rgb = np.empty(raw.shape + (3,), dtype=np.float32)
+
+    def out(channel, y0, x0):
+        return rgb[..., y0::2, x0::2, channel]
+
+    if nearest:
+        for y0 in (0, 1):
+            for x0 in (0, 1):
+                out(0, y0, x0)[...] = raw[..., ry::2, rx::2]
+                out(2, y0, x0)[...] = raw[..., by::2, bx::2]
+                out(1, y0, x0)[...] = raw[..., ry::2, bx::2] if y0 == ry else raw[..., by::2, rx::2]
+        return rgb
+
+    # Reflecting by one pixel keeps the Bayer phase of the border
+    pad = [(0, 0)] * (raw.ndim - 2) + [(1, 1), (1, 1)]
+    p = np.pad(raw.astype(np.float32), pad, mode='reflect')
+
+    def site(y0, x0, dy=0, dx=0):
+        # Neighbour (dy, dx) of every site at phase (y0, x0)
+        return p[..., 1 + y0 + dy:1 + y0 + dy + height:2, 1 + x0 + dx:1 + x0 + dx + width:2]
+
+    def cross(y0, x0):
+        return (site(y0, x0, -1, 0) + site(y0, x0, 1, 0) + site(y0, x0, 0, -1) + site(y0, x0, 0, 1)) * 0.25
+
+    def diagonal(y0, x0):
+        return (site(y0, x0, -1, -1) + site(y0, x0, -1, 1) + site(y0, x0, 1, -1) + site(y0, x0, 1, 1)) * 0.25
+
+    def horizontal(y0, x0):
+        return (site(y0, x0, 0, -1) + site(y0, x0, 0, 1)) * 0.5
+
+    def vertical(y0, x0):
+        return (site(y0, x0, -1, 0) + site(y0, x0, 1, 0)) * 0.5
+
+    # Red sites
+    out(0, ry, rx)[...] = site(ry, rx)
+    out(1, ry, rx)[...] = cross(ry, rx)
+    out(2, ry, rx)[...] = diagonal(ry, rx)
+    # Blue sites
+    out(0, by, bx)[...] = diagonal(by, bx)
+    out(1, by, bx)[...] = cross(by, bx)
+    out(2, by, bx)[...] = site(by, bx)
+    # Green sites on red rows
+    out(0, ry, bx)[...] = horizontal(ry, bx)
+    out(1, ry, bx)[...] = site(ry, bx)
+    out(2, ry, bx)[...] = vertical(ry, bx)
+    # Green sites on blue rows
+    out(0, by, rx)[...] = vertical(by, rx)
+    out(1, by, rx)[...] = site(by, rx)
+    out(2, by, rx)[...] = horizontal(by, rx)
+    return rgb
+
+
+def ReduceBayer(raw, pattern, step, out=None):
+    """
+    Reduce Bayer data to RGB at 1/step of its size with strided slices, one
+    2x2 cell per output pixel and the two greens averaged. Much cheaper than
+    demosaicing the full frame, for display.
+
+    :param raw: Bayer data of shape (height, width).
+    :param pattern: Pixel format name, e.g. 'BayerRG8'; only the first 7 characters matter.
+    :param step: Even stride in pixels.
+    :param out: Optional array of shape (height // step, width // step, 3) to fill.
+    """
+    ry, rx = BAYER_OFFSETS[pattern[:7]]
+    by, bx = 1 - ry, 1 - rx
+    height, width = raw.shape[0] // step, raw.shape[1] // step
+
+    def site(y0, x0):
+        return raw[y0:y0 + height * step:step, x0:x0 + width * step:step]
+
+    if out is None:
+        out = np.empty((height, width, 3), dtype=raw.dtype)
+    out[..., 0] = site(ry, rx)
+    out[..., 2] = site(by, bx)
+    # (a + b) / 2 without overflow: (a >> 1) + (b >> 1) + (a & b & 1)
+    green_r, green_b = site(ry, bx), site(by, rx)
+    np.right_shift(green_r, 1, out=out[..., 1])
+    out[..., 1] += green_b >> 1
+    out[..., 1] += green_r & green_b & 1
+    return out
+
+
+def ToRGB16(frames, pattern='BayerRG8', nearest=False):
+    """
+    Convert raw frames to uint16, demosaicing Bayer data to RGB. 8 bit data
+    is scaled to the full 16 bit range like PixelFormat_RGB16 conversion,
+    including float32 frames averaged from 8 bit ones.
+    """
+    frames = np.asarray(frames)
+    data = Demosaic(frames, pattern, nearest) if pattern.startswith('Bayer') else frames.astype(np.float32)
+    if frames.dtype == np.uint8 or pattern.endswith('8'):
+        data *= 257
+    return np.clip(data, 0, 65535).astype(np.uint16)
+
+
+def BatchDemosaic(input_path, output_path=None, pattern=None, nearest=False, workers=None, batch_size=4, compression=None, log_signal=None):
+    """
+    Convert every frame of a raw scan to RGB16 and write a new scan with the
+    same metadata and any further images, such as noise maps, copied
+    unchanged. Frames are read in batches on the calling thread and
+    demosaiced on a pool of workers; NumPy releases the GIL, so the workers
+    run on separate cores.
+
+    :param output_path: Defaults to the input name with _rgb appended.
+    :param pattern: Pixel format of the raw data, defaults to the scan's pixel_format attribute.
+    :param workers: Worker threads, defaults to the number of cores.
+    :return: Path of the converted scan.
+    """
+    log = log_signal if log_signal else print
+    start = time.perf_counter()
+    reader = ScanReader(input_path)
+    pattern = pattern or str(reader.attributes.get('pixel_format', 'BayerRG8'))
+    workers = workers or os.cpu_count() or 1
+    if output_path is None:
+        base, extension = os.path.splitext(input_path)
+        output_path = f"{base}_rgb{extension}"
+
+    attributes = dict(reader.attributes)
+    attributes['source'] = os.path.basename(input_path)
+    attributes['pixel_format'] = 'RGB16'
+    store = CreateScanStore(output_path, compression, attributes)
+
+    def write(first, future):
+        for index, frame in enumerate(future.result(), first):
+            store.Append(frame, {key: values[index] for key, values in reader.metadata.items()},
+                         {name: reader.Frame(index, name) for name in reader.images})
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Demosaic") as executor:
+            pending = deque()
+            for first in range(0, len(reader), batch_size):
+                frames = reader.Frames(first, min(first + batch_size, len(reader)))
+                pending.append((first, executor.submit(ToRGB16, frames, pattern, nearest)))
+                # Bound the batches held in memory
+                if len(pending) > 2 * workers:
+                    write(*pending.popleft())
+            while pending:
+                write(*pending.popleft())
+    finally:
+        store.Close()
+        reader.Close()
+
+    log("INFO", "Demosaic", "Raw scan converted", f"{output_path}, {len(reader)} frames in {time.perf_counter() - start:.2f} s")
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Demosaic a raw scan into RGB16 frames")
+    parser.add_argument('input', help="Raw scan (.h5 or .bin)")
+    parser.add_argument('-o', '--output', help="Output scan, defaults to <input>_rgb")
+    parser.add_argument('--pattern', help="Pixel format of the raw frames, e.g. BayerRG8")
+    parser.add_argument('--nearest', action='store_true', help="Nearest neighbour instead of bilinear demosaic")
+    parser.add_argument('--workers', type=int, help="Worker threads, defaults to the number of cores")
+    parser.add_argument('--batch-size', type=int, default=4, help="Frames demosaiced per batch")
+    parser.add_argument('--compression', choices=['fast', 'small'], help="Compression of the output scan")
+    args = parser.parse_args()
+    BatchDemosaic(args.input, args.output, args.pattern, args.nearest, args.workers, args.batch_size, args.compression)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,341 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jcrun.py
+
+    Headless scan runner. Drives MaskMotor and Camera from scan recipes
+    without the GUI or Qt, connecting the hardware once and running every
+    recipe back to back, e.g. to queue scans overnight:
+
+    python jcrun.py night.json [more.yaml ...] [--dry-run]
+
+    A recipe file holds one recipe, a list of them, or {"recipes": [...]}:
+
+    {
+        "name": "z focus series",
+        "scan": "step",                 step, fly, raster or points
+        "axis": "Z", "start": 1.0, "stop": 1.2, "step": 0.01,      step and fly
+        "axes": {"X": [0, 1, 0.1], "Y": [0, 2, 0.1]}, "order": "YX",   raster
+        "points": "sites.csv", "optimise": true,                     points
+        "move": {"X": 0.5},             optional move before the scan
+        "autofocus": {"range": 0.5, "metric": "laplacian"},         optional
+        "exposure_time": 10000, "gain": 0, "trigger": "Software",    optional
+        "frames_per_point": 4, "frame_reduction": "mean",
+        "output": "scans/night", "scan_format": "hdf5",
+        "scan_compression": null, "raw_capture": false
+    }
+
+    Every recipe is checked before the hardware is connected, so a typo
+    fails at once rather than hours into a queue. A recipe that fails at
+    run time is logged and the queue moves on to the next.
+"""
+import argparse
+import json
+import numbers
+import os
+import sys
+import time
+from datetime import datetime
+
+from jcaverage import MAX_MEDIAN_FRAMES, REDUCTIONS
+from jcflir import Camera
+from jcfocus import FOCUS_METHODS, Autofocus
+from jckcube import MaskMotor, StatusPoller
+from jcplan import LoadPoints
+from jcraw import BatchDemosaic
+from jcscan import ScanEngine
+from jcstore import HDF5_COMPRESSION, SCAN_FORMATS, NextScanName, OpenScanStore
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+SCAN_TYPES = ('step', 'fly', 'raster', 'points')
+REQUIRED_KEYS = {
+    'step': ('axis', 'start', 'stop', 'step'),
+    'fly': ('axis', 'start', 'stop', 'step'),
+    'raster': ('axes',),
+    'points': ('points',),
+}
+RECIPE_KEYS = {'name', 'scan', 'axis', 'start', 'stop', 'step', 'axes', 'order', 'points', 'optimise', 'move', 'autofocus',
+               'exposure_time', 'gain', 'frames_per_point', 'frame_reduction', 'output', 'scan_format', 'scan_compression',
+               'raw_capture', 'trigger', 'source'}
+AXES = ('X', 'Y', 'Z')
+
+# Controller serial numbers, as in jcgui.CameraGUI
+SERIAL_NUMBERS = {'X': '27263196', 'Y': '27263127', 'Z': '28252438'}
+
+
+def ConsoleLog(level, component, message, details=""):
+    """log_signal printing the same tab separated records as the GUI log file."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    print("\t".join((timestamp, level, component, message, details)), flush=True)
+
+
+def LoadRecipes(path):
+    """
+    Read the recipes in a .json, .yaml or .yml file. Relative point list
+    paths are taken from the recipe file's directory.
+
+    :return: List of recipe dicts, each with its 'source' file.
+    :raises ValueError: If a recipe is malformed.
+    """
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise ImportError("PyYAML is required to read YAML recipes")
+            content = yaml.safe_load(f)
+        else:
+            content = json.load(f)
+    if isinstance(content, dict):
+        content = content.get('recipes', [content])
+
+    recipes = []
+    for index, recipe in enumerate(content, 1):
+        recipe = dict(recipe, source=path)
+        recipe.setdefault('name', f"{os.path.basename(path)} #{index}")
+        if isinstance(recipe.get('points'), str) and not os.path.isabs(recipe['points']):
+            recipe['points'] = os.path.join(os.path.dirname(os.path.abspath(path)), recipe['points'])
+        CheckRecipe(recipe)
+        recipes.append(recipe)
+    return recipes
+
+
+def _IsNumber(value):
+    """True for an int or float, but not a bool, which JSON and YAML also give for true/false."""
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+def CheckRecipe(recipe):
+    """
+    :raises ValueError: If the recipe has an unknown scan type, key or axis,
+                        lacks a key its scan needs, or has a value of the
+                        wrong type or outside the choices its key allows.
+    """
+    name = recipe.get('name')
+    scan = recipe.get('scan')
+    if scan not in SCAN_TYPES:
+        raise ValueError(f"Recipe {name}: unknown scan {scan}, expected one of {', '.join(SCAN_TYPES)}")
+    unknown = set(recipe) - RECIPE_KEYS
+    if unknown:
+        raise ValueError(f"Recipe {name}: unknown keys {', '.join(sorted(unknown))}")
+    missing = [key for key in REQUIRED_KEYS[scan] if key not in recipe]
+    if missing:
+        raise ValueError(f"Recipe {name}: {scan} scan needs {', '.join(missing)}")
+
+    _CheckOptions(recipe)
+
+    if not isinstance(recipe.get('move', {}), dict):
+        raise ValueError(f"Recipe {name}: move must map axes to positions, e.g. {{\"X\": 0.5}}, not {recipe['move']!r}")
+    for axis, position in recipe.get('move', {}).items():
+        if not _IsNumber(position):
+            raise ValueError(f"Recipe {name}: move {axis} must be a number, not {position!r}")
+    axes = list(recipe.get('move', {}))
+    if scan in ('step', 'fly'):
+        axes.append(recipe['axis'])
+        for key in ('start', 'stop', 'step'):
+            if not _IsNumber(recipe[key]):
+                raise ValueError(f"Recipe {name}: {key} must be a number, not {recipe[key]!r}")
+        if recipe['step'] <= 0:
+            raise ValueError(f"Recipe {name}: step must be positive")
+    elif scan == 'raster':
+        if not isinstance(recipe['axes'], dict) or not recipe['axes']:
+            raise ValueError(f"Recipe {name}: axes must map axes to [start, stop, step], not {recipe['axes']!r}")
+        axes.extend(recipe['axes'])
+        for axis, values in recipe['axes'].items():
+            if not isinstance(values, (list, tuple)) or len(values) != 3 or not all(_IsNumber(value) for value in values) or values[2] <= 0:
+                raise ValueError(f"Recipe {name}: raster axis {axis} needs numbers [start, stop, step] with a positive step")
+        order = recipe.get('order')
+        if order is not None and (not isinstance(order, str) or sorted(order.upper()) != sorted(axis.upper() for axis in recipe['axes'])):
+            raise ValueError(f"Recipe {name}: order {order!r} must name each raster axis once, "
+                             f"e.g. {''.join(axis.upper() for axis in recipe['axes'])!r}")
+    elif scan == 'points':
+        points = recipe['points']
+        if isinstance(points, str):
+            if not os.path.exists(points):
+                raise ValueError(f"Recipe {name}: point list {points} not found")
+        elif not isinstance(points, list) or not all(isinstance(point, dict) for point in points):
+            raise ValueError(f"Recipe {name}: points must be a point list file or a list of {{axis: position}}")
+    for axis in axes:
+        if not isinstance(axis, str) or axis.upper() not in AXES:
+            raise ValueError(f"Recipe {name}: unknown axis {axis}")
+
+
+def _CheckOptions(recipe):
+    """The optional camera, averaging, autofocus and output keys, see CheckRecipe."""
+    name = recipe.get('name')
+    focus = recipe.get('autofocus')
+    if focus not in (None, False):
+        if not isinstance(focus, dict) or set(focus) - {'range', 'metric'}:
+            raise ValueError(f"Recipe {name}: autofocus must be {{\"range\": mm, \"metric\": name}} or false, not {focus!r}")
+        if 'range' in focus and (not _IsNumber(focus['range']) or focus['range'] <= 0):
+            raise ValueError(f"Recipe {name}: autofocus range must be a positive number, not {focus['range']!r}")
+        if focus.get('metric', FOCUS_METHODS[0]) not in FOCUS_METHODS:
+            raise ValueError(f"Recipe {name}: unknown autofocus metric {focus['metric']!r}, expected one of {', '.join(FOCUS_METHODS)}")
+
+    frames = recipe.get('frames_per_point', 1)
+    if not isinstance(frames, int) or isinstance(frames, bool) or frames < 1:
+        raise ValueError(f"Recipe {name}: frames_per_point must be a positive integer, not {frames!r}")
+    reduction = recipe.get('frame_reduction', 'mean')
+    if reduction not in REDUCTIONS:
+        raise ValueError(f"Recipe {name}: unknown frame_reduction {reduction!r}, expected one of {', '.join(REDUCTIONS)}")
+    if reduction == 'median' and frames > MAX_MEDIAN_FRAMES:
+        raise ValueError(f"Recipe {name}: median of more than {MAX_MEDIAN_FRAMES} frames_per_point is not supported")
+
+    for key in ('exposure_time', 'gain'):
+        if key in recipe and not _IsNumber(recipe[key]):
+            raise ValueError(f"Recipe {name}: {key} must be a number, not {recipe[key]!r}")
+    trigger = recipe.get('trigger')
+    if trigger is not None and not isinstance(trigger, str):
+        raise ValueError(f"Recipe {name}: trigger must be \"Software\", an input line such as \"Line0\" or null, not {trigger!r}")
+    if recipe.get('scan_format', 'hdf5') not in SCAN_FORMATS:
+        raise ValueError(f"Recipe {name}: unknown scan_format {recipe['scan_format']!r}, expected one of {', '.join(SCAN_FORMATS)}")
+    compression = recipe.get('scan_compression')
+    if not isinstance(compression, (str, type(None))) or compression not in HDF5_COMPRESSION:
+        raise ValueError(f"Recipe {name}: unknown scan_compression {recipe['scan_compression']!r}, "
+                         f"expected null or one of {', '.join(key for key in HDF5_COMPRESSION if key)}")
+    if not isinstance(recipe.get('output', '.'), str):
+        raise ValueError(f"Recipe {name}: output must be a directory name, not {recipe['output']!r}")
+
+
+class ScanRunner:
+    """
+    Runs recipes on one set of connected hardware. The same MaskMotor and
+    Camera serve every recipe; only the camera settings and scan output
+    change between them.
+    """
+    def __init__(self, log_signal=None):
+        self.log_signal = log_signal if log_signal else ConsoleLog
+        self.mask_motor = None
+        self.camera = None
+        self.status_poller = None
+
+    def log(self, level, component, message, details=""):
+        self.log_signal(level, component, message, details)
+
+    def Connect(self):
+        self.camera = Camera(log_signal=self.log_signal)
+        self.camera.ConnectCamera()
+        if self.camera.cam is None:
+            raise RuntimeError("No camera connected")
+        self.mask_motor = MaskMotor(SERIAL_NUMBERS['X'], SERIAL_NUMBERS['Y'], SERIAL_NUMBERS['Z'], log_signal=self.log_signal)
+        self.mask_motor.ConnectAllMotors()
+        self.status_poller = StatusPoller(self.mask_motor, log_signal=self.log_signal)
+        self.status_poller.Start()
+
+    def Disconnect(self):
+        if self.status_poller is not None:
+            self.status_poller.Stop()
+        if self.camera is not None and self.camera.cam is not None:
+            self.camera.DisconnectCamera()
+        if self.mask_motor is not None and self.mask_motor.motor_x is not None:
+            self.mask_motor.DisconnectAllMotors()
+
+    def RunAll(self, recipes):
+        """
+        Run recipes in order, carrying on past failures.
+
+        :return: Names of the recipes that failed.
+        """
+        failed = []
+        for number, recipe in enumerate(recipes, 1):
+            self.log("INFO", "Runner", f"Recipe {number} of {len(recipes)}", recipe['name'])
+            try:
+                self.Run(recipe)
+            except Exception as e:
+                self.log("ERROR", "Runner", f"Recipe {recipe['name']} failed", str(e))
+                failed.append(recipe['name'])
+        return failed
+
+    def Run(self, recipe):
+        start = time.perf_counter()
+        if 'exposure_time' in recipe or 'gain' in recipe:
+            settings = self.camera.GetCameraSettings()
+            if not self.camera.SetCameraSettings(recipe.get('gain', settings['gain']), recipe.get('exposure_time', settings['exposure_time'])):
+                raise RuntimeError("Camera settings rejected")
+
+        if recipe.get('move'):
+            self.mask_motor.MoveMotorsConcurrently({axis.upper(): position for axis, position in recipe['move'].items()})
+
+        if recipe.get('autofocus'):
+            focus = recipe['autofocus']
+            search_range = focus.get('range', 0.5)
+            position = self.mask_motor.GetPositionValue(self.mask_motor.motor_z)
+            autofocus = Autofocus(self.mask_motor, self.camera, focus.get('metric', 'laplacian'), log_signal=self.log_signal)
+            autofocus.Run(position - search_range / 2, position + search_range / 2, "Z")
+
+        directory = recipe.get('output', '.')
+        os.makedirs(directory, exist_ok=True)
+        raw = recipe.get('raw_capture', False)
+        attributes = {'recipe': json.dumps({key: value for key, value in recipe.items() if key != 'source'}),
+                      'scan_mode': recipe['scan']}
+        if raw:
+            attributes['pixel_format'] = self.camera.GetPixelFormat()
+        store = OpenScanStore(directory, recipe.get('scan_format', 'hdf5'), recipe.get('scan_compression'), attributes)
+        filename_pattern = NextScanName(directory) + '_%03d.png'
+        if raw and store is None:
+            self.log("WARNING", "Runner", "Raw capture needs a scan container", "Saving converted PNGs")
+            raw = False
+        self.log("INFO", "Runner", "Scan output", store.path if store else filename_pattern)
+
+        scan = ScanEngine(self.mask_motor, self.camera, log_signal=self.log_signal, average=recipe.get('frames_per_point', 1),
+                          reduction=recipe.get('frame_reduction', 'mean'), status_poller=self.status_poller)
+        kind = recipe['scan']
+        trigger = recipe.get('trigger') if kind != 'fly' else None
+        if trigger and not self.camera.SetTriggerMode(trigger):
+            raise RuntimeError(f"Camera cannot trigger from {trigger}")
+        try:
+            if kind in ('step', 'fly'):
+                axis = recipe['axis'].upper()
+                run = scan.FlyScan if kind == 'fly' else scan.StepScan
+                stats = run(self.mask_motor.GetMotor(axis), axis, recipe['start'], recipe['stop'], recipe['step'],
+                            filename_pattern=filename_pattern, store=store, raw=raw)
+            elif kind == 'raster':
+                axes = {axis.upper(): tuple(values) for axis, values in recipe['axes'].items()}
+                order = list(recipe['order'].upper()) if recipe.get('order') else None
+                stats = scan.RasterScan(scan.PlanRaster(axes, order), filename_pattern=filename_pattern, store=store, raw=raw)
+            else:
+                points = LoadPoints(recipe['points']) if isinstance(recipe['points'], str) else recipe['points']
+                plan = scan.PlanPoints(points, recipe.get('optimise', True))
+                stats = scan.PointScan(plan, filename_pattern=filename_pattern, store=store, raw=raw)
+        finally:
+            if store:
+                store.Close()
+            if trigger:
+                self.camera.SetTriggerMode(None)
+
+        if raw:
+            BatchDemosaic(store.path, log_signal=self.log_signal)
+        self.log("INFO", "Runner", f"Recipe {recipe['name']} complete", f"Total={time.perf_counter() - start:.1f} s, {stats.Summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scan recipes without the GUI")
+    parser.add_argument('recipes', nargs='+', help="Recipe files (.json, .yaml or .yml), run in order")
+    parser.add_argument('--dry-run', action='store_true', help="Check the recipes and exit without connecting the hardware")
+    args = parser.parse_args()
+
+    try:
+        recipes = [recipe for path in args.recipes for recipe in LoadRecipes(path)]
+    except (OSError, ValueError, ImportError) as e:
+        ConsoleLog("ERROR", "Runner", "Invalid recipe", str(e))
+        return 2
+    ConsoleLog("INFO", "Runner", f"{len(recipes)} recipes loaded", ", ".join(recipe['name'] for recipe in recipes))
+    if args.dry_run:
+        return 0
+
+    runner = ScanRunner()
+    try:
+        runner.Connect()
+        failed = runner.RunAll(recipes)
+    finally:
+        runner.Disconnect()
+    if failed:
+        ConsoleLog("ERROR", "Runner", f"{len(failed)} of {len(recipes)} recipes failed", ", ".join(failed))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,582 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jcscan.py
+
+    Scan engine driving MaskMotor and Camera. Captured frames are handed to a
+    bounded pool of writer threads so the next move starts while the previous
+    frame is still being compressed and written.
+
+    StepScan stops at every point; FlyScan sweeps the stage at constant
+    velocity with the camera running and tags each frame with the position
+    interpolated from the motor's readback. Stopping scans can fold several
+    frames per point into one with jcaverage, saving a noise map alongside.
+"""
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from jcaverage import FrameAccumulator
+from jckcube import PositionRecorder
+from jclatency import latency
+from jctrace import tracer
+from jcplan import PlanPoints, PlanRaster
+
+FLY_SETTLE_TIME = 0.05  # Seconds at constant velocity before the first point of a fly scan
+FLY_MAX_PENDING = 64    # Raw frames a fly scan may queue for conversion, the stage cannot wait for the writers
+
+
+class ScanStats:
+    """
+    Accumulates the time spent in each stage of a scan so utilisation can be
+    reported at the end. Stages run on the scan thread except 'write', which
+    is spread over the writer threads. Every duration also goes to the
+    rolling latency tracker as scan.<stage>.
+    """
+    def __init__(self, writers=1):
+        self.writers = writers
+        self.totals = {}
+        self.counts = {}
+        self.wall_time = 0.0
+        self.predicted_time = None
+        self.stale_frames = 0
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def Add(self, stage, seconds, end=None):
+        latency.Record('scan.' + stage, seconds, end)
+        with self.lock:
+            self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+            self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def Timed(self, stage, function, *args):
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            end = time.perf_counter()
+            self.Add(stage, end - start, end)
+
+    def Utilisation(self):
+        """Fraction of the scan's wall time each stage was busy, per stage."""
+        if self.wall_time <= 0:
+            return {}
+        utilisation = {}
+        for stage, total in self.totals.items():
+            capacity = self.wall_time * (self.writers if stage == 'write' else 1)
+            utilisation[stage] = total / capacity
+        return utilisation
+
+    def Summary(self):
+        parts = [f"{stage}={fraction * 100:.0f}%" for stage, fraction in self.Utilisation().items()]
+        if self.predicted_time is not None:
+            parts.insert(0, f"Predicted={self.predicted_time:.2f} s")
+        if self.stale_frames:
+            parts.append(f"Stale frames={self.stale_frames}")
+        return f"Wall={self.wall_time:.2f} s, " + ", ".join(parts)
+
+
+class FrameWriter:
+    """
+    Saves frames on a pool of background threads. At most max_pending frames
+    may be queued or in flight; Submit blocks beyond that, which holds the
+    scan back instead of letting frames pile up in memory.
+    """
+    def __init__(self, save, stats, workers=2, max_pending=4, log_signal=None):
+        self.save = save
+        self.stats = stats
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="FrameWriter")
+        self.log_signal = log_signal if log_signal else print
+
+    def log(self, level, component, message, details=""):
+        self.log_signal(level, component, message, details)
+
+    def Submit(self, *args):
+        start = time.perf_counter()
+        self.slots.acquire()
+        end = time.perf_counter()
+        self.stats.Add('backpressure', end - start, end)
+        try:
+            self.executor.submit(self._Write, *args)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def _Write(self, *args):
+        try:
+            self.stats.Timed('write', self.save, *args)
+        except Exception as e:
+            self.log("ERROR", "FrameWriter", "Failed to write frame", str(e))
+        finally:
+            self.slots.release()
+
+    def Close(self):
+        """Wait for every queued frame to be written."""
+        self.executor.shutdown(wait=True)
+
+
+class ScanEngine:
+    def __init__(self, mask_motor, camera, log_signal=None, writers=2, max_pending=4, average=1, reduction='mean', status_poller=None,
+                 trace=True):
+        """
+        :param average: Frames captured at each point of a stopping scan.
+                        Above 1 they are reduced to one float32 frame saved
+                        with a 'noise' map of their per-pixel standard deviation.
+        :param reduction: How the frames are reduced, 'mean', 'median' or 'max'.
+        :param status_poller: Optional running jckcube.StatusPoller; positions
+                              of stages at rest are then taken from its snapshot.
+        :param trace: Export the timeline of each scan as Chrome trace JSON
+                      next to its output, see _ExportTrace.
+        """
+        self.mask_motor = mask_motor
+        self.camera = camera
+        self.writers = writers
+        self.max_pending = max_pending
+        self.log_signal = log_signal if log_signal else print
+        self.accumulator = FrameAccumulator(average, reduction) if average > 1 else None
+        self.status_poller = status_poller
+        self.trace = trace
+
+    def log(self, level, component, message, details=""):
+        self.log_signal(level, component, message, details)
+
+    def _OpenWriter(self, store):
+        if store is not None:
+            # A container takes frames in order, so it gets a single writer
+            stats = ScanStats(1)
+            return stats, FrameWriter(store.Append, stats, 1, self.max_pending, self.log_signal)
+        stats = ScanStats(self.writers)
+        return stats, FrameWriter(self.camera.SaveImage, stats, self.writers, self.max_pending, self.log_signal)
+
+    def _Capture(self, stats, writer, store, raw, positions, settings, filename, details, not_before):
+        """
+        Capture a frame at the current point and queue it for the writers.
+
+        :param not_before: perf_counter time the stage settled; frames exposed before it are discarded.
+        """
+        if self.accumulator is not None:
+            # _CaptureAverage logs the point itself
+            self._CaptureAverage(stats, writer, store, raw, positions, settings, filename, details, not_before)
+            return
+        if store is not None:
+            frame = stats.Timed('acquire', self.camera.CaptureFrame, 1000, raw, self._Expose(not_before))
+            if frame is None:
+                return
+            metadata = dict(positions, frame_id=frame.frame_id, timestamp=frame.timestamp, time=time.time())
+            metadata.update(settings)
+            writer.Submit(frame.data, metadata)
+        else:
+            image = stats.Timed('acquire', self.camera.CaptureImage, self._Expose(not_before))
+            if image is None:
+                return
+            writer.Submit(image, filename)
+        self.log("INFO", "ScanMode", "Image acquired", details)
+
+    def _Expose(self, not_before):
+        """
+        With the camera on its software trigger, start the exposure of the
+        next frame now that the stage has settled.
+
+        :return: The time the frame must start after.
+        """
+        fired = self.camera.TriggerFrame()
+        return fired if fired is not None else not_before
+
+    def _CaptureAverage(self, stats, writer, store, raw, positions, settings, filename, details, not_before):
+        """Capture several frames at the current point and queue their reduction."""
+        accumulator = self.accumulator
+        accumulator.Reset()
+        first = None
+        for _ in range(accumulator.frames):
+            frame = stats.Timed('acquire', self.camera.CaptureFrame, 1000, raw and store is not None, self._Expose(not_before))
+            if frame is None:
+                continue
+            if first is None:
+                first = frame
+            stats.Timed('reduce', accumulator.Add, frame.data)
+        if first is None:
+            return
+        reduced, noise = stats.Timed('reduce', accumulator.Result)
+
+        if store is not None:
+            metadata = dict(positions, frame_id=first.frame_id, timestamp=first.timestamp, time=time.time(),
+                            frames_averaged=accumulator.count)
+            metadata.update(settings)
+            writer.Submit(reduced, metadata, {'noise': noise})
+        else:
+            # Without a container the reduction is rounded back to an RGB16 PNG
+            noise_filename = "%s_noise%s" % os.path.splitext(filename)
+            writer.Submit(self._RGB16Image(reduced), filename)
+            writer.Submit(self._RGB16Image(noise), noise_filename)
+        self.log("INFO", "ScanMode", f"Image acquired, {accumulator.count} frames {accumulator.reduction}", details)
+
+    def _ExportTrace(self, kind, stats, store, filename_pattern):
+        """
+        Write the spans of every thread since the scan started to
+        <scan>_trace.json beside the container, or beside the PNGs named by
+        filename_pattern, for chrome://tracing or Perfetto. A pattern such as
+        the default one is reused by every scan, so the trace of a later scan
+        gets a series number, <scan>_trace_2.json..., rather than replacing it.
+        """
+        tracer.Add(f"scan.{kind}", stats.started, time.perf_counter())
+        if not self.trace:
+            return
+        base = os.path.splitext(store.path)[0] if store is not None else filename_pattern.split('%')[0].rstrip('_ ')
+        base = (base or 'scan') + '_trace'
+        path = base + '.json'
+        series = 1
+        while os.path.exists(path):
+            series += 1
+            path = f"{base}_{series}.json"
+        try:
+            count = tracer.Export(path, stats.started)
+            self.log("INFO", "ScanMode", "Scan trace saved", f"{path}, {count} spans")
+        except OSError as e:
+            self.log("WARNING", "ScanMode", "Failed to save scan trace", str(e))
+
+    def _RGB16Image(self, data):
+        return self.camera.ImageFromArray(np.clip(np.rint(data), 0, 65535).astype(np.uint16), 'RGB16')
+
+    def StepScan(self, motor, axis_name, start_position, target_position, step_size, progress=None, filename_pattern='Image Single Scan %d.png', store=None, raw=False):
+        """
+        Jog motor from start_position towards target_position in steps of
+        step_size, capturing a frame at every point. Frames are saved in the
+        background while the stage moves on to the next point. Buffered frames
+        exposed before the stage settled are discarded, see Camera.NextImage.
+        With the camera on its software trigger each frame is triggered as
+        soon as the move completes.
+
+        :param progress: Optional callable given the percentage complete.
+        :param filename_pattern: PNG filename for each point, used without a store.
+        :param store: Optional scan container from jcstore. Frames are appended
+                      to it in order with their position, exposure, gain and
+                      timestamps instead of being saved as PNGs.
+        :param raw: With a store, keep the raw sensor data of each frame and
+                    leave the demosaic to jcraw.BatchDemosaic.
+        :return: ScanStats with the time spent moving, acquiring, writing and
+                 waiting on the writers.
+        """
+        # Save step size
+        self.mask_motor.SetJogParams(motor, step_size)
+        self.log("INFO", "ScanMode", f"Jog step size set for {axis_name} scan", f"Step size: {step_size} mm")
+
+        self.mask_motor.MoveMotor(motor, start_position, axis_name)
+        settled = time.perf_counter()
+
+        # Calculate the number of steps and the direction of the scan
+        # The tolerance keeps a float quotient just short of an integer from losing the last point, as in jcplan.AxisPoints
+        num_steps = int(abs(target_position - start_position) / step_size + 1e-9)
+        forward = target_position > start_position
+
+        stats, writer = self._OpenWriter(store)
+        settings = self.camera.GetCameraSettings() if store is not None else None
+        self.camera.SyncClock()
+        stale_frames = self.camera.stale_frames
+
+        start = time.perf_counter()
+        try:
+            for step in range(num_steps + 1):
+                point_start = time.perf_counter()
+                if step > 0:
+                    jog = self.mask_motor.ForwardJogMotor if forward else self.mask_motor.BackwardJogMotor
+                    stats.Timed('motion', jog, motor, axis_name)
+                    settled = time.perf_counter()
+
+                current_position = self._SettledPositions({axis_name: motor}, settled)[axis_name]
+                self._Capture(stats, writer, store, raw, {'position': current_position}, settings,
+                              filename_pattern % (step + 1), f"Position: {current_position} mm", settled)
+                tracer.Add('scan.point', point_start, time.perf_counter(), {'index': step})
+
+                if progress:
+                    progress(int((step / num_steps) * 100) if num_steps else 100)
+        finally:
+            writer.Close()
+            stats.wall_time = time.perf_counter() - start
+            stats.stale_frames = self.camera.stale_frames - stale_frames
+
+        self.log("INFO", "ScanMode", "Scan utilisation", stats.Summary())
+        self._ExportTrace("StepScan", stats, store, filename_pattern)
+        return stats
+
+    def FlyScan(self, motor, axis_name, start_position, target_position, step_size, progress=None,
+                filename_pattern='Image Single Scan %d.png', store=None, raw=False, frames_per_step=2, velocity=None):
+        """
+        Sweep motor through start_position to target_position at constant
+        velocity while the camera runs freely. Each frame's exposure midpoint
+        is put on the host clock and tagged with the position interpolated
+        from the motor's readback; of the frames around every step_size point
+        the one closest to it is kept, so the output matches a StepScan.
+        Frames are never averaged, the stage does not wait at a point.
+
+        The stage runs up to speed before start_position and out past
+        target_position, and its velocity parameters are restored afterwards.
+
+        :param frames_per_step: Frames the camera takes per step at the default
+                                velocity; more keeps frames closer to each point.
+        :param velocity: mm/s, defaults to step_size * frame rate / frames_per_step,
+                         capped at the motor's max velocity.
+        :return: ScanStats as for StepScan.
+        """
+        settings = self.camera.GetCameraSettings()
+        exposure = settings['exposure_time'] / 1e6
+        max_velocity, acceleration = self.mask_motor.GetVelocityValues(motor)
+        if velocity is None:
+            velocity = step_size * self.camera.GetFrameRate() / frames_per_step
+        velocity = min(velocity, max_velocity)
+        # A frame rate that could not be read is NaN, which min() passes through
+        if not math.isfinite(velocity) or velocity <= 0:
+            raise ValueError(f"Fly scan velocity {velocity} mm/s is not usable; check the camera frame rate")
+
+        num_steps = int(abs(target_position - start_position) / step_size + 1e-9)
+        direction = 1 if target_position >= start_position else -1
+        last_position = start_position + direction * num_steps * step_size
+        minimum, maximum = self.mask_motor.GetTravelLimits(motor)
+        if not (minimum <= start_position <= maximum and minimum <= last_position <= maximum):
+            raise ValueError(f"Fly scan {start_position}-{last_position} mm is outside the travel of {axis_name} "
+                             f"({minimum}-{maximum} mm)")
+        run_up = velocity ** 2 / (2 * acceleration) + velocity * FLY_SETTLE_TIME
+        # Near the ends of travel the stage gets what run-up there is; frames before it reaches speed are still tagged
+        run_start = min(max(start_position - direction * run_up, minimum), maximum)
+        end_position = min(max(last_position + direction * run_up, minimum), maximum)
+        self.log("INFO", "ScanMode", f"Fly scan on {axis_name}",
+                 f"Velocity={velocity:.3f} mm/s, Run-up={run_up:.3f} mm, Blur={velocity * exposure * 1000:.2f} um")
+        shortened = min(abs(start_position - run_start), abs(end_position - last_position))
+        if shortened < run_up - 1e-9:
+            self.log("WARNING", "ScanMode", f"Fly scan run-up on {axis_name} shortened by the travel limits",
+                     f"Run-up={shortened:.3f} mm of {run_up:.3f} mm, Travel={minimum}-{maximum} mm")
+
+        self.mask_motor.MoveMotor(motor, run_start, axis_name)
+
+        pixel_format = self.camera.GetPixelFormat()
+        if store is not None:
+            stats = ScanStats(1)
+
+            def save(data, metadata):
+                if not raw:
+                    data = self.camera.save_converter.ConvertCopy(self.camera.ImageFromArray(data, pixel_format))
+                store.Append(data, metadata)
+            writer = FrameWriter(save, stats, 1, FLY_MAX_PENDING, self.log_signal)
+        else:
+            stats = ScanStats(self.writers)
+
+            def save(data, filename):
+                image = self.camera.save_converter.ConvertImage(self.camera.ImageFromArray(data, pixel_format))
+                self.camera.SaveImage(image, filename)
+            writer = FrameWriter(save, stats, self.writers, FLY_MAX_PENDING, self.log_signal)
+
+        # Every frame counts, so keep them all buffered rather than only the newest, with the camera running freely
+        previous_mode = self.camera.SetBufferHandlingMode('OldestFirst')
+        trigger_source = self.camera.trigger_source
+        if trigger_source is not None:
+            self.camera.SetTriggerMode(None)
+        clock_offset = self.camera.SyncClock()
+        recorder = PositionRecorder(motor)
+        waiting = deque()   # (frame, time) until the readback brackets the frame
+        best = None         # (step, error, frame, time, position) closest to the current step so far
+        kept = 0
+
+        def keep(candidate):
+            nonlocal kept
+            step, _, frame, frame_time, position = candidate
+            metadata = {'position': position, 'frame_id': frame.frame_id, 'timestamp': frame.timestamp,
+                        'time': time.time() - (time.perf_counter() - frame_time),
+                        'target': start_position + direction * step * step_size}
+            metadata.update(settings)
+            writer.Submit(frame.data, metadata if store is not None else filename_pattern % (step + 1))
+            kept += 1
+            self.log("INFO", "ScanMode", "Image acquired", f"Position: {position:.5f} mm")
+            if progress:
+                progress(int((step / num_steps) * 100) if num_steps else 100)
+
+        def tag(until):
+            nonlocal best
+            while waiting and waiting[0][1] < until:
+                frame, frame_time = waiting.popleft()
+                position = recorder.PositionAt(frame_time)
+                step = round((position - start_position) * direction / step_size)
+                if not 0 <= step <= num_steps:
+                    continue
+                error = abs(position - (start_position + direction * step * step_size))
+                if best is not None and best[0] != step:
+                    keep(best)
+                    best = None
+                if best is None or error < best[1]:
+                    best = (step, error, frame, frame_time, position)
+
+        start = time.perf_counter()
+        try:
+            self.mask_motor.SetVelocityParams(motor, velocity, acceleration)
+            recorder.Start()
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="FlyMove") as executor:
+                move = executor.submit(self.mask_motor.MoveMotor, motor, end_position, axis_name)
+                move_end = float('inf')
+                frame_time = 0.0
+                # Frames exposed during the sweep may still be buffered when it ends, so read up to the end of the move
+                while frame_time < move_end:
+                    if move_end == float('inf') and move.done():
+                        move_end = time.perf_counter()
+                    frame = stats.Timed('acquire', self.camera.CaptureFrame, 1000, True)
+                    if frame is None:
+                        if move.done():
+                            break
+                        continue
+                    if clock_offset is not None:
+                        frame_time = frame.timestamp / 1e9 + clock_offset + exposure / 2
+                    else:
+                        # Without the camera clock the transfer delay is not accounted for
+                        frame_time = time.perf_counter() - exposure / 2
+                    waiting.append((frame, frame_time))
+                    tag(recorder.LastChange())
+                move.result()
+            recorder.Stop()
+            tag(float('inf'))
+            if best is not None:
+                keep(best)
+        finally:
+            recorder.Stop()
+            writer.Close()
+            stats.wall_time = time.perf_counter() - start
+            self.mask_motor.SetVelocityParams(motor, max_velocity, acceleration)
+            if previous_mode:
+                self.camera.SetBufferHandlingMode(previous_mode)
+            if trigger_source is not None:
+                self.camera.SetTriggerMode(trigger_source)
+
+        if kept < num_steps + 1:
+            self.log("WARNING", "ScanMode", "Fly scan missed points",
+                     f"{num_steps + 1 - kept} of {num_steps + 1} had no frame, lower the velocity or raise frames_per_step")
+        self.log("INFO", "ScanMode", "Scan utilisation", stats.Summary())
+        self._ExportTrace("FlyScan", stats, store, filename_pattern)
+        return stats
+
+    def _Positions(self, motors):
+        """
+        Current positions of motors, a dict of axis name to motor, from the
+        status poller's snapshot when it is recent and no stage is moving.
+        """
+        if self.status_poller is not None:
+            snapshot = self.status_poller.Snapshot()
+            positions = {axis: snapshot.Position(axis) for axis in motors}
+            if None not in positions.values() and not snapshot.IsMoving() and snapshot.Age() < 2 * self.status_poller.interval:
+                return positions
+        return {axis: self.mask_motor.GetPositionValue(motor) for axis, motor in motors.items()}
+
+    def _SettledPositions(self, motors, settled):
+        """
+        Positions of motors, a dict of axis name to motor, that came to rest
+        at perf_counter time settled, from the first status poller snapshot
+        taken after it so the scan makes no interop call of its own. Axes the
+        snapshot lacks, or all of them without a poller, are read from the motors.
+        """
+        positions = {}
+        if self.status_poller is not None:
+            snapshot = self.status_poller.WaitForSnapshot(settled, 2 * self.status_poller.interval)
+            if snapshot is not None:
+                positions = {axis: snapshot.Position(axis) for axis in motors if snapshot.Position(axis) is not None}
+        for axis, motor in motors.items():
+            if axis not in positions:
+                positions[axis] = self.mask_motor.GetPositionValue(motor)
+        return positions
+
+    def _Profiles(self, axes):
+        """Velocity profiles and current positions of the motors for axes."""
+        motors = {axis: self.mask_motor.GetMotor(axis) for axis in axes}
+        profiles = {axis: self.mask_motor.GetVelocityValues(motor) for axis, motor in motors.items()}
+        origin = self._Positions(motors)
+        frame_rate = self.camera.GetFrameRate()
+        point_time = 1 / frame_rate if frame_rate > 0 else 0.0
+        return profiles, origin, point_time
+
+    def PlanRaster(self, axes, order=None):
+        """
+        Plan a raster scan from the current positions using each motor's
+        velocity parameters and one camera frame period per point.
+
+        :param axes: Dict of axis name to (start, stop, step) in mm.
+        :param order: Axis names, outermost first, or None for the quickest.
+        :rtype: jcplan.RasterPlan
+        """
+        profiles, origin, point_time = self._Profiles(axes)
+        plan = PlanRaster(axes, profiles, order, point_time, origin=origin)
+        self.log("INFO", "ScanMode", "Raster scan planned", plan.Summary())
+        return plan
+
+    def PlanPoints(self, points, optimise=True):
+        """
+        Order a list of sites for the shortest travel from the current
+        positions, under the motors' velocity parameters.
+
+        :param points: List of dicts of axis name to position, e.g. from jcplan.LoadPoints.
+        :rtype: jcplan.PointPlan
+        """
+        profiles, origin, point_time = self._Profiles(points[0] if points else {})
+        plan = PlanPoints(points, profiles, point_time, origin=origin, optimise=optimise)
+        self.log("INFO", "ScanMode", "Point list planned", plan.Summary())
+        return plan
+
+    def RasterScan(self, plan, progress=None, filename_pattern='Image Raster Scan %d.png', store=None, raw=False):
+        """
+        Visit the points of a jcplan.RasterPlan in order, capturing a frame at
+        each. Axes changing together move concurrently. Frame metadata holds
+        the read back position_x, position_y... of every axis in the plan,
+        as for a StepScan, and the planned point as target_x, target_y...
+
+        :return: ScanStats, with the plan's predicted_time alongside the wall time.
+        """
+        return self._RunPlan("Raster", plan, progress, filename_pattern, store, raw)
+
+    def PointScan(self, plan, progress=None, filename_pattern='Image Point Scan %d.png', store=None, raw=False):
+        """
+        Visit the sites of a jcplan.PointPlan in their planned order, as
+        RasterScan does for a grid.
+        """
+        return self._RunPlan("Point", plan, progress, filename_pattern, store, raw)
+
+    def _RunPlan(self, kind, plan, progress, filename_pattern, store, raw):
+        stats, writer = self._OpenWriter(store)
+        stats.predicted_time = plan.predicted_time
+        settings = self.camera.GetCameraSettings() if store is not None else None
+        self.camera.SyncClock()
+        stale_frames = self.camera.stale_frames
+
+        previous = {}
+        settled = time.perf_counter()
+        start = time.perf_counter()
+        try:
+            for index, point in enumerate(plan.points):
+                point_start = time.perf_counter()
+                moves = {axis: position for axis, position in point.items() if previous.get(axis) != position}
+                if len(moves) == 1:
+                    (axis, position), = moves.items()
+                    stats.Timed('motion', self.mask_motor.MoveMotor, self.mask_motor.GetMotor(axis), position, axis)
+                elif moves:
+                    stats.Timed('motion', self.mask_motor.MoveMotorsConcurrently, moves)
+                if moves:
+                    settled = time.perf_counter()
+                previous = point
+
+                # Read back like a StepScan's position, with the planned point kept as the target
+                measured = self._SettledPositions({axis: self.mask_motor.GetMotor(axis) for axis in point}, settled)
+                positions = {f"position_{axis.lower()}": position for axis, position in measured.items()}
+                positions.update({f"target_{axis.lower()}": position for axis, position in point.items()})
+                details = ", ".join(f"{axis}={position} mm" for axis, position in measured.items())
+                self._Capture(stats, writer, store, raw, positions, settings, filename_pattern % (index + 1), details, settled)
+                tracer.Add('scan.point', point_start, time.perf_counter(), {'index': index})
+
+                if progress:
+                    progress(int((index + 1) / len(plan.points) * 100))
+        finally:
+            writer.Close()
+            stats.wall_time = time.perf_counter() - start
+            stats.stale_frames = self.camera.stale_frames - stale_frames
+
+        self.log("INFO", "ScanMode", f"{kind} scan duration", f"Predicted={plan.predicted_time:.1f} s, Actual={stats.wall_time:.1f} s")
+        self.log("INFO", "ScanMode", "Scan utilisation", stats.Summary())
+        self._ExportTrace(f"{kind}Scan", stats, store, filename_pattern)
+        return stats
@@ -0,0 +1,694 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jcsimflir.py
+
+    Simulated stand-in for the parts of PySpin that jcflir.py uses. Set the
+    ALS_SIMULATE environment variable to have Camera use this module in place
+    of PySpin, so acquisition can be run and profiled without a camera.
+
+    Frames are scheduled from the exposure time and sensor readout time the
+    way a free running camera would deliver them, honouring the stream buffer
+    handling mode (NewestOnly drops everything but the latest frame) and
+    marking a configurable fraction of frames as incomplete. With TriggerMode
+    on, a frame is exposed only when TriggerSoftware is executed; the input
+    lines have nothing attached, so line triggers never fire. The scene is
+    blurred in proportion to the simulated Z stage's distance from focus, so
+    autofocus and Z scans see a real focus curve.
+"""
+import random
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+
+import numpy as np
+
+import jcsimkcube
+from jcraw import Demosaic
+
+# Simulated sensor, loosely a Blackfly S BFS-PGE-16S2C
+SIM_CAMERA = {
+    'width': 1440,
+    'height': 1080,
+    'readout_time': 0.0127,     # Seconds to read the sensor out, caps the frame rate at ~78 fps
+    'incomplete_rate': 0.001,   # Fraction of frames delivered with missing packets
+    'buffer_count': 10,         # Stream buffers for the OldestFirst modes
+    'noise_frames': 4,          # Distinct noise realisations cycled through
+    'seed': 1,
+    'focus_serial': '28252438', # Simulated KCube whose position sets the defocus, the GUI's Z stage
+    'focus_position': 1.1,      # mm
+    'defocus_blur': 40.0,       # Blur sigma in pixels per mm away from focus
+    'max_blur': 12.0,
+    'blur_step': 0.1,           # Blur sigma is rounded to this many pixels so scenes can be cached
+    'trigger_latency': 10e-6,   # Seconds from a trigger to the start of exposure
+}
+
+INIT_TIME = 0.2  # Seconds CameraPtr.Init blocks for
+
+SPINNAKER_COLOR_PROCESSING_ALGORITHM_NONE = 0
+SPINNAKER_COLOR_PROCESSING_ALGORITHM_NEAREST_NEIGHBOR = 1
+SPINNAKER_COLOR_PROCESSING_ALGORITHM_NEAREST_NEIGHBOR_AVG = 2
+SPINNAKER_COLOR_PROCESSING_ALGORITHM_BILINEAR = 3
+SPINNAKER_COLOR_PROCESSING_ALGORITHM_EDGE_SENSING = 4
+SPINNAKER_COLOR_PROCESSING_ALGORITHM_HQ_LINEAR = 5
+SPINNAKER_COLOR_PROCESSING_ALGORITHM_IPP = 6
+SPINNAKER_COLOR_PROCESSING_ALGORITHM_DIRECTIONAL_FILTER = 7
+
+PixelFormat_Mono8 = 0
+PixelFormat_Mono16 = 1
+PixelFormat_RGB8 = 2
+PixelFormat_RGB16 = 3
+PixelFormat_BayerRG8 = 4
+
+SPINNAKER_IMAGE_STATUS_NO_ERROR = 0
+SPINNAKER_IMAGE_STATUS_DATA_INCOMPLETE = 5
+
+EVENT_TIMEOUT_INFINITE = 0xFFFFFFFFFFFFFFFF
+
+
+class SpinnakerException(Exception):
+    pass
+
+
+# ---- GenICam nodes ----
+
+class _Node:
+    def __init__(self, name, readable=True, writable=True):
+        self.name = name
+        self.readable = readable
+        self.writable = writable
+
+    def GetName(self):
+        return self.name
+
+
+class _EnumEntry(_Node):
+    def __init__(self, name, value):
+        super().__init__(name, writable=False)
+        self.value = value
+
+    def GetValue(self):
+        return self.value
+
+    def GetSymbolic(self):
+        return self.name
+
+
+class _EnumNode(_Node):
+    def __init__(self, name, symbols, current):
+        super().__init__(name)
+        self.entries = {symbol: _EnumEntry(symbol, value) for value, symbol in enumerate(symbols)}
+        self.current = self.entries[current]
+
+    def GetEntryByName(self, symbol):
+        return self.entries.get(symbol)
+
+    def GetCurrentEntry(self):
+        return self.current
+
+    def GetIntValue(self):
+        return self.current.value
+
+    def SetIntValue(self, value):
+        for entry in self.entries.values():
+            if entry.value == value:
+                self.current = entry
+                return
+        raise SpinnakerException(f"Spinnaker: {self.name} has no entry with value {value} [-1008]")
+
+    def ToString(self):
+        return self.current.name
+
+
+class _ValueNode(_Node):
+    def __init__(self, name, value, minimum=None, maximum=None, readable=True, writable=True):
+        super().__init__(name, readable, writable)
+        self.value = value
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def GetMin(self):
+        return self.minimum
+
+    def GetMax(self):
+        return self.maximum
+
+    def GetValue(self):
+        return self.value
+
+    def SetValue(self, value):
+        if not self.writable:
+            raise SpinnakerException(f"Spinnaker: {self.name} is not writable [-1010]")
+        if self.minimum is not None and not self.minimum <= value <= self.maximum:
+            raise SpinnakerException(f"Spinnaker: {self.name} value {value} out of range [-1005]")
+        self.value = value
+
+    def ToString(self):
+        return str(self.value)
+
+
+class _ComputedNode(_ValueNode):
+    """Read only value the camera works out itself, e.g. the resulting frame rate."""
+    def __init__(self, name, getter):
+        super().__init__(name, None, writable=False)
+        self.getter = getter
+
+    def GetValue(self):
+        return self.getter()
+
+
+class _DecimationNode(_ValueNode):
+    """Decimation factor; the sensor size divided by it bounds the image size node."""
+    def __init__(self, name, size_node, sensor_size):
+        super().__init__(name, 1, 1, 4)
+        self.size_node = size_node
+        self.sensor_size = sensor_size
+
+    def SetValue(self, value):
+        super().SetValue(value)
+        # Decimation keeps whole 2x2 Bayer cells, so sizes stay even
+        self.size_node.maximum = self.sensor_size // value // 2 * 2
+        self.size_node.value = min(self.size_node.value, self.size_node.maximum)
+
+
+class _CommandNode(_Node):
+    def __init__(self, name, command):
+        super().__init__(name)
+        self.command = command
+
+    def Execute(self):
+        self.command()
+
+    def IsDone(self):
+        return True
+
+
+class _CategoryNode(_Node):
+    def __init__(self, name, features):
+        super().__init__(name, writable=False)
+        self.features = features
+
+    def GetFeatures(self):
+        return list(self.features)
+
+
+class _NodeMap:
+    def __init__(self, nodes):
+        self.nodes = {node.name: node for node in nodes}
+
+    def GetNode(self, name):
+        return self.nodes.get(name)
+
+
+def IsReadable(node):
+    return node is not None and node.readable
+
+
+def IsWritable(node):
+    return node is not None and node.writable
+
+
+def IsAvailable(node):
+    return node is not None
+
+
+# The node pointer wrappers are plain casts on the simulated nodes
+def CEnumerationPtr(node):
+    return node
+
+
+def CEnumEntryPtr(node):
+    return node
+
+
+def CFloatPtr(node):
+    return node
+
+
+def CIntegerPtr(node):
+    return node
+
+
+def CBooleanPtr(node):
+    return node
+
+
+def CCommandPtr(node):
+    return node
+
+
+def CCategoryPtr(node):
+    return node
+
+
+def CValuePtr(node):
+    return node
+
+
+# ---- Images ----
+
+def _write_png(filename, array):
+    """Write an 8 or 16 bit mono/RGB array as a PNG, zlib level 6 like Image.Save."""
+    height = array.shape[0]
+    channels = 1 if array.ndim == 2 else array.shape[2]
+    color_type = 0 if channels == 1 else 2
+    if array.dtype == np.uint16:
+        bit_depth = 16
+        data = np.ascontiguousarray(array, dtype='>u2')
+    else:
+        bit_depth = 8
+        data = np.ascontiguousarray(array, dtype=np.uint8)
+    rows = data.view(np.uint8).reshape(height, -1)
+    scanlines = np.zeros((height, rows.shape[1] + 1), dtype=np.uint8)
+    scanlines[:, 1:] = rows
+
+    def chunk(tag, payload):
+        return struct.pack('>I', len(payload)) + tag + payload + struct.pack('>I', zlib.crc32(tag + payload) & 0xFFFFFFFF)
+
+    header = struct.pack('>IIBBBBB', array.shape[1], height, bit_depth, color_type, 0, 0, 0)
+    with open(filename, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', header))
+        f.write(chunk(b'IDAT', zlib.compress(scanlines.tobytes(), 6)))
+        f.write(chunk(b'IEND', b''))
+
+
+class ImagePtr:
+    def __init__(self, data, pixel_format, frame_id=0, timestamp=0, incomplete=False):
+        self.data = data
+        self.pixel_format = pixel_format
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.incomplete = incomplete
+
+    def IsIncomplete(self):
+        return self.incomplete
+
+    def GetImageStatus(self):
+        return SPINNAKER_IMAGE_STATUS_DATA_INCOMPLETE if self.incomplete else SPINNAKER_IMAGE_STATUS_NO_ERROR
+
+    def GetWidth(self):
+        return self.data.shape[1]
+
+    def GetHeight(self):
+        return self.data.shape[0]
+
+    def GetPixelFormat(self):
+        return self.pixel_format
+
+    def GetFrameID(self):
+        return self.frame_id
+
+    def GetTimeStamp(self):
+        return self.timestamp
+
+    def GetBufferSize(self):
+        return self.data.nbytes
+
+    def GetData(self):
+        return self.data.reshape(-1)
+
+    def GetNDArray(self):
+        return self.data
+
+    def Release(self):
+        pass
+
+    def Save(self, filename):
+        if filename.lower().endswith('.png'):
+            _write_png(filename, self.data)
+        elif filename.lower().endswith('.raw'):
+            self.data.tofile(filename)
+        else:
+            raise SpinnakerException(f"Spinnaker: unsupported file format for {filename} [-1002]")
+
+
+class ImageProcessor:
+    def __init__(self):
+        self.algorithm = SPINNAKER_COLOR_PROCESSING_ALGORITHM_HQ_LINEAR
+
+    def SetColorProcessing(self, algorithm):
+        self.algorithm = algorithm
+
+    def GetColorProcessing(self):
+        return self.algorithm
+
+    def Convert(self, image, pixel_format):
+        data = image.data
+        if image.pixel_format == PixelFormat_BayerRG8:
+            nearest = self.algorithm in (SPINNAKER_COLOR_PROCESSING_ALGORITHM_NEAREST_NEIGHBOR,
+                                         SPINNAKER_COLOR_PROCESSING_ALGORITHM_NEAREST_NEIGHBOR_AVG)
+            rgb = Demosaic(data, 'BayerRG', nearest)
+        elif image.pixel_format == PixelFormat_Mono8:
+            rgb = np.repeat(data[..., None].astype(np.float32), 3, axis=2)
+        elif image.pixel_format == PixelFormat_RGB8:
+            rgb = data.astype(np.float32)
+        else:
+            raise SpinnakerException("Spinnaker: unsupported source pixel format [-1002]")
+
+        if pixel_format == PixelFormat_RGB8:
+            out = np.clip(rgb, 0, 255).astype(np.uint8)
+        elif pixel_format == PixelFormat_RGB16:
+            out = (np.clip(rgb, 0, 255) * 257).astype(np.uint16)
+        elif pixel_format == PixelFormat_Mono8:
+            out = np.clip(rgb @ np.array([0.299, 0.587, 0.114], np.float32), 0, 255).astype(np.uint8)
+        elif pixel_format == PixelFormat_Mono16:
+            out = (np.clip(rgb @ np.array([0.299, 0.587, 0.114], np.float32), 0, 255) * 257).astype(np.uint16)
+        else:
+            raise SpinnakerException("Spinnaker: unsupported destination pixel format [-1002]")
+        return ImagePtr(out, pixel_format, image.frame_id, image.timestamp)
+
+
+class Image:
+    @staticmethod
+    def Create(width, height, offset_x, offset_y, pixel_format, data):
+        """Wrap raw data copied out of an earlier image, as PySpin.Image.Create does."""
+        data = np.asarray(data)
+        shape = (height, width) + data.shape[2:] if data.ndim > 2 else (height, width)
+        return ImagePtr(data.reshape(shape), pixel_format)
+
+
+# ---- Camera ----
+
+class _Frame:
+    def __init__(self, frame_id, exposure_start, incomplete):
+        self.frame_id = frame_id
+        self.exposure_start = exposure_start
+        self.incomplete = incomplete
+
+
+class CameraPtr:
+    def __init__(self, serial="SIM00001"):
+        self.serial = serial
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._streaming = False
+        self._rng = random.Random(SIM_CAMERA['seed'])
+        self._buffer = deque()
+        self._next_id = 0
+        self._next_start = 0.0
+        self._triggered = deque()   # Triggered frames still exposing or reading out
+        self.missed_triggers = 0
+        self._scene = None
+        self._scene_key = None
+        self._signals = OrderedDict()
+        self._noise = None
+
+        self._tldevice_nodemap = _NodeMap([
+            _CategoryNode('DeviceInformation', [
+                _ValueNode('DeviceVendorName', 'FLIR', writable=False),
+                _ValueNode('DeviceModelName', 'Blackfly S BFS-PGE-16S2C (simulated)', writable=False),
+                _ValueNode('DeviceSerialNumber', serial, writable=False),
+                _ValueNode('DeviceVersion', 'sim', writable=False),
+            ]),
+        ])
+        self._stream_nodemap = _NodeMap([
+            _EnumNode('StreamBufferHandlingMode', ['OldestFirst', 'OldestFirstOverwrite', 'NewestFirst', 'NewestOnly'], 'OldestFirst'),
+            _EnumNode('StreamMode', ['TeledyneGigeVision', 'LWF', 'Socket'], 'TeledyneGigeVision'),
+        ])
+        width = _ValueNode('Width', SIM_CAMERA['width'], 4, SIM_CAMERA['width'])
+        height = _ValueNode('Height', SIM_CAMERA['height'], 2, SIM_CAMERA['height'])
+        self._nodemap = _NodeMap([
+            _EnumNode('AcquisitionMode', ['Continuous', 'SingleFrame', 'MultiFrame'], 'Continuous'),
+            _EnumNode('ExposureAuto', ['Off', 'Once', 'Continuous'], 'Continuous'),
+            _ValueNode('ExposureTime', 1400.0, 4.0, 30000000.0),
+            _EnumNode('GainAuto', ['Off', 'Once', 'Continuous'], 'Off'),
+            _ValueNode('Gain', 0.0, 0.0, 47.99),
+            _EnumNode('PixelFormat', ['BayerRG8', 'Mono8'], 'BayerRG8'),
+            width,
+            height,
+            _DecimationNode('DecimationHorizontal', width, SIM_CAMERA['width']),
+            _DecimationNode('DecimationVertical', height, SIM_CAMERA['height']),
+            _ComputedNode('AcquisitionResultingFrameRate', lambda: 1 / self._frame_period()),
+            _CommandNode('TimestampLatch', self._latch_timestamp),
+            _ValueNode('TimestampLatchValue', 0, writable=False),
+            _EnumNode('TriggerMode', ['Off', 'On'], 'Off'),
+            _EnumNode('TriggerSelector', ['FrameStart', 'AcquisitionStart', 'FrameBurstStart'], 'FrameStart'),
+            _EnumNode('TriggerSource', ['Software', 'Line0', 'Line1', 'Line2', 'Line3'], 'Line0'),
+            _EnumNode('TriggerActivation', ['RisingEdge', 'FallingEdge', 'AnyEdge'], 'RisingEdge'),
+            _CommandNode('TriggerSoftware', self._software_trigger),
+        ])
+
+    def _node(self, name):
+        return self._nodemap.GetNode(name)
+
+    def GetTLDeviceNodeMap(self):
+        return self._tldevice_nodemap
+
+    def GetTLStreamNodeMap(self):
+        return self._stream_nodemap
+
+    def GetNodeMap(self):
+        return self._nodemap
+
+    def Init(self):
+        time.sleep(INIT_TIME)
+        self._initialized = True
+
+    def DeInit(self):
+        self._initialized = False
+
+    def IsInitialized(self):
+        return self._initialized
+
+    def IsStreaming(self):
+        return self._streaming
+
+    def BeginAcquisition(self):
+        if not self._initialized:
+            raise SpinnakerException("Spinnaker: Camera is not initialized [-1002]")
+        with self._lock:
+            self._streaming = True
+            self._buffer.clear()
+            self._triggered.clear()
+            self._next_start = time.monotonic()
+            for name in ('Width', 'Height', 'PixelFormat', 'DecimationHorizontal', 'DecimationVertical'):
+                self._node(name).writable = False
+
+    def EndAcquisition(self):
+        with self._lock:
+            self._streaming = False
+            self._buffer.clear()
+            for name in ('Width', 'Height', 'PixelFormat', 'DecimationHorizontal', 'DecimationVertical'):
+                self._node(name).writable = True
+
+    def _latch_timestamp(self):
+        # Image timestamps count nanoseconds on the same clock
+        self._node('TimestampLatchValue').value = int(time.monotonic() * 1e9)
+
+    def _trigger_mode(self):
+        return self._node('TriggerMode').ToString() == 'On'
+
+    def _software_trigger(self):
+        with self._lock:
+            if not self._streaming or not self._trigger_mode() or self._node('TriggerSource').ToString() != 'Software':
+                return
+            start = time.monotonic() + SIM_CAMERA['trigger_latency']
+            # A trigger while the sensor cannot start another exposure is ignored, as on the camera
+            if start < self._next_start:
+                self.missed_triggers += 1
+                return
+            self._triggered.append(_Frame(self._next_id, start, self._rng.random() < SIM_CAMERA['incomplete_rate']))
+            self._next_id += 1
+            self._next_start = start + self._frame_period()
+
+    def _exposure(self):
+        return self._node('ExposureTime').GetValue() / 1e6
+
+    def _frame_period(self):
+        # Exposure and readout overlap, whichever is longer sets the rate
+        return max(self._exposure(), SIM_CAMERA['readout_time'])
+
+    def _ready_time(self, exposure_start):
+        return exposure_start + self._exposure() + SIM_CAMERA['readout_time']
+
+    def _advance(self, now):
+        """Move every frame finished by now into the stream buffers."""
+        mode = self._stream_nodemap.GetNode('StreamBufferHandlingMode').ToString()
+        if self._trigger_mode():
+            while self._triggered and self._ready_time(self._triggered[0].exposure_start) <= now:
+                self._deliver(self._triggered.popleft(), mode)
+            return
+        period = self._frame_period()
+        latest = now - self._exposure() - SIM_CAMERA['readout_time']
+        if latest < self._next_start:
+            return
+
+        # Frames that could never survive in the buffers are skipped outright
+        count = int((latest - self._next_start) // period) + 1
+        keep = 1 if mode == 'NewestOnly' else SIM_CAMERA['buffer_count']
+        if count > keep and mode != 'OldestFirst':
+            skipped = count - keep
+            self._next_id += skipped
+            self._next_start += skipped * period
+            count = keep
+
+        for _ in range(count):
+            frame = _Frame(self._next_id, self._next_start, self._rng.random() < SIM_CAMERA['incomplete_rate'])
+            self._next_id += 1
+            self._next_start += period
+            self._deliver(frame, mode)
+
+    def _deliver(self, frame, mode):
+        if mode == 'OldestFirst' and len(self._buffer) >= SIM_CAMERA['buffer_count']:
+            return
+        self._buffer.append(frame)
+        if mode == 'NewestOnly':
+            while len(self._buffer) > 1:
+                self._buffer.popleft()
+        elif len(self._buffer) > SIM_CAMERA['buffer_count']:
+            self._buffer.popleft()
+
+    def _defocus(self, frame):
+        stage = jcsimkcube.devices.get(SIM_CAMERA['focus_serial'])
+        if stage is None:
+            return 0.0
+        position = stage._true_position(frame.exposure_start + self._exposure() / 2)
+        blur = min(abs(position - SIM_CAMERA['focus_position']) * SIM_CAMERA['defocus_blur'], SIM_CAMERA['max_blur'])
+        return round(blur / SIM_CAMERA['blur_step']) * SIM_CAMERA['blur_step']
+
+    def _pixels(self, frame):
+        width = self._node('Width').GetValue()
+        height = self._node('Height').GetValue()
+        gain = self._node('Gain').GetValue()
+        exposure = self._node('ExposureTime').GetValue()
+        if self._scene_key != (width, height, exposure, gain):
+            self._scene = _render_scene(width, height, exposure, gain)
+            self._scene_key = (width, height, exposure, gain)
+            self._signals.clear()
+        blur = self._defocus(frame)
+        signal = self._signals.get(blur)
+        if signal is None:
+            signal = self._signals[blur] = _render_signal(self._scene, blur)
+            if len(self._signals) > 16:
+                self._signals.popitem(last=False)
+        else:
+            self._signals.move_to_end(blur)
+        if self._noise is None or self._noise[0].shape != (height, width):
+            self._noise = _render_noise(width, height, SIM_CAMERA['noise_frames'], SIM_CAMERA['seed'])
+        noisy = signal + self._noise[frame.frame_id % len(self._noise)]
+        return np.clip(noisy, 0, 255, out=noisy).astype(np.uint8)
+
+    def GetNextImage(self, timeout_ms=EVENT_TIMEOUT_INFINITE):
+        deadline = time.monotonic() + timeout_ms / 1000
+        while True:
+            with self._lock:
+                if not self._streaming:
+                    raise SpinnakerException("Spinnaker: Stream has not been started [-1002]")
+                now = time.monotonic()
+                self._advance(now)
+                if self._buffer:
+                    mode = self._stream_nodemap.GetNode('StreamBufferHandlingMode').ToString()
+                    frame = self._buffer.pop() if mode == 'NewestFirst' else self._buffer.popleft()
+                    break
+                if not self._trigger_mode():
+                    ready = self._ready_time(self._next_start)
+                elif self._triggered:
+                    ready = self._ready_time(self._triggered[0].exposure_start)
+                else:
+                    # Waiting on a trigger, which another thread may fire at any moment
+                    ready = min(now + 0.001, deadline) if now < deadline else float('inf')
+            if ready > deadline:
+                time.sleep(max(deadline - now, 0))
+                raise SpinnakerException("Spinnaker: Failed waiting for EventData on NEW_BUFFER_DATA event. [-1011]")
+            time.sleep(max(ready - now, 0))
+
+        pixel_format = PixelFormat_BayerRG8 if self._node('PixelFormat').ToString() == 'BayerRG8' else PixelFormat_Mono8
+        return ImagePtr(self._pixels(frame), pixel_format, frame.frame_id,
+                        int(frame.exposure_start * 1e9), frame.incomplete)
+
+
+def _blur_1d(values, sigma):
+    if sigma <= 0:
+        return values
+    radius = int(3 * sigma) + 1
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+    return np.convolve(np.pad(values, radius, mode='edge'), kernel / kernel.sum(), mode='valid').astype(np.float32)
+
+
+def _render_scene(width, height, exposure, gain):
+    """
+    RGGB signal of a mask pattern under a Gaussian beam, as a background plus
+    a contrast image that multiplies the checkerboard mask.
+    """
+    x = np.arange(width, dtype=np.float32)
+    y = np.arange(height, dtype=np.float32)[:, None]
+    beam = np.exp(-((x - width / 2) / (0.35 * width)) ** 2) * np.exp(-((y - height / 2) / (0.35 * height)) ** 2)
+
+    # Colour filter response of each Bayer site
+    response = np.empty((height, width), dtype=np.float32)
+    response[0::2, 0::2] = 1.0
+    response[0::2, 1::2] = 0.8
+    response[1::2, 0::2] = 0.8
+    response[1::2, 1::2] = 0.6
+
+    # Signal scales with exposure relative to the default setting and with gain in dB
+    scale = response * 255 * (exposure / 1400.0) * 10 ** (gain / 20)
+    return scale * (0.05 + 0.32 * beam), scale * 0.48 * beam
+
+
+def _render_signal(scene, blur):
+    """Mean signal of a scene from _render_scene with the mask defocused by blur pixels."""
+    background, contrast = scene
+    height, width = background.shape
+    # The checkerboard is a + b - 2ab of two square waves, so it blurs one axis at a time
+    a = _blur_1d((np.arange(width, dtype=np.float32) // 32) % 2, blur)
+    b = _blur_1d((np.arange(height, dtype=np.float32) // 32) % 2, blur)[:, None]
+    grid = (1 - 2 * b) * a + b
+    return background + contrast * grid
+
+
+def _render_noise(width, height, count, seed):
+    rng = np.random.default_rng(seed)
+    return [rng.normal(0, 2.0, size=(height, width)).astype(np.float32) for _ in range(count)]
+
+
+class CameraList:
+    def __init__(self, cameras):
+        self.cameras = list(cameras)
+
+    def GetSize(self):
+        return len(self.cameras)
+
+    def Clear(self):
+        self.cameras = []
+
+    def __len__(self):
+        return len(self.cameras)
+
+    def __getitem__(self, index):
+        return self.cameras[index]
+
+
+class LibraryVersion:
+    major = 3
+    minor = 0
+    type = 0
+    build = 118
+
+
+class System:
+    _instance = None
+
+    def __init__(self):
+        self.camera = CameraPtr()
+
+    @staticmethod
+    def GetInstance():
+        if System._instance is None:
+            System._instance = System()
+        return System._instance
+
+    def IsInUse(self):
+        return False
+
+    def ReleaseInstance(self):
+        System._instance = None
+
+    def GetLibraryVersion(self):
+        return LibraryVersion()
+
+    def GetCameras(self):
+        return CameraList([self.camera])
@@ -0,0 +1,449 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jcsimkcube.py
+
+    Simulated stand-in for the parts of the Thorlabs Kinesis .NET API that
+    jckcube.py uses. Set the ALS_SIMULATE environment variable to have
+    MaskMotor drive these instead of the KCube DLLs, so scans can be run and
+    profiled on a machine with no controllers attached.
+
+    The timing model covers connect/settings initialisation, trapezoidal
+    velocity profiles, the polling interval the status is refreshed at and
+    the settle time before a move is reported complete.
+"""
+import decimal
+import functools
+import itertools
+import math
+import threading
+import time
+
+# Stage timing models, keyed by the DeviceSettingsName MaskMotor loads
+STAGES = {
+    'MTS50-Z8': {'max_velocity': 2.3, 'acceleration': 1.5, 'settle_time': 0.05, 'min_position': 0.0, 'max_position': 50.0},
+    'DDS050': {'max_velocity': 500.0, 'acceleration': 5000.0, 'settle_time': 0.02, 'min_position': 0.0, 'max_position': 50.0},
+}
+
+# Serial numbers reported by DeviceManagerCLI.GetDeviceList()
+SERIAL_NUMBERS = ['27263196', '27263127', '28252438']
+
+ENUMERATION_TIME = 0.3   # Seconds BuildDeviceList spends scanning the USB bus
+CONNECT_TIME = 0.3       # Seconds Connect blocks for
+SETTINGS_TIME = 0.5      # Seconds after Connect until the settings are initialized
+LOAD_CONFIG_TIME = 0.2   # Seconds LoadMotorConfiguration blocks for
+MESSAGE_LATENCY = 0.002  # Seconds between a move finishing and the completion message
+CALLBACK_OVERLOADS = True  # False to simulate a Kinesis version without the Action<UInt64> move overloads
+
+# Every simulated controller created, keyed by serial number
+devices = {}
+
+
+def Decimal(value):
+    """Stand-in for System.Decimal that keeps the short decimal representation."""
+    return decimal.Decimal(str(value))
+
+
+UInt64 = int
+
+
+class _Delegate:
+    """Stand-in for a System.Action<UInt64> delegate wrapping a Python callable."""
+    def __init__(self, function):
+        self.function = function
+
+    def __call__(self, task_id):
+        return self.function(task_id)
+
+
+class _GenericAction:
+    def __getitem__(self, types):
+        return _Delegate
+
+
+# System.Action, so Action[UInt64](function) builds a delegate as under pythonnet
+Action = _GenericAction()
+
+
+class _Overloads:
+    """Stand-in for pythonnet's method.Overloads[types], which fails for a signature the method lacks."""
+    def __init__(self, method, signatures):
+        self.method = method
+        self.signatures = signatures
+
+    def __getitem__(self, types):
+        if not isinstance(types, tuple):
+            types = (types,)
+        if types not in self.signatures:
+            raise TypeError("No match found for given type params")
+        return self.method
+
+
+class _Overloaded:
+    """
+    A move method taking its arguments followed by either a timeout in
+    milliseconds or, with CALLBACK_OVERLOADS, a completion delegate.
+    """
+    def __init__(self, *argument_types):
+        self.argument_types = argument_types
+
+    def __call__(self, function):
+        self.function = function
+        return self
+
+    def __get__(self, motor, owner=None):
+        if motor is None:
+            return self
+        method = functools.partial(self.function, motor)
+        signatures = {self.argument_types + (UInt64,)}
+        if CALLBACK_OVERLOADS:
+            signatures.add(self.argument_types + (Action[UInt64],))
+        method.Overloads = _Overloads(method, signatures)
+        return method
+
+
+class MoveTimeoutException(Exception):
+    pass
+
+
+class MoveToInvalidPositionException(Exception):
+    pass
+
+
+class DeviceNotReadyException(Exception):
+    pass
+
+
+class MotorDirection:
+    Forward = 1
+    Backward = 2
+
+
+class JogParametersBase:
+    class JogModes:
+        ContinuousHeld = 1
+        SingleStep = 2
+
+
+class DeviceConfiguration:
+    class DeviceSettingsUseOptionType:
+        UseDeviceSettings = 0
+        UseFileSettings = 1
+        UseConfiguredSettings = 2
+
+
+class DeviceManagerCLI:
+    @staticmethod
+    def BuildDeviceList():
+        time.sleep(ENUMERATION_TIME)
+        return 0
+
+    @staticmethod
+    def GetDeviceList():
+        return list(SERIAL_NUMBERS)
+
+
+class VelocityParameters:
+    def __init__(self, max_velocity, acceleration):
+        self.MinVelocity = Decimal(0)
+        self.MaxVelocity = Decimal(max_velocity)
+        self.Acceleration = Decimal(acceleration)
+
+
+class JogParameters:
+    def __init__(self, step_size):
+        self.StepSize = Decimal(step_size)
+        self.JogMode = JogParametersBase.JogModes.SingleStep
+
+
+class MotorParameters:
+    def __init__(self):
+        self.StopMode = 1
+        self.BacklashCompensation = Decimal(0)
+
+
+class MotorLimits:
+    def __init__(self, min_position, max_position):
+        self.LengthMinimum = Decimal(min_position)
+        self.LengthMaximum = Decimal(max_position)
+
+
+class MotorConfiguration:
+    def __init__(self, motor):
+        self.motor = motor
+        self.DeviceSettingsName = ''
+
+    def UpdateCurrentConfiguration(self):
+        self.motor._apply_stage(self.DeviceSettingsName)
+
+
+class MotorStatus:
+    """Snapshot of the controller status as of the last poll."""
+    def __init__(self, is_moving, is_enabled, is_error=False):
+        self.IsMoving = is_moving
+        self.IsInMotion = is_moving
+        self.IsEnabled = is_enabled
+        self.IsError = is_error
+
+
+class _Move:
+    """Trapezoidal (or triangular) velocity profile between two positions."""
+    def __init__(self, start_time, start, target, max_velocity, acceleration, settle_time):
+        self.start_time = start_time
+        self.start = start
+        self.target = target
+        distance = abs(target - start)
+        self.distance = distance
+        self.acceleration = acceleration
+        ramp = max_velocity / acceleration
+        if distance < acceleration * ramp * ramp:
+            # Never reaches max velocity
+            ramp = math.sqrt(distance / acceleration)
+        self.ramp = ramp
+        self.peak_velocity = acceleration * ramp
+        self.cruise = (distance - acceleration * ramp * ramp) / self.peak_velocity if self.peak_velocity else 0.0
+        self.duration = 2 * ramp + self.cruise
+        self.motion_end = start_time + self.duration
+        self.end_time = self.motion_end + settle_time
+
+    def position(self, t):
+        t = t - self.start_time
+        if t <= 0:
+            return self.start
+        if t >= self.duration:
+            return self.target
+        a, ramp = self.acceleration, self.ramp
+        if t < ramp:
+            travelled = 0.5 * a * t * t
+        elif t < ramp + self.cruise:
+            travelled = 0.5 * a * ramp * ramp + self.peak_velocity * (t - ramp)
+        else:
+            remaining = self.duration - t
+            travelled = self.distance - 0.5 * a * remaining * remaining
+        return self.start + math.copysign(travelled, self.target - self.start)
+
+
+class _KCubeMotor:
+    default_stage = 'MTS50-Z8'
+
+    def __init__(self, serial_no):
+        self.serial_no = serial_no
+        self._lock = threading.Lock()
+        self._connected = False
+        self._enabled = False
+        self._settings_ready_at = None
+        self._poll_interval = None
+        self._poll_origin = time.monotonic()
+        self._stage = STAGES[self.default_stage]
+        self._velocity = VelocityParameters(self._stage['max_velocity'], self._stage['acceleration'])
+        self._jog = JogParameters(0.1)
+        self._motor_params = MotorParameters()
+        self._position = 0.0
+        self._move = None
+        self._task_ids = itertools.count(1)
+        self._tasks = {}
+        self.MotorDeviceSettings = object()
+        devices[serial_no] = self
+
+    def _apply_stage(self, name):
+        self._stage = STAGES.get(name, self._stage)
+        self._velocity = VelocityParameters(self._stage['max_velocity'], self._stage['acceleration'])
+
+    def _check_ready(self):
+        if not self._connected or not self._enabled:
+            raise DeviceNotReadyException(f"Device {self.serial_no} is not connected and enabled")
+
+    def _true_position(self, t):
+        if self._move is None:
+            return self._position
+        return self._move.position(t)
+
+    def _is_moving(self, t):
+        return self._move is not None and t < self._move.end_time
+
+    def _polled_time(self, now):
+        # Position and status only refresh when the controller is polled
+        if self._poll_interval is None:
+            polled = self._poll_origin
+        else:
+            ticks = math.floor((now - self._poll_origin) / self._poll_interval)
+            polled = self._poll_origin + ticks * self._poll_interval
+        # The move completed message carries a fresh status of its own
+        if self._move is not None and polled < self._move.end_time + MESSAGE_LATENCY <= now:
+            polled = self._move.end_time + MESSAGE_LATENCY
+        return polled
+
+    # ---- Connection ----
+
+    def Connect(self, serial_no):
+        time.sleep(CONNECT_TIME)
+        with self._lock:
+            self._connected = True
+            self._settings_ready_at = time.monotonic() + SETTINGS_TIME
+
+    def IsSettingsInitialized(self):
+        return self._settings_ready_at is not None and time.monotonic() >= self._settings_ready_at
+
+    def WaitForSettingsInitialized(self, timeout_ms):
+        if self._settings_ready_at is None:
+            return False
+        remaining = self._settings_ready_at - time.monotonic()
+        if remaining > 0:
+            time.sleep(min(remaining, timeout_ms / 1000))
+        return self.IsSettingsInitialized()
+
+    def StartPolling(self, interval_ms):
+        with self._lock:
+            self._poll_interval = interval_ms / 1000
+            self._poll_origin = time.monotonic()
+
+    def StopPolling(self):
+        with self._lock:
+            self._poll_origin = self._polled_time(time.monotonic())
+            self._poll_interval = None
+
+    def EnableDevice(self):
+        with self._lock:
+            self._enabled = True
+
+    def DisableDevice(self):
+        with self._lock:
+            self._enabled = False
+
+    def LoadMotorConfiguration(self, serial_no, option=None):
+        time.sleep(LOAD_CONFIG_TIME)
+        return MotorConfiguration(self)
+
+    def SetSettings(self, settings, update, persist):
+        pass
+
+    def Disconnect(self, close_all):
+        with self._lock:
+            now = time.monotonic()
+            self._position = self._true_position(now)
+            self._move = None
+            self._connected = False
+            self._enabled = False
+
+    # ---- Status ----
+
+    @property
+    def Position(self):
+        with self._lock:
+            t = self._polled_time(time.monotonic())
+            return Decimal(round(self._true_position(t), 5))
+
+    @property
+    def AdvancedMotorLimits(self):
+        return MotorLimits(self._stage['min_position'], self._stage['max_position'])
+
+    @property
+    def Status(self):
+        with self._lock:
+            t = self._polled_time(time.monotonic())
+            return MotorStatus(self._is_moving(t), self._enabled)
+
+    def IsTaskComplete(self, task_id):
+        with self._lock:
+            end = self._tasks.get(task_id)
+        return end is None or time.monotonic() >= end
+
+    # ---- Parameters ----
+
+    def GetVelocityParams(self):
+        return VelocityParameters(float(self._velocity.MaxVelocity), float(self._velocity.Acceleration))
+
+    def SetVelParams(self, params):
+        self._velocity = VelocityParameters(float(params.MaxVelocity), float(params.Acceleration))
+
+    def GetJogParams(self):
+        params = JogParameters(float(self._jog.StepSize))
+        params.JogMode = self._jog.JogMode
+        return params
+
+    def SetJogParams(self, params):
+        self._jog = JogParameters(float(params.StepSize))
+        self._jog.JogMode = params.JogMode
+
+    def GetMotorParams(self):
+        return self._motor_params
+
+    def SetMotorParams(self, params):
+        self._motor_params = params
+
+    # ---- Motion ----
+
+    def _start_move(self, target, waiter):
+        """
+        Start a move to target. waiter follows the Kinesis overloads: a
+        timeout in milliseconds blocks until the move completes (0 returns
+        immediately), while an Action<UInt64> delegate is invoked with the task ID once the
+        move has completed and the task ID is returned.
+        """
+        self._check_ready()
+        with self._lock:
+            now = time.monotonic()
+            start = self._true_position(now)
+            self._move = _Move(now, start, target,
+                               float(self._velocity.MaxVelocity),
+                               float(self._velocity.Acceleration),
+                               self._stage['settle_time'])
+            done_at = self._move.end_time + MESSAGE_LATENCY
+
+            if isinstance(waiter, _Delegate):
+                task_id = next(self._task_ids)
+                self._tasks[task_id] = done_at
+                timer = threading.Timer(done_at - now, waiter, args=(task_id,))
+                timer.daemon = True
+                timer.start()
+                return task_id
+
+        timeout = waiter / 1000
+        if timeout == 0:
+            return 0
+        wait = done_at - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            raise MoveTimeoutException(f"Device {self.serial_no} move timed out after {waiter} ms")
+        if wait > 0:
+            time.sleep(wait)
+        return 0
+
+    @_Overloaded(Decimal)
+    def MoveTo(self, position, waiter):
+        target = float(position)
+        if not self._stage['min_position'] <= target <= self._stage['max_position']:
+            raise MoveToInvalidPositionException(f"Position {target} is outside the travel of device {self.serial_no}")
+        return self._start_move(target, waiter)
+
+    @_Overloaded(MotorDirection)
+    def MoveJog(self, direction, waiter):
+        with self._lock:
+            now = time.monotonic()
+            origin = self._move.target if self._is_moving(now) else self._true_position(now)
+        step = float(self._jog.StepSize)
+        target = origin + step if direction == MotorDirection.Forward else origin - step
+        target = min(max(target, self._stage['min_position']), self._stage['max_position'])
+        return self._start_move(target, waiter)
+
+    def StopImmediate(self):
+        with self._lock:
+            now = time.monotonic()
+            self._position = self._true_position(now)
+            self._move = None
+
+
+class KCubeDCServo(_KCubeMotor):
+    default_stage = 'MTS50-Z8'
+
+    @staticmethod
+    def CreateKCubeDCServo(serial_no):
+        return KCubeDCServo(serial_no)
+
+
+class KCubeBrushlessMotor(_KCubeMotor):
+    default_stage = 'DDS050'
+
+    @staticmethod
+    def CreateKCubeBrushlessMotor(serial_no):
+        return KCubeBrushlessMotor(serial_no)
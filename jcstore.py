@@ -0,0 +1,219 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jcstore.py
+
+    Scan containers that append every frame of a scan to one file, with the
+    position, exposure, gain and timestamps of each frame stored alongside.
+
+    hdf5: one .h5 file, a chunk per frame, needs h5py
+    raw:  frames appended to a .bin file, indexed by a .jsonl file with one
+          line per frame, so a crashed scan keeps every frame written
+"""
+import json
+import os
+import zlib
+from datetime import datetime
+from glob import glob
+
+import numpy as np
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+SCAN_FORMATS = ('hdf5', 'raw', 'png')
+EXTENSIONS = {'hdf5': '.h5', 'raw': '.bin', 'png': ''}
+
+# Compression settings per format: 'fast' favours throughput, 'small' file size
+HDF5_COMPRESSION = {
+    None: {},
+    'fast': {'compression': 'lzf', 'shuffle': True},
+    'small': {'compression': 'gzip', 'compression_opts': 4, 'shuffle': True},
+}
+RAW_COMPRESSION = {None: None, 'fast': 1, 'small': 6}
+# Metadata that only ever holds integers; camera timestamps in ns are beyond
+# float64 precision. Every other key is stored as float64.
+INTEGER_METADATA = ('frame_id', 'timestamp', 'frames_averaged')
+
+
+def NextScanName(directory='.', extension=''):
+    """
+    Path for the next scan of the day, named date_series like 240721_0001,
+    using the first series number with no existing files.
+    """
+    date = datetime.now().strftime("%y%m%d")
+    series = 1
+    while glob(os.path.join(directory, f"{date}_{series:04d}*")):
+        series += 1
+    return os.path.join(directory, f"{date}_{series:04d}{extension}")
+
+
+def OpenScanStore(directory='.', scan_format='hdf5', compression=None, attributes=None):
+    """
+    Create the container for a new scan.
+
+    :param scan_format: 'hdf5', 'raw' or 'png'. hdf5 falls back to raw without h5py.
+    :param compression: None, 'fast' or 'small'.
+    :param attributes: Dict of scan-wide values saved with the file.
+    :return: A scan store, or None for 'png' where frames are saved individually.
+    """
+    if scan_format not in SCAN_FORMATS:
+        raise ValueError(f"Unknown scan format {scan_format}, expected one of {', '.join(SCAN_FORMATS)}")
+    if scan_format == 'png':
+        return None
+    if scan_format == 'hdf5' and h5py is None:
+        scan_format = 'raw'
+    path = NextScanName(directory, EXTENSIONS[scan_format])
+    if scan_format == 'hdf5':
+        return HDF5ScanStore(path, compression, attributes)
+    return RawScanStore(path, compression, attributes)
+
+
+def CreateScanStore(path, compression=None, attributes=None):
+    """Create a scan store at path, the format picked by its extension."""
+    if path.endswith(EXTENSIONS['hdf5']):
+        return HDF5ScanStore(path, compression, attributes)
+    return RawScanStore(path, compression, attributes)
+
+
+def _Plain(value):
+    # Numpy scalars from HDF5 attributes or metadata arrays are not JSON serialisable
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class HDF5ScanStore:
+    def __init__(self, path, compression=None, attributes=None):
+        if h5py is None:
+            raise ImportError("h5py is required to write HDF5 scan files")
+        self.path = path
+        self.compression = HDF5_COMPRESSION[compression]
+        self.file = h5py.File(path, 'w')
+        self.file.attrs['created'] = datetime.now().isoformat()
+        for key, value in (attributes or {}).items():
+            self.file.attrs[key] = value
+        self.images = {}
+        self.metadata = {}
+        self.count = 0
+
+    def Append(self, data, metadata, images=None):
+        """
+        Append one frame and its metadata dict (position, exposure_time, gain, timestamps...).
+
+        :param images: Optional dict of further per-frame arrays, e.g. a noise map, each kept in a dataset of its name.
+        """
+        for name, array in dict(images or {}, frames=data).items():
+            dataset = self.images.get(name)
+            if dataset is None:
+                dataset = self.images[name] = self.file.create_dataset(name, shape=(0,) + array.shape, maxshape=(None,) + array.shape,
+                                                                       dtype=array.dtype, chunks=(1,) + array.shape, **self.compression)
+            dataset.resize(self.count + 1, axis=0)
+            dataset[self.count] = array
+
+        for key, value in metadata.items():
+            dataset = self.metadata.get(key)
+            if dataset is None:
+                # Not taken from the first value: a gain of 0 would make every later gain an integer
+                dtype = np.int64 if key in INTEGER_METADATA else np.float64
+                dataset = self.metadata[key] = self.file.create_dataset(key, shape=(0,), maxshape=(None,), dtype=dtype, chunks=(1024,))
+            dataset.resize(self.count + 1, axis=0)
+            dataset[self.count] = value
+        self.count += 1
+
+    def Close(self):
+        self.file.close()
+
+
+class RawScanStore:
+    def __init__(self, path, compression=None, attributes=None):
+        self.path = path
+        self.level = RAW_COMPRESSION[compression]
+        self.data_file = open(path, 'wb')
+        self.index_file = open(os.path.splitext(path)[0] + '.jsonl', 'w', buffering=1)
+        header = {'format': 'raw', 'version': 1, 'compression': 'zlib' if self.level else None,
+                  'created': datetime.now().isoformat(),
+                  'attributes': {key: _Plain(value) for key, value in (attributes or {}).items()}}
+        self.index_file.write(json.dumps(header) + '\n')
+        self.offset = 0
+        self.count = 0
+
+    def Append(self, data, metadata, images=None):
+        """
+        Append one frame and its metadata dict (position, exposure_time, gain, timestamps...).
+
+        :param images: Optional dict of further per-frame arrays, e.g. a noise map, stored after the frame.
+        """
+        entry = self._Write(data)
+        if images:
+            entry['images'] = {name: self._Write(array) for name, array in images.items()}
+        entry.update({key: _Plain(value) for key, value in metadata.items()})
+        self.index_file.write(json.dumps(entry) + '\n')
+        self.count += 1
+
+    def _Write(self, data):
+        payload = np.ascontiguousarray(data).tobytes()
+        if self.level:
+            payload = zlib.compress(payload, self.level)
+        self.data_file.write(payload)
+        entry = {'offset': self.offset, 'nbytes': len(payload), 'shape': list(data.shape), 'dtype': data.dtype.str}
+        self.offset += len(payload)
+        return entry
+
+    def Close(self):
+        self.data_file.close()
+        self.index_file.close()
+
+
+class ScanReader:
+    """Read back a scan written by HDF5ScanStore or RawScanStore."""
+    def __init__(self, path):
+        self.path = path
+        self.hdf5 = path.endswith('.h5')
+        if self.hdf5:
+            if h5py is None:
+                raise ImportError("h5py is required to read HDF5 scan files")
+            self.file = h5py.File(path, 'r')
+            self.attributes = dict(self.file.attrs)
+            self.metadata = {key: self.file[key][()] for key in self.file if self.file[key].ndim == 1}
+            self.images = [key for key in self.file if key != 'frames' and self.file[key].ndim > 1]
+            self.count = len(self.file['frames']) if 'frames' in self.file else 0
+        else:
+            with open(os.path.splitext(path)[0] + '.jsonl') as f:
+                header = json.loads(f.readline())
+                self.entries = [json.loads(line) for line in f if line.strip()]
+            self.file = open(path, 'rb')
+            self.compression = header['compression']
+            self.attributes = header['attributes']
+            first = self.entries[0] if self.entries else {}
+            keys = [key for key in first if key not in ('offset', 'nbytes', 'shape', 'dtype', 'images')]
+            self.metadata = {key: np.array([entry[key] for entry in self.entries]) for key in keys}
+            self.images = list(first.get('images', {}))
+            self.count = len(self.entries)
+
+    def __len__(self):
+        return self.count
+
+    def Frame(self, index, name='frames'):
+        """
+        :param name: 'frames', or one of images for a further per-frame array such as 'noise'.
+        """
+        if self.hdf5:
+            return self.file[name][index]
+        entry = self.entries[index]
+        if name != 'frames':
+            entry = entry['images'][name]
+        self.file.seek(entry['offset'])
+        payload = self.file.read(entry['nbytes'])
+        if self.compression == 'zlib':
+            payload = zlib.decompress(payload)
+        return np.frombuffer(payload, dtype=entry['dtype']).reshape(entry['shape'])
+
+    def Frames(self, start, stop, name='frames'):
+        """Frames start to stop stacked into one array."""
+        if self.hdf5:
+            return self.file[name][start:stop]
+        return np.stack([self.Frame(index, name) for index in range(start, stop)])
+
+    def Close(self):
+        self.file.close()
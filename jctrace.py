@@ -0,0 +1,86 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: jctrace.py
+
+    Timeline of what each thread was doing, kept as spans in a fixed size
+    in-memory ring and exported in the Chrome trace event format, which
+    opens in chrome://tracing or https://ui.perfetto.dev. Every duration
+    recorded in jclatency becomes a span, and the scan, motor and camera
+    code adds spans of its own, so a scan's export shows moves, polls,
+    frame grabs and writes side by side per thread.
+
+    Spans are named like latency stages, the part before the first dot
+    becoming the category: scan.point, motor.poll, camera.GetNextImage...
+    The shared ring is jctrace.tracer.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+RING_SIZE = 65536
+
+
+class Tracer:
+    def __init__(self, size=RING_SIZE):
+        """
+        :param size: Spans kept; the oldest are overwritten.
+        """
+        self.spans = deque(maxlen=size)
+        self.threads = {}
+
+    def Add(self, name, start, end, args=None):
+        """
+        Add a finished span.
+
+        :param start: perf_counter time the span began.
+        :param end: perf_counter time it ended.
+        :param args: Optional dict shown with the span.
+        """
+        tid = threading.get_ident()
+        if tid not in self.threads:
+            self.threads[tid] = threading.current_thread().name
+        self.spans.append((name, tid, start, end, args))
+
+    @contextmanager
+    def Span(self, name, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.Add(name, start, time.perf_counter(), args or None)
+
+    def Export(self, path, since=None):
+        """
+        Write the spans to path as Chrome trace JSON.
+
+        :param since: Optional perf_counter time; only spans ending after it are written.
+        :return: Number of spans written.
+        """
+        spans = self.spans.copy()
+        pid = os.getpid()
+        events = []
+        tids = set()
+        for name, tid, start, end, args in spans:
+            if since is not None and end < since:
+                continue
+            event = {'name': name, 'cat': name.split('.', 1)[0], 'ph': 'X', 'pid': pid, 'tid': tid,
+                     'ts': round(start * 1e6, 3), 'dur': round((end - start) * 1e6, 3)}
+            if args:
+                event['args'] = args
+            events.append(event)
+            tids.add(tid)
+        events.extend({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': self.threads.get(tid, str(tid))}}
+                      for tid in tids)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+        return len(events) - len(tids)
+
+    def Clear(self):
+        self.spans.clear()
+
+
+tracer = Tracer()
@@ -0,0 +1,29 @@
+"""
+    https://github.com/Josue-Castellanos/ALS_Motor_Controls
+    (c) Lawrence Berkelay National Laboratory, 2024
+    python file: conftest.py
+
+    Tests run against the simulated stages and camera, and import the jc
+    modules from the repository root: python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+os.environ['ALS_SIMULATE'] = '1'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def QuietLog(level, component, message, details=""):
+    pass
+
+
+@pytest.fixture(scope='session')
+def runner():
+    """Simulated camera, stages and status poller, connected once for every test that needs hardware."""
+    from jcrun import ScanRunner
+    runner = ScanRunner(log_signal=QuietLog)
+    runner.Connect()
+    yield runner
+    runner.Disconnect()
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from jcaverage import MAX_MEDIAN_FRAMES, FrameAccumulator
+
+
+def Frames(count, shape=(4, 5, 3)):
+    rng = np.random.default_rng(1)
+    return [rng.integers(0, 4096, shape, dtype=np.uint16) for _ in range(count)]
+
+
+@pytest.mark.parametrize('reduction, expected', [('mean', np.mean), ('median', np.median), ('max', np.max)])
+def test_reduction_and_noise_match_numpy(reduction, expected):
+    frames = Frames(5)
+    accumulator = FrameAccumulator(5, reduction)
+    for frame in frames:
+        accumulator.Add(frame)
+    reduced, noise = accumulator.Result()
+    stack = np.stack(frames).astype(np.float64)
+    assert reduced.dtype == noise.dtype == np.float32
+    np.testing.assert_allclose(reduced, expected(stack, axis=0), rtol=1e-5)
+    # Welford's running variance, with the n - 1 of the sample standard deviation
+    np.testing.assert_allclose(noise, stack.std(axis=0, ddof=1), rtol=1e-4, atol=1e-3)
+
+
+def test_welford_is_stable_on_a_large_offset():
+    # The naive sum of squares loses the spread of values near 60000 in float32
+    frames = [np.full((2, 2), 60000 + delta, dtype=np.uint16) for delta in (0, 1, 2, 3)]
+    accumulator = FrameAccumulator(4)
+    for frame in frames:
+        accumulator.Add(frame)
+    reduced, noise = accumulator.Result()
+    np.testing.assert_allclose(reduced, 60001.5)
+    np.testing.assert_allclose(noise, np.std([0, 1, 2, 3], ddof=1), rtol=1e-5)
+
+
+def test_reset_reuses_buffers_and_one_frame_has_no_noise():
+    accumulator = FrameAccumulator(3)
+    first, second = Frames(2)
+    accumulator.Add(first)
+    mean = accumulator.mean
+    accumulator.Reset()
+    accumulator.Add(second)
+    reduced, noise = accumulator.Result()
+    assert accumulator.mean is mean
+    np.testing.assert_array_equal(reduced, second)
+    assert not noise.any()
+
+
+def test_a_new_shape_starts_over():
+    accumulator = FrameAccumulator(2)
+    accumulator.Add(np.ones((2, 2)))
+    accumulator.Add(np.full((3, 3), 2.0))
+    reduced, _ = accumulator.Result()
+    assert accumulator.count == 1
+    np.testing.assert_array_equal(reduced, np.full((3, 3), 2.0))
+
+
+def test_limits():
+    with pytest.raises(ValueError):
+        FrameAccumulator(0)
+    with pytest.raises(ValueError):
+        FrameAccumulator(2, 'mode')
+    with pytest.raises(ValueError):
+        FrameAccumulator(MAX_MEDIAN_FRAMES + 1, 'median')
+    accumulator = FrameAccumulator(1)
+    with pytest.raises(ValueError):
+        accumulator.Result()
+    accumulator.Add(np.zeros(3))
+    with pytest.raises(ValueError):
+        accumulator.Add(np.zeros(3))
@@ -0,0 +1,36 @@
+import math
+
+import pytest
+
+from jcbench import Compare
+
+
+def Baseline(**values):
+    return {name: {'value': value} for name, value in values.items()}
+
+
+def test_higher_is_better_regresses_when_lower():
+    baseline = Baseline(live_fps=100.0)
+    assert Compare({'live_fps': 90.0}, baseline, 0.15) == []
+    (name, value, reference, change), = Compare({'live_fps': 80.0}, baseline, 0.15)
+    assert (name, value, reference) == ('live_fps', 80.0, 100.0)
+    assert change == pytest.approx(0.2)
+
+
+def test_lower_is_better_regresses_when_higher():
+    baseline = Baseline(live_convert_ms=2.0)
+    assert Compare({'live_convert_ms': 1.0}, baseline) == []
+    (_, _, _, change), = Compare({'live_convert_ms': 3.0}, baseline)
+    assert change == pytest.approx(0.5)
+
+
+def test_improvements_are_not_regressions():
+    baseline = Baseline(live_fps=100.0, scan_s_per_point=0.1)
+    assert Compare({'live_fps': 500.0, 'scan_s_per_point': 0.01}, baseline) == []
+
+
+def test_metrics_without_a_usable_baseline_or_value_are_skipped():
+    baseline = Baseline(live_fps=0.0, preview_fps=100.0)
+    baseline['log_messages_per_s'] = {}
+    results = {'live_fps': 1.0, 'preview_fps': math.nan, 'log_messages_per_s': 1.0, 'write_png_fps': 1.0}
+    assert Compare(results, baseline) == []
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from jcbus import FrameBus, FrameBusReader
+
+
+@pytest.fixture
+def bus():
+    bus = FrameBus(slot_bytes=4 * 6 * 3, slots=4)
+    yield bus
+    bus.Close()
+
+
+@pytest.fixture
+def reader(bus):
+    reader = FrameBusReader(bus.name)
+    yield reader
+    reader.Close()
+
+
+def Frame(value):
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_published_frame_is_read_back(bus, reader):
+    sequence = bus.Publish(Frame(7), frame_id=42, timestamp=10 ** 18)
+    frame = reader.Next(timeout=0.1)
+    assert frame.sequence == sequence == 1
+    assert (frame.frame_id, frame.timestamp) == (42, 10 ** 18)
+    np.testing.assert_array_equal(frame.data, Frame(7))
+    assert not frame.data.flags.writeable
+    assert frame.Valid()
+    assert reader.Next(timeout=0.01) is None
+
+
+def test_shapes_and_dtypes_survive(bus, reader):
+    data = np.arange(12, dtype=np.uint16).reshape(3, 4)
+    bus.Publish(data)
+    frame = reader.Next(timeout=0.1)
+    assert frame.data.dtype == np.uint16
+    np.testing.assert_array_equal(frame.data, data)
+
+
+def test_oversized_frames_are_not_published(bus, reader):
+    assert bus.Publish(np.zeros((100, 100, 3), np.uint8)) is None
+    assert bus.oversized == 1
+    assert reader.Next(timeout=0.01) is None
+
+
+def test_slow_reader_takes_the_newest_and_counts_the_rest(bus, reader):
+    bus.Publish(Frame(1))
+    assert reader.Next(timeout=0.1).sequence == 1
+    for value in range(2, 6):
+        bus.Publish(Frame(value))
+    frame = reader.Next(timeout=0.1)
+    assert frame.sequence == 5
+    np.testing.assert_array_equal(frame.data, Frame(5))
+    assert reader.missed == 3
+
+
+def test_lapped_frame_is_invalid(bus, reader):
+    bus.Publish(Frame(1))
+    frame = reader.Next(timeout=0.1)
+    # The writer wraps around the 4 slots and reuses the frame's slot
+    for value in range(2, 6):
+        bus.Publish(Frame(value))
+    assert not frame.Valid()
+    assert reader.Read(1) is None
+
+
+def test_slot_being_written_is_not_read(bus, reader):
+    bus.Publish(Frame(1))
+    # A writer part way through a frame has zeroed the slot's sequence
+    bus.table[1]['sequence'] = 0
+    assert reader.Read(1) is None
+
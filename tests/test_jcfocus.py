@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from conftest import QuietLog
+from jcfocus import Autofocus, FocusMetric
+
+
+def Searcher(samples):
+    autofocus = Autofocus(None, None, log_signal=QuietLog)
+    autofocus.samples = dict(samples)
+    return autofocus
+
+
+def test_peak_position_is_the_parabola_vertex():
+    # Samples of -(x - 1.13)^2
+    samples = {x: -(x - 1.13) ** 2 for x in (1.0, 1.1, 1.2, 1.05)}
+    assert Searcher(samples).PeakPosition(1.0, 1.2) == pytest.approx(1.13)
+
+
+def test_peak_position_stays_in_the_bracket():
+    samples = {x: -(x - 1.5) ** 2 for x in (1.0, 1.1, 1.2)}
+    assert Searcher(samples).PeakPosition(1.0, 1.2) == 1.2
+
+
+def test_peak_position_without_a_peak_takes_the_middle():
+    # A valley, and three collinear samples, both have no vertex to use
+    assert Searcher({1.0: 1.0, 1.1: 0.0, 1.2: 1.0}).PeakPosition(1.0, 1.2) == pytest.approx(1.1)
+    assert Searcher({1.0: 1.0, 1.1: 1.0, 1.2: 1.0}).PeakPosition(1.0, 1.2) == pytest.approx(1.1)
+
+
+@pytest.mark.parametrize('method', ['laplacian', 'tenengrad'])
+def test_focus_metric_drops_with_blur(method):
+    rng = np.random.default_rng(0)
+    sharp = rng.random((64, 64)).astype(np.float32)
+    blurred = sharp.copy()
+    for axis in (0, 1):
+        blurred = (blurred + np.roll(blurred, 1, axis) + np.roll(blurred, -1, axis)) / 3
+    assert FocusMetric(sharp, method, decimate=1) > FocusMetric(blurred, method, decimate=1)
+    with pytest.raises(ValueError):
+        FocusMetric(sharp, 'variance')
+
+
+class StubStage:
+    def __init__(self):
+        self.position = 0.0
+        self.motor_z = object()
+
+    def GetMotor(self, axis_name):
+        return self.motor_z
+
+    def MoveMotor(self, motor, position, axis_name):
+        self.position = position
+
+    def GetPositionValue(self, motor):
+        return self.position
+
+
+class StubCamera:
+    """Frames of a fixed pattern whose contrast, and so focus metric, depends on the stage position."""
+    def __init__(self, stage, contrast):
+        self.stage = stage
+        self.contrast = contrast
+        self.pattern = np.random.default_rng(0).random((32, 32)).astype(np.float32)
+
+    def SyncClock(self):
+        pass
+
+    def CaptureFrame(self, timeout, copy=False, not_before=None):
+        frame = type('Frame', (), {})()
+        frame.data = self.pattern * self.contrast(self.stage.position)
+        return frame
+
+
+def test_autofocus_moves_to_a_peak_it_already_measured():
+    # Sharpest beyond the upper end, so the peak is clamped to the upper end, measured by the coarse sweep
+    stage = StubStage()
+    autofocus = Autofocus(stage, StubCamera(stage, lambda x: 10 - (x - 2) ** 2), log_signal=QuietLog)
+    result = autofocus.Run(0.0, 1.0, "Z")
+    assert stage.position == 1.0
+    assert result.position == 1.0
+
+
+def test_autofocus_ends_at_the_position_it_reports(runner):
+    import jcsimflir
+    mask_motor = runner.mask_motor
+    autofocus = Autofocus(mask_motor, runner.camera, log_signal=QuietLog)
+    result = autofocus.Run(0.85, 1.35, "Z")
+    assert result.position == pytest.approx(mask_motor.GetPositionValue(mask_motor.motor_z), abs=1e-4)
+    assert result.position == pytest.approx(jcsimflir.SIM_CAMERA['focus_position'], abs=0.02)
+    assert result.frames < 20
@@ -0,0 +1,45 @@
+import time
+
+import pytest
+
+import jcsimkcube
+
+
+@pytest.fixture
+def messages():
+    return []
+
+
+@pytest.fixture
+def mask_motor(runner, messages, monkeypatch):
+    mask_motor = runner.mask_motor
+    monkeypatch.setattr(mask_motor, 'log_signal', lambda level, component, message, details="": messages.append((level, message)))
+    yield mask_motor
+    mask_motor.callback_overloads.clear()
+
+
+def test_move_completes_on_the_callback(mask_motor, messages):
+    timing = mask_motor.MoveMotor(mask_motor.motor_z, 2.0, "Z")
+    assert mask_motor.GetPositionValue(mask_motor.motor_z) == pytest.approx(2.0, abs=1e-4)
+    assert timing.total_time < mask_motor.EstimateMoveTime(mask_motor.motor_z, 1.0) + 1.0
+    assert mask_motor.callback_overloads[(type(mask_motor.motor_z), 'MoveTo')] is True
+    assert not any(level == "WARNING" for level, _ in messages)
+
+
+def test_without_the_callback_overload_the_status_is_polled(mask_motor, monkeypatch):
+    monkeypatch.setattr(jcsimkcube, 'CALLBACK_OVERLOADS', False)
+    mask_motor.callback_overloads.clear()
+    mask_motor.MoveMotor(mask_motor.motor_z, 2.1, "Z")
+    mask_motor.ForwardJogMotor(mask_motor.motor_z, "Z")
+    assert mask_motor.callback_overloads == {(type(mask_motor.motor_z), 'MoveTo'): False, (type(mask_motor.motor_z), 'MoveJog'): False}
+    assert mask_motor.GetPositionValue(mask_motor.motor_z) == pytest.approx(2.1 + float(mask_motor.motor_z.GetJogParams().StepSize), abs=1e-4)
+
+
+def test_missing_completion_message_does_not_wait_out_the_timeout(mask_motor, messages, monkeypatch):
+    # A fault or a stop from the front panel: the stage stops but no message arrives
+    monkeypatch.setattr(jcsimkcube._Delegate, '__call__', lambda self, task_id: None)
+    start = time.perf_counter()
+    mask_motor.MoveMotor(mask_motor.motor_z, 2.3, "Z", timeout=10000)
+    assert time.perf_counter() - start < mask_motor.EstimateMoveTime(mask_motor.motor_z, 0.3) + 1.0
+    assert mask_motor.GetPositionValue(mask_motor.motor_z) == pytest.approx(2.3, abs=1e-4)
+    assert ("WARNING", "Axis Z stopped without a completion message") in messages
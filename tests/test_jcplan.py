@@ -0,0 +1,104 @@
+import math
+
+import pytest
+
+from jcplan import (AxisPoints, LoadPoints, MoveTime, MoveTimeMatrix, PlanPoints, PlanRaster, PointMoveTime, SavePoints,
+                    SerpentinePoints)
+
+PROFILES = {'X': (2.3, 1.5), 'Y': (2.3, 1.5)}
+
+
+def test_move_time_trapezoidal():
+    # 1 s to reach 2 mm/s at 2 mm/s^2, covering 1 mm; the other 9 mm at full speed
+    assert MoveTime(10, 2.0, 2.0) == pytest.approx(10 / 2.0 + 1.0)
+
+
+def test_move_time_triangular():
+    # Never reaches max velocity: accelerate over half the distance, decelerate over the rest
+    assert MoveTime(0.5, 2.0, 2.0) == pytest.approx(2 * math.sqrt(0.5 / 2.0))
+
+
+def test_move_time_profiles_meet():
+    # At distance max_velocity^2 / acceleration both profiles give the same time
+    assert MoveTime(2.0 - 1e-12, 2.0, 2.0) == pytest.approx(MoveTime(2.0, 2.0, 2.0))
+
+
+def test_move_time_ignores_direction_and_bad_profiles():
+    assert MoveTime(-3, 2.3, 1.5) == MoveTime(3, 2.3, 1.5)
+    assert MoveTime(1, 0, 1.5) == 0.0
+
+
+def test_axis_points_include_the_stop():
+    # 0.2 / 0.02 is just under 10 in floating point
+    assert AxisPoints(1.0, 1.2, 0.02) == pytest.approx([1.0 + 0.02 * index for index in range(11)])
+    assert AxisPoints(1.0, 0.0, 0.5) == [1.0, 0.5, 0.0]
+    assert AxisPoints(0.0, 1.0, -0.5) == [0.0, 0.5, 1.0]
+    assert AxisPoints(2.0, 2.0, 0.1) == [2.0]
+
+
+def test_serpentine_points_step_one_axis_at_a_time():
+    points = SerpentinePoints({'X': [0, 1, 2], 'Y': [0, 1]}, ('Y', 'X'))
+    assert [(point['Y'], point['X']) for point in points] == [(0, 0), (0, 1), (0, 2), (1, 2), (1, 1), (1, 0)]
+    for a, b in zip(points, points[1:]):
+        assert sum(a[axis] != b[axis] for axis in a) == 1
+
+
+def test_plan_raster_puts_the_slow_axis_outside():
+    # Stepping the slow axis once per row rather than at every point is quicker
+    plan = PlanRaster({'X': (0, 1, 0.1), 'Y': (0, 1, 0.1)}, {'X': (2.3, 1.5), 'Y': (0.1, 0.1)})
+    assert plan.order == ('Y', 'X')
+    assert len(plan) == 121
+    assert plan.predicted_time == min(plan.candidates.values())
+    assert set(plan.candidates) == {('X', 'Y'), ('Y', 'X')}
+
+
+def test_plan_raster_given_order():
+    plan = PlanRaster({'X': (0, 1, 0.5), 'Z': (0, 1, 0.5)}, {}, order=('X', 'Z'), point_time=0.1)
+    assert plan.order == ('X', 'Z')
+    assert plan.predicted_time == pytest.approx(sum(plan.move_times) + 0.1 * 9)
+
+
+def test_move_time_matrix_matches_point_move_time():
+    points = [{'X': 0.0, 'Y': 0.0}, {'X': 1.0, 'Y': 0.2}, {'X': 3.0, 'Y': 2.0}]
+    matrix = MoveTimeMatrix(points, PROFILES)
+    for i, a in enumerate(points):
+        for j, b in enumerate(points):
+            assert matrix[i, j] == pytest.approx(PointMoveTime(a, b, PROFILES))
+
+
+def test_plan_points_visits_every_point_once_and_is_no_slower():
+    # A zigzag along X given in a poor order
+    points = [{'X': float(x), 'Y': 0.0} for x in (0, 9, 1, 8, 2, 7, 3, 6, 4, 5)]
+    plan = PlanPoints(points, PROFILES, origin={'X': 0.0, 'Y': 0.0})
+    assert [point['X'] for point in plan.points] == list(range(10))
+    assert plan.predicted_time < plan.given_time
+    assert plan.Travel()['X'] == pytest.approx(9.0)
+
+
+def test_plan_points_keeps_the_order_when_not_optimising():
+    points = [{'X': 2.0}, {'X': 0.0}, {'X': 1.0}]
+    plan = PlanPoints(points, PROFILES, optimise=False)
+    assert plan.points == points
+    assert plan.predicted_time == pytest.approx(plan.given_time)
+
+
+def test_load_points_with_header_and_comments(tmp_path):
+    path = tmp_path / "sites.csv"
+    path.write_text("# sites\nx, z\n0.5, 1.0\n\n1.5 2.0  # second\n")
+    assert LoadPoints(str(path)) == [{'X': 0.5, 'Z': 1.0}, {'X': 1.5, 'Z': 2.0}]
+
+
+def test_load_points_defaults_to_xyz_and_round_trips(tmp_path):
+    path = tmp_path / "sites.txt"
+    path.write_text("0 1 2\n3 4 5\n")
+    points = LoadPoints(str(path))
+    assert points == [{'X': 0, 'Y': 1, 'Z': 2}, {'X': 3, 'Y': 4, 'Z': 5}]
+    SavePoints(str(tmp_path / "out.csv"), points)
+    assert LoadPoints(str(tmp_path / "out.csv")) == points
+
+
+def test_load_points_rejects_bad_lines(tmp_path):
+    path = tmp_path / "sites.csv"
+    path.write_text("X,Y\n0,1\n2\n")
+    with pytest.raises(ValueError):
+        LoadPoints(str(path))
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from jcraw import BAYER_OFFSETS, BatchDemosaic, Demosaic, ReduceBayer, ToRGB16
+from jcstore import CreateScanStore, ScanReader, h5py
+
+PATTERNS = list(BAYER_OFFSETS)
+
+
+def ColourMap(pattern, height, width):
+    """Channel (0 red, 1 green, 2 blue) sampled at every pixel of a Bayer pattern."""
+    ry, rx = BAYER_OFFSETS[pattern]
+    colours = np.ones((height, width), dtype=int)
+    colours[ry::2, rx::2] = 0
+    colours[1 - ry::2, 1 - rx::2] = 2
+    return colours
+
+
+def Mosaic(rgb, pattern):
+    """Sample an RGB image through a Bayer filter."""
+    colours = ColourMap(pattern, *rgb.shape[:2])
+    return np.take_along_axis(rgb, colours[..., None], axis=2)[..., 0]
+
+
+def ReferenceDemosaic(raw, pattern):
+    """
+    Bilinear demosaic one pixel at a time: every channel is the pixel's own
+    sample or the mean of the samples of that colour among its 8 neighbours,
+    with the border reflected.
+    """
+    height, width = raw.shape
+    values = np.pad(raw.astype(np.float64), 1, mode='reflect')
+    colours = np.pad(ColourMap(pattern, height, width), 1, mode='reflect')
+    rgb = np.empty((height, width, 3))
+    for y in range(height):
+        for x in range(width):
+            window, window_colours = values[y:y + 3, x:x + 3], colours[y:y + 3, x:x + 3]
+            for channel in range(3):
+                if window_colours[1, 1] == channel:
+                    rgb[y, x, channel] = window[1, 1]
+                else:
+                    rgb[y, x, channel] = window[window_colours == channel].mean()
+    return rgb
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+@pytest.mark.parametrize('nearest', [False, True])
+def test_flat_colour_is_recovered_everywhere(pattern, nearest):
+    rgb = np.empty((6, 8, 3), dtype=np.uint16)
+    rgb[...] = (1000, 2000, 3000)
+    np.testing.assert_array_equal(Demosaic(Mosaic(rgb, pattern), pattern + '16', nearest), rgb)
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_bilinear_matches_the_reference_including_borders(pattern):
+    raw = np.random.default_rng(2).integers(0, 4096, (6, 8)).astype(np.uint16)
+    np.testing.assert_allclose(Demosaic(raw, pattern), ReferenceDemosaic(raw, pattern), rtol=1e-6)
+
+
+def test_known_values_of_a_4x4_rggb_mosaic():
+    raw = np.arange(16, dtype=np.float32).reshape(4, 4)
+    rgb = Demosaic(raw, 'BayerRG8')
+    # Red corner: green from its two neighbours, each reflected onto itself; blue diagonally below right
+    np.testing.assert_allclose(rgb[0, 0], [0, (1 + 4) / 2, 5])
+    # Green on a red row: red either side, blue above (reflected from below) and below
+    np.testing.assert_allclose(rgb[0, 1], [(0 + 2) / 2, 1, 5])
+    # Interior blue site: red on the four diagonals
+    np.testing.assert_allclose(rgb[1, 1], [(0 + 2 + 8 + 10) / 4, (1 + 4 + 6 + 9) / 4, 5])
+    # Blue corner at the bottom right: red reflected onto the upper left diagonal
+    np.testing.assert_allclose(rgb[3, 3], [10, (11 + 14) / 2, 15])
+
+
+def test_a_stack_is_demosaiced_frame_by_frame():
+    stack = np.random.default_rng(3).integers(0, 256, (3, 4, 6), dtype=np.uint8)
+    rgb = Demosaic(stack, 'BayerGB8')
+    for frame, expected in zip(stack, rgb):
+        np.testing.assert_array_equal(Demosaic(frame, 'BayerGB8'), expected)
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_reduce_bayer_takes_one_cell_per_pixel(pattern):
+    raw = np.random.default_rng(4).integers(0, 256, (8, 12), dtype=np.uint8)
+    raw[:2, :2] = 255   # Greens that would overflow uint8 if added directly
+    reduced = ReduceBayer(raw, pattern + '8', 4)
+    assert reduced.shape == (2, 3, 3) and reduced.dtype == np.uint8
+    colours = ColourMap(pattern, 2, 2)
+    for y in range(2):
+        for x in range(3):
+            cell = raw[4 * y:4 * y + 2, 4 * x:4 * x + 2].astype(int)
+            assert reduced[y, x, 0] == cell[colours == 0][0]
+            assert reduced[y, x, 2] == cell[colours == 2][0]
+            assert reduced[y, x, 1] == cell[colours == 1].sum() // 2
+
+
+def test_to_rgb16_scales_8_bit_data():
+    raw = np.full((2, 2), 255, dtype=np.uint8)
+    np.testing.assert_array_equal(ToRGB16(raw, 'BayerRG8'), np.full((2, 2, 3), 65535))
+    np.testing.assert_array_equal(ToRGB16(np.full((2, 2), 1000, np.uint16), 'Mono16'), np.full((2, 2), 1000))
+
+
+@pytest.mark.parametrize('extension', ['.bin', pytest.param('.h5', marks=pytest.mark.skipif(h5py is None, reason="h5py not installed"))])
+def test_batch_demosaic_matches_frame_by_frame(tmp_path, extension):
+    rng = np.random.default_rng(5)
+    frames = [rng.integers(0, 256, (6, 8), dtype=np.uint8) for _ in range(7)]
+    path = str(tmp_path / f"raw{extension}")
+    store = CreateScanStore(path, attributes={'pixel_format': 'BayerGR8'})
+    for index, frame in enumerate(frames):
+        store.Append(frame, {'position': 1.0 + index * 0.01, 'frame_id': index},
+                     images={'noise': np.full((6, 8), index, np.float32)})
+    store.Close()
+
+    # More batches than the workers may hold at once, so the bounded queue is drained while reading
+    output = BatchDemosaic(path, workers=1, batch_size=2, log_signal=lambda *args: None)
+    assert output == str(tmp_path / f"raw_rgb{extension}")
+    reader = ScanReader(output)
+    try:
+        assert len(reader) == len(frames)
+        assert reader.attributes['pixel_format'] == 'RGB16'
+        assert reader.attributes['source'] == f"raw{extension}"
+        for index, frame in enumerate(frames):
+            np.testing.assert_array_equal(reader.Frame(index), ToRGB16(frame, 'BayerGR8'))
+            np.testing.assert_array_equal(reader.Frame(index, 'noise'), np.full((6, 8), index, np.float32))
+        assert reader.metadata['frame_id'].tolist() == list(range(7))
+        np.testing.assert_allclose(reader.metadata['position'], [1.0 + index * 0.01 for index in range(7)])
+    finally:
+        reader.Close()
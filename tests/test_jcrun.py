@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from jcrun import CheckRecipe, LoadRecipes
+
+STEP = {'name': 'focus', 'scan': 'step', 'axis': 'Z', 'start': 1.0, 'stop': 1.2, 'step': 0.01}
+
+
+def test_valid_recipes_pass():
+    CheckRecipe(STEP)
+    CheckRecipe(dict(STEP, scan='fly', start=1, move={'x': 0.5}))
+    CheckRecipe({'name': 'grid', 'scan': 'raster', 'axes': {'X': [0, 1, 0.1], 'Y': [0, 2, 0.1]}, 'order': 'YX'})
+    CheckRecipe({'name': 'sites', 'scan': 'points', 'points': [{'X': 0.0}]})
+
+
+@pytest.mark.parametrize('change, message', [
+    ({'scan': 'spiral'}, "unknown scan"),
+    ({'speed': 2}, "unknown keys speed"),
+    ({'axis': 'W'}, "unknown axis W"),
+    ({'step': 0}, "step must be positive"),
+    ({'step': -0.01}, "step must be positive"),
+    ({'start': "1.0"}, "start must be a number"),
+    ({'stop': None}, "stop must be a number"),
+    ({'step': True}, "step must be a number"),
+    ({'move': {'X': "0.5"}}, "move X must be a number"),
+    ({'move': 5}, "move must map axes"),
+    ({'axis': 3}, "unknown axis 3"),
+    ({'autofocus': True}, "autofocus must be"),
+    ({'autofocus': {'range': "0.5"}}, "autofocus range must be a positive number"),
+    ({'autofocus': {'range': 0}}, "autofocus range must be a positive number"),
+    ({'autofocus': {'metric': 'contrast'}}, "unknown autofocus metric"),
+    ({'autofocus': {'span': 0.5}}, "autofocus must be"),
+    ({'frames_per_point': 0}, "frames_per_point must be a positive integer"),
+    ({'frames_per_point': 2.5}, "frames_per_point must be a positive integer"),
+    ({'frame_reduction': 'mode'}, "unknown frame_reduction"),
+    ({'frame_reduction': 'median', 'frames_per_point': 20}, "median of more than"),
+    ({'scan_format': 'tiff'}, "unknown scan_format"),
+    ({'scan_compression': 'lz4'}, "unknown scan_compression"),
+    ({'scan_compression': ['fast']}, "unknown scan_compression"),
+    ({'trigger': 1}, "trigger must be"),
+    ({'exposure_time': "10 ms"}, "exposure_time must be a number"),
+    ({'output': 7}, "output must be a directory"),
+])
+def test_invalid_step_recipes_name_the_problem(change, message):
+    with pytest.raises(ValueError, match=message):
+        CheckRecipe(dict(STEP, **change))
+
+
+def test_missing_keys_are_listed():
+    recipe = dict(STEP)
+    del recipe['stop'], recipe['step']
+    with pytest.raises(ValueError, match="step scan needs stop, step"):
+        CheckRecipe(recipe)
+
+
+@pytest.mark.parametrize('values', [[0, 1], [0, 1, 0], [0, "1", 0.1], [0, 1, False], 0.1])
+def test_invalid_raster_axes(values):
+    with pytest.raises(ValueError, match="raster axis X"):
+        CheckRecipe({'name': 'grid', 'scan': 'raster', 'axes': {'X': values}})
+
+
+def test_optional_keys_that_pass():
+    CheckRecipe(dict(STEP, autofocus={'range': 0.4, 'metric': 'tenengrad'}, frames_per_point=4, frame_reduction='median',
+                     scan_format='raw', scan_compression='small', trigger='Line0', exposure_time=10000, gain=0))
+    CheckRecipe(dict(STEP, autofocus=False, scan_compression=None, trigger=None))
+
+
+@pytest.mark.parametrize('order', ['XZ', 'X', 'XYY', 'xyz', 3])
+def test_raster_order_names_each_axis_once(order):
+    with pytest.raises(ValueError, match="order"):
+        CheckRecipe({'name': 'grid', 'scan': 'raster', 'axes': {'X': [0, 1, 0.1], 'Y': [0, 2, 0.1]}, 'order': order})
+    CheckRecipe({'name': 'grid', 'scan': 'raster', 'axes': {'x': [0, 1, 0.1], 'Y': [0, 2, 0.1]}, 'order': 'yX'})
+
+
+@pytest.mark.parametrize('axes', [[0, 1, 0.1], {}])
+def test_raster_axes_must_be_a_mapping(axes):
+    with pytest.raises(ValueError, match="axes must map"):
+        CheckRecipe({'name': 'grid', 'scan': 'raster', 'axes': axes})
+
+
+@pytest.mark.parametrize('points', [5, [[0, 1]]])
+def test_points_must_be_a_file_or_list_of_points(points):
+    with pytest.raises(ValueError, match="points must be"):
+        CheckRecipe({'name': 'sites', 'scan': 'points', 'points': points})
+
+
+def test_missing_point_list(tmp_path):
+    with pytest.raises(ValueError, match="not found"):
+        CheckRecipe({'name': 'sites', 'scan': 'points', 'points': str(tmp_path / "missing.csv")})
+
+
+def test_load_recipes_names_them_and_resolves_point_lists(tmp_path):
+    (tmp_path / "sites.csv").write_text("X,Y\n0,0\n")
+    path = tmp_path / "night.json"
+    path.write_text(json.dumps({'recipes': [STEP, {'scan': 'points', 'points': "sites.csv"}]}))
+    first, second = LoadRecipes(str(path))
+    assert first['name'] == 'focus'
+    assert second['name'] == "night.json #2"
+    assert second['points'] == str(tmp_path / "sites.csv")
+    assert first['source'] == str(path)
@@ -0,0 +1,91 @@
+import math
+
+import pytest
+
+from conftest import QuietLog
+from jcscan import ScanEngine
+from jcstore import CreateScanStore, ScanReader
+
+
+@pytest.fixture
+def engine(runner):
+    return ScanEngine(runner.mask_motor, runner.camera, log_signal=QuietLog, status_poller=runner.status_poller, trace=False)
+
+
+def Scan(engine, tmp_path, method, *args, **kwargs):
+    path = str(tmp_path / "scan.bin")
+    store = CreateScanStore(path)
+    try:
+        method(*args, store=store, **kwargs)
+    finally:
+        store.Close()
+    reader = ScanReader(path)
+    try:
+        return reader.metadata['position'].tolist()
+    finally:
+        reader.Close()
+
+
+def test_step_scan_keeps_the_last_point(engine, runner, tmp_path):
+    # 0.2 / 0.02 is 9.999999999999998 in floating point
+    positions = Scan(engine, tmp_path, engine.StepScan, runner.mask_motor.motor_z, "Z", 1.0, 1.2, 0.02)
+    assert len(positions) == 11
+    assert positions == pytest.approx([1.0 + 0.02 * index for index in range(11)], abs=1e-4)
+
+
+def test_fly_scan_keeps_the_last_point(engine, runner, tmp_path):
+    positions = Scan(engine, tmp_path, engine.FlyScan, runner.mask_motor.motor_z, "Z", 1.0, 1.2, 0.02)
+    assert len(positions) == 11
+    assert positions == pytest.approx([1.0 + 0.02 * index for index in range(11)], abs=0.01)
+
+
+def test_fly_scan_refuses_positions_outside_travel(engine, runner):
+    minimum, maximum = runner.mask_motor.GetTravelLimits(runner.mask_motor.motor_z)
+    with pytest.raises(ValueError, match="outside the travel"):
+        engine.FlyScan(runner.mask_motor.motor_z, "Z", maximum - 0.1, maximum + 0.1, 0.02)
+
+
+def test_fly_scan_refuses_an_unknown_frame_rate(engine, runner, monkeypatch):
+    monkeypatch.setattr(runner.camera, 'GetFrameRate', lambda: math.nan)
+    with pytest.raises(ValueError, match="velocity"):
+        engine.FlyScan(runner.mask_motor.motor_z, "Z", 1.0, 1.2, 0.02)
+
+
+def test_averaged_step_scan_writes_and_logs_each_point_once(runner, tmp_path):
+    messages = []
+    engine = ScanEngine(runner.mask_motor, runner.camera, log_signal=lambda level, component, message, details="": messages.append(message),
+                        average=3, status_poller=runner.status_poller, trace=False)
+    path = str(tmp_path / "scan.bin")
+    store = CreateScanStore(path)
+    try:
+        engine.StepScan(runner.mask_motor.motor_z, "Z", 1.0, 1.02, 0.01, store=store)
+    finally:
+        store.Close()
+    reader = ScanReader(path)
+    try:
+        assert len(reader) == 3
+        assert reader.images == ['noise']
+        assert reader.metadata['frames_averaged'].tolist() == [3, 3, 3]
+    finally:
+        reader.Close()
+    assert sum(message.startswith("Image acquired") for message in messages) == 3
+
+
+def test_point_scan_records_read_back_positions_and_targets(engine, runner, tmp_path):
+    points = [{'X': 1.0, 'Z': 1.1}, {'X': 1.2, 'Z': 1.0}]
+    path = str(tmp_path / "scan.bin")
+    store = CreateScanStore(path)
+    try:
+        engine.PointScan(engine.PlanPoints(points, optimise=False), store=store)
+    finally:
+        store.Close()
+    reader = ScanReader(path)
+    try:
+        metadata = reader.metadata
+    finally:
+        reader.Close()
+    assert metadata['target_x'].tolist() == [1.0, 1.2]
+    assert metadata['target_z'].tolist() == [1.1, 1.0]
+    # Read back from the stages, so within the stage resolution of the target but not the planned value itself
+    assert metadata['position_x'] == pytest.approx(metadata['target_x'], abs=1e-4)
+    assert metadata['position_z'] == pytest.approx(metadata['target_z'], abs=1e-4)
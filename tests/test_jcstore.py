@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pytest
+
+from jcstore import CreateScanStore, NextScanName, OpenScanStore, ScanReader, h5py
+
+FORMATS = ['raw', pytest.param('hdf5', marks=pytest.mark.skipif(h5py is None, reason="h5py not installed"))]
+EXTENSIONS = {'raw': '.bin', 'hdf5': '.h5'}
+
+
+def Frames(count):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 65535, (6, 8, 3), dtype=np.uint16) for _ in range(count)]
+
+
+@pytest.mark.parametrize('scan_format', FORMATS)
+@pytest.mark.parametrize('compression', [None, 'fast', 'small'])
+def test_round_trip(tmp_path, scan_format, compression):
+    frames = Frames(3)
+    path = str(tmp_path / f"scan{EXTENSIONS[scan_format]}")
+    store = CreateScanStore(path, compression, {'axis': 'Z', 'step_size': 0.01})
+    for index, frame in enumerate(frames):
+        store.Append(frame, {'position': 1.0 + index * 0.01, 'frame_id': index, 'timestamp': 10 ** 18 + index},
+                     images={'noise': frame.astype(np.float32) / 2})
+    store.Close()
+
+    reader = ScanReader(path)
+    try:
+        assert len(reader) == 3
+        assert reader.attributes['axis'] == 'Z'
+        assert reader.images == ['noise']
+        for index, frame in enumerate(frames):
+            np.testing.assert_array_equal(reader.Frame(index), frame)
+            np.testing.assert_array_equal(reader.Frame(index, 'noise'), frame.astype(np.float32) / 2)
+        np.testing.assert_array_equal(reader.Frames(1, 3), np.stack(frames[1:]))
+        np.testing.assert_allclose(reader.metadata['position'], [1.0, 1.01, 1.02])
+        # Nanosecond timestamps must not pass through float64
+        assert reader.metadata['timestamp'].tolist() == [10 ** 18, 10 ** 18 + 1, 10 ** 18 + 2]
+    finally:
+        reader.Close()
+
+
+@pytest.mark.skipif(h5py is None, reason="h5py not installed")
+def test_hdf5_metadata_keeps_fractions_after_an_integer(tmp_path):
+    path = str(tmp_path / "scan.h5")
+    store = CreateScanStore(path)
+    for gain in (0, 1.5, 2.25):
+        store.Append(np.zeros((2, 2), np.uint16), {'gain': gain, 'frame_id': 1})
+    store.Close()
+    reader = ScanReader(path)
+    try:
+        assert reader.metadata['gain'].tolist() == [0.0, 1.5, 2.25]
+        assert reader.metadata['frame_id'].dtype == np.int64
+    finally:
+        reader.Close()
+
+
+def test_next_scan_name_skips_existing_series(tmp_path):
+    first = NextScanName(str(tmp_path), '.h5')
+    open(first, 'w').close()
+    second = NextScanName(str(tmp_path), '.h5')
+    assert first.endswith('_0001.h5')
+    assert second.endswith('_0002.h5')
+
+
+def test_open_scan_store_png_has_no_store(tmp_path):
+    assert OpenScanStore(str(tmp_path), 'png') is None
+    with pytest.raises(ValueError):
+        OpenScanStore(str(tmp_path), 'tiff')
+    assert os.listdir(tmp_path) == []